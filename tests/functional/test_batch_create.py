@@ -0,0 +1,25 @@
+import pytest
+import json
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.models import CreateStatus
+
+@pytest.mark.asyncio
+async def test_batch_create_real_worktrees(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    names = [f"agent{i}" for i in range(6)]
+    result = await manager.create_workspace(names)
+
+    assert [ws.status for ws in result.workspaces] == [CreateStatus.CREATED] * len(names)
+    for name in names:
+        ws_path = base_workspace.parent / f"base-ws-{name}"
+        assert (ws_path / "backend" / "backend.txt").exists()
+
+    config = json.loads((base_workspace / "workspace.json").read_text())
+    assert sorted(config["workspaces"]) == names
+
+    # Existing names are reported, not recreated
+    again = await manager.create_workspace(["agent0"])
+    assert again.workspaces[0].status == CreateStatus.EXISTS
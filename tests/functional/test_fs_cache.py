@@ -0,0 +1,31 @@
+import pytest
+import subprocess
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.server.git import MockGitProvider
+
+def git_config(path, key):
+    res = subprocess.run(["git", "config", "--get", key], cwd=path, capture_output=True, text=True)
+    return res.stdout.strip()
+
+@pytest.mark.asyncio
+async def test_fs_cache_enabled_on_base_and_worktrees(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    assert git_config(base_workspace, "core.untrackedCache") == "true"
+    assert git_config(base_workspace / "backend", "core.untrackedCache") == "true"
+
+    await manager.create_workspace(["cached"])
+    ws_path = base_workspace.parent / "base-ws-cached"
+    assert git_config(ws_path, "core.untrackedCache") == "true"
+    assert git_config(ws_path / "backend", "core.untrackedCache") == "true"
+
+    if manager.git.supports_fsmonitor():
+        assert git_config(ws_path, "core.fsmonitor") == "true"
+
+def test_mock_reports_no_fsmonitor():
+    git = MockGitProvider()
+    assert git.supports_fsmonitor() is False
+    git.responses["supports_fsmonitor"] = True
+    assert git.supports_fsmonitor() is True
@@ -0,0 +1,64 @@
+import pytest
+import json
+import shutil
+import subprocess
+from workspace_cli.server.manager import WorkspaceManager
+
+def git(path, *args):
+    return subprocess.run(
+        ["git", "-c", "user.email=test@example.com", "-c", "user.name=Test User"] + list(args),
+        cwd=path, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+@pytest.mark.asyncio
+async def test_gc(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+    await manager.create_workspace(["gone", "kept"])
+    parent = base_workspace.parent
+
+    # Directory deleted behind the daemon's back
+    shutil.rmtree(parent / "base-ws-gone")
+    # Leftover of a worktree git no longer knows
+    (parent / "base-ws-ghost").mkdir()
+    (parent / "base-ws-ghost" / ".git").write_text("gitdir: /nonexistent/worktrees/ghost\n")
+    # The same, but with work in it
+    (parent / "base-ws-lost").mkdir()
+    (parent / "base-ws-lost" / ".git").write_text("gitdir: /nonexistent/worktrees/lost\n")
+    (parent / "base-ws-lost" / "notes.txt").write_text("uncommitted")
+    # Worktree created by hand
+    git(base_workspace, "worktree", "add", "-q", str(parent / "base-ws-manual"), "-b", "manual")
+    # Idle preview branch, a merged and an unmerged branch of deleted workspaces
+    git(base_workspace, "branch", "preview")
+    git(base_workspace, "branch", "workspace-old/stand", "origin/main")
+    git(base_workspace, "branch", "workspace-wip/stand", "origin/main")
+    wip = parent / "wip"
+    git(base_workspace, "worktree", "add", "-q", str(wip), "workspace-wip/stand")
+    git(wip, "commit", "-q", "--allow-empty", "-m", "unmerged work")
+    git(base_workspace, "worktree", "remove", str(wip))
+
+    dry = await manager.gc(dry_run=True)
+    assert dry.unregistered_workspaces == ["gone"]
+    assert (parent / "base-ws-ghost").exists()
+    assert "gone" in manager.workspaces
+
+    report = await manager.gc()
+    assert report.pruned_worktrees
+    assert report.unregistered_workspaces == ["gone"]
+    assert report.adopted_workspaces == ["manual"]
+    assert report.removed_directories == [str(parent / "base-ws-ghost")]
+    assert report.orphaned_directories == [str(parent / "base-ws-lost")]
+    assert sorted(report.deleted_branches) == ["preview", "workspace-gone/stand", "workspace-old/stand"]
+    assert report.repositories and not any(repo.error for repo in report.repositories)
+
+    assert not (parent / "base-ws-ghost").exists()
+    assert (parent / "base-ws-lost" / "notes.txt").read_text() == "uncommitted"
+    assert "workspace-wip/stand" in git(base_workspace, "branch", "--list")
+    assert (base_workspace / ".git" / "objects" / "info" / "commit-graph").exists()
+    config = json.loads((base_workspace / "workspace.json").read_text())
+    assert sorted(config["workspaces"]) == ["kept", "manual"]
+
+    report = await manager.gc(remove_orphans=True)
+    assert report.removed_directories == [str(parent / "base-ws-lost")]
+    assert not (parent / "base-ws-lost").exists()
@@ -0,0 +1,37 @@
+import asyncio
+import time
+import pytest
+from workspace_cli.models import HookSpec, LogStream
+from workspace_cli.server.runner import PreviewRunner
+
+@pytest.mark.asyncio
+async def test_parallel_hooks_stream_output(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    hooks = [[
+        HookSpec(name="one", run="echo first; sleep 0.5; echo done-one"),
+        HookSpec(name="two", run="sleep 0.5; echo done-two"),
+    ], "echo last"]
+
+    started = time.monotonic()
+    await runner.run_hooks(hooks, "before_clear")
+    assert time.monotonic() - started < 0.9
+
+    lines = [(line.source, line.text) for line in runner.logs.since(0)]
+    assert ("before_clear:one", "first") in lines
+    assert ("before_clear:two", "done-two") in lines
+    # The plain command ran after both
+    assert lines.index(("before_clear", "last")) > lines.index(("before_clear:one", "done-one"))
+
+@pytest.mark.asyncio
+async def test_hook_timeout_kills_and_fails(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    hooks = [HookSpec(name="stuck", run="echo waiting; sleep 30", timeout=0.3)]
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="timed out"):
+        await runner.run_hooks(hooks, "after_preview")
+    assert time.monotonic() - started < 5
+
+    texts = [(line.stream, line.text) for line in runner.logs.since(0)]
+    assert (LogStream.STDOUT, "waiting") in texts
+    assert any(stream == LogStream.ERROR and "Timed out" in text for stream, text in texts)
@@ -38,6 +38,30 @@ async def test_lazy_config_initialization(tmp_path, caplog):
     assert manager.base_path == project_root
     assert manager.runner.base_path == project_root
 
+@pytest.mark.asyncio
+async def test_lazy_config_starts_background_services(tmp_path):
+    project_root = tmp_path / "project"
+    project_root.mkdir()
+    (project_root / "workspace.json").write_text(
+        '{"base_path": ".", "workspaces": {}, "prefetch_interval": 600, "gc_interval": 3600}'
+    )
+    dummy_path = tmp_path / "home"
+    dummy_path.mkdir()
+
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(dummy_path)
+    await manager.initialize()
+    await manager.start_background()
+    assert manager.prefetcher is None and manager.collector is None
+
+    await manager.ensure_config(str(project_root))
+    try:
+        assert manager.prefetcher.interval == 600
+        assert manager.collector.interval == 3600
+    finally:
+        await manager.stop_background()
+    assert manager.prefetcher is None and manager.collector is None
+
 @pytest.mark.asyncio
 async def test_parent_directory_config_detection(tmp_path):
     # Setup: root/workspace.json
@@ -83,7 +107,7 @@ async def test_client_sends_project_root(tmp_path):
         cwd = project_root
         with patch("pathlib.Path.cwd", return_value=cwd):
             client = DaemonClient()
-            client.switch_preview("test")
+            client.switch_preview("test", wait=False)
             
             # Verify post call included project_root
             args, kwargs = mock_client.post.call_args
@@ -0,0 +1,118 @@
+import pytest
+import subprocess
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.server.prefetch import PrefetchScheduler, MAX_BACKOFF
+
+def rev(path, ref):
+    return subprocess.run(["git", "rev-parse", ref], cwd=path, capture_output=True, text=True).stdout.strip()
+
+def push_commit(test_dir, name):
+    clone = test_dir / f"update-{name}"
+    subprocess.run(["git", "clone", "-q", str(test_dir / "remote-main"), str(clone)], check=True)
+    (clone / f"{name}.txt").write_text(name)
+    subprocess.run(["git", "add", "."], cwd=clone, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", name], cwd=clone, check=True)
+    subprocess.run(["git", "push", "-q"], cwd=clone, check=True)
+    return rev(clone, "HEAD")
+
+@pytest.mark.asyncio
+async def test_prefetch_lets_sync_skip_fetch(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+    manager.config.prefetch_interval = 60
+    await manager.create_workspace(["pre"])
+    ws_path = base_workspace.parent / "base-ws-pre"
+
+    head = push_commit(base_workspace.parent, "prefetched")
+    errors = await PrefetchScheduler(manager, 60).run_once()
+    assert errors == {}
+    assert rev(base_workspace, "origin/main") == head
+
+    fetched = []
+    original_fetch = manager.git.fetch
+    manager.git.fetch = lambda path: (fetched.append(path), original_fetch(path))
+    result = await manager.sync_workspace("pre", rebuild_preview=False)
+
+    assert fetched == []
+    assert (ws_path / "prefetched.txt").exists()
+    assert result.workspaces[0].fetch_skipped_age is not None
+
+    # Forcing it fetches anyway, and says nothing was skipped
+    result = await manager.sync_workspace("pre", rebuild_preview=False, fetch=True)
+    assert ws_path in fetched
+    assert result.workspaces[0].fetch_skipped_age is None
+
+@pytest.mark.asyncio
+async def test_prefetch_skips_busy_repository(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    push_commit(base_workspace.parent, "busy")
+    before = rev(base_workspace, "origin/main")
+    async with manager._repo_lock(manager.git.get_common_dir(base_workspace)):
+        errors = await PrefetchScheduler(manager, 60).run_once()
+    assert errors == {}
+    assert rev(base_workspace, "origin/main") == before
+
+@pytest.mark.asyncio
+async def test_create_runs_alongside_prefetch(base_workspace):
+    import asyncio
+    import threading
+
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    before = rev(base_workspace, "origin/main")
+    head = push_commit(base_workspace.parent, "alongside")
+    seen = []
+    in_network, release = threading.Event(), threading.Event()
+    original_prefetch = manager.git.prefetch
+    def prefetch(path):
+        original_prefetch(path)
+        if not in_network.is_set():
+            # Only refs/prefetch/ moved so far
+            seen.append(rev(base_workspace, "origin/main"))
+            in_network.set()
+            release.wait(10)
+    manager.git.prefetch = prefetch
+
+    task = asyncio.ensure_future(PrefetchScheduler(manager, 60).run_once())
+    await asyncio.get_running_loop().run_in_executor(None, in_network.wait, 10)
+    # Not held up by the fetch in progress
+    result = await asyncio.wait_for(manager.create_workspace(["alongside"]), timeout=30)
+    assert not task.done()
+    release.set()
+
+    assert await task == {}
+    assert [ws.status.value for ws in result.workspaces] == ["CREATED"]
+    assert seen == [before]
+    assert rev(base_workspace, "origin/main") == head
+
+@pytest.mark.asyncio
+async def test_prefetch_publishes_only_when_idle(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    before = rev(base_workspace, "origin/main")
+    head = push_commit(base_workspace.parent, "later")
+    scheduler = PrefetchScheduler(manager, 60)
+    # E.g. a create in progress
+    async with manager._registry_lock:
+        assert await scheduler.run_once() == {}
+    assert rev(base_workspace, "origin/main") == before
+    assert rev(base_workspace, "refs/prefetch/remotes/origin/main") == head
+
+    assert await scheduler.run_once() == {}
+    assert rev(base_workspace, "origin/main") == head
+
+def test_prefetch_backoff():
+    scheduler = PrefetchScheduler(manager=None, interval=10)
+    assert 8 <= scheduler.next_delay() <= 12
+    scheduler.failures = 2
+    assert 32 <= scheduler.next_delay() <= 48
+    scheduler.failures = 100
+    assert scheduler.next_delay() <= 10 * MAX_BACKOFF * 1.2
@@ -4,6 +4,7 @@ import os
 import signal
 import subprocess
 from unittest.mock import MagicMock
+from workspace_cli.models import PreviewCommand
 from workspace_cli.server.runner import PreviewRunner
 
 @pytest.mark.asyncio
@@ -63,3 +64,105 @@ wait $child_pid
     # Ideally we should check if the sleep process is still running.
     # But that requires finding it.
     # For now, we trust os.killpg works if the test passes without hanging.
+
+@pytest.mark.asyncio
+async def test_long_lines_do_not_stall_output(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+
+    # A line much larger than the pipe and reader buffers
+    await runner.start_preview(["python3 -c \"print('x' * 1000000); [print(i) for i in range(5000)]\""])
+    process, _, _ = runner.processes[0]
+    await asyncio.wait_for(process.wait(), timeout=10)
+    await asyncio.sleep(0.2)
+
+    lines = [line for line in runner.logs.since(0) if line.stream == "stdout"]
+    assert "characters truncated" in lines[0].text
+    assert lines[-1].text == "4999"
+    await runner.stop()
+
+async def _drain(subscriber):
+    lines = []
+    while True:
+        line = await asyncio.wait_for(subscriber.get(), timeout=5)
+        if line is None:
+            return lines
+        lines.append(line)
+
+@pytest.mark.asyncio
+async def test_stop_signals_all_groups_at_once(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+
+    # None of these exit on SIGTERM; each must be killed once its grace period is over
+    stubborn = "trap '' TERM; sleep 30"
+    await runner.start_preview([
+        PreviewCommand(run=stubborn, grace=0.3),
+        PreviewCommand(run=stubborn, grace=1.0),
+        PreviewCommand(run=stubborn, grace=1.0),
+    ])
+    processes = [process for process, _, _ in runner.processes]
+    await asyncio.sleep(0.2)
+    session = runner.logs.session
+    subscriber = runner.subscribe(since=0)
+
+    await runner.stop()
+    assert all(process.returncode == -signal.SIGKILL for process in processes)
+    # The longest grace period, not the sum of them
+    assert 1.0 <= runner.last_stop_seconds < 2.0
+
+    # The shutdown is part of the session that ends, and its observers see it
+    lines = await _drain(subscriber)
+    assert all(line.session == session for line in lines)
+    texts = [line.text for line in lines]
+    assert sum(text.startswith("Force killing") for text in texts) == 3
+    assert texts[-1].startswith("Stopped 3 command(s) in")
+    assert runner.logs.session == session + 1 and runner.logs.next_seq == 0
+
+@pytest.mark.asyncio
+async def test_stop_kills_members_left_by_the_shell(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    pid_file = tmp_path / "grandchild.pid"
+
+    # The shell exits on SIGTERM; its background child ignores it
+    await runner.start_preview([PreviewCommand(run=f"sh -c 'trap \"\" TERM; echo $$ > {pid_file}; exec sleep 30' & wait", grace=0.5)])
+    for _ in range(50):
+        if pid_file.exists() and pid_file.read_text().strip():
+            break
+        await asyncio.sleep(0.05)
+    grandchild = int(pid_file.read_text())
+    subscriber = runner.subscribe(since=0)
+
+    await runner.stop()
+    assert runner.last_stop_seconds < 1.5
+
+    def state():
+        try:
+            return open(f"/proc/{grandchild}/stat").read().rsplit(")", 1)[1].split()[0]
+        except FileNotFoundError:
+            return None
+    # Gone, or killed and waiting to be reaped (SIGKILL takes effect asynchronously)
+    for _ in range(20):
+        if state() in (None, "Z"):
+            break
+        await asyncio.sleep(0.05)
+    assert state() in (None, "Z")
+    texts = [line.text for line in await _drain(subscriber)]
+    assert any(text.startswith("Force killing") for text in texts)
+
+@pytest.mark.asyncio
+async def test_restart_keeps_observers_and_session(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    await runner.start_preview(["echo first; exec sleep 30"])
+    first, _, _ = runner.processes[0]
+    await asyncio.sleep(0.2)
+    session = runner.logs.session
+    subscriber = runner.subscribe(since=0)
+
+    await runner.restart(["echo second; exec sleep 30"])
+    assert first.returncode is not None
+    await asyncio.sleep(0.2)
+    assert not subscriber.closed
+    assert runner.logs.session == session
+
+    await runner.stop()
+    texts = [line.text for line in await _drain(subscriber)]
+    assert texts.index("first") < texts.index("second")
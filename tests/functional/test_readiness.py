@@ -0,0 +1,68 @@
+import asyncio
+import socket
+import sys
+import pytest
+from unittest.mock import patch
+from workspace_cli.models import PreviewCommand, ReadinessProbe, ReadinessStatus, Workspace, WorkspaceConfig
+from workspace_cli.server.git import MockGitProvider
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.server.runner import PreviewRunner
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.mark.asyncio
+async def test_port_and_log_probes(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    port = _free_port()
+    await runner.start_preview([
+        PreviewCommand(run=f"sleep 0.3; {sys.executable} -m http.server {port} --bind 127.0.0.1", ready=ReadinessProbe(port=port, timeout=10)),
+        PreviewCommand(run="sleep 0.2; echo 'compiled successfully'; sleep 30", ready=ReadinessProbe(log="compiled succ")),
+        "sleep 30",
+    ])
+    try:
+        assert await asyncio.wait_for(runner.wait_ready(), timeout=10) is True
+        texts = [line.text for line in runner.logs.since(0)]
+        assert sum(text.startswith("Ready after") for text in texts) == 2
+    finally:
+        await runner.stop()
+
+@pytest.mark.asyncio
+async def test_probe_fails_when_process_exits(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    await runner.start_preview([PreviewCommand(run="exit 3", restart=False, ready=ReadinessProbe(port=_free_port()))])
+    with pytest.raises(RuntimeError, match="exited with code 3"):
+        await asyncio.wait_for(runner.wait_ready(), timeout=5)
+    await runner.stop()
+
+@pytest.mark.asyncio
+async def test_no_probe_means_nothing_to_wait_for(tmp_path):
+    runner = PreviewRunner(tmp_path, echo=False)
+    await runner.start_preview(["sleep 30"])
+    assert await runner.wait_ready() is False
+    await runner.stop()
+
+@pytest.mark.asyncio
+async def test_switch_records_time_to_ready(tmp_path):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(tmp_path / "base", git_provider=MockGitProvider())
+    manager.runner = PreviewRunner(tmp_path, echo=False)
+    manager.config = WorkspaceConfig(
+        base_path=tmp_path / "base",
+        preview=[{"run": "sleep 0.3; echo listening; sleep 30", "ready": {"log": "listening", "timeout": 10}}]
+    )
+    manager.workspaces["A"] = Workspace(name="A", path=str(tmp_path / "A"), branch="A")
+
+    with patch("workspace_cli.server.manager.Watcher"), \
+         patch.object(manager, "_reset_preview_tree"):
+        session = await manager.switch_preview("A", wait_ready=True)
+    try:
+        assert session.readiness == ReadinessStatus.READY
+        assert 0.3 <= session.time_to_ready < 10
+        status = await manager.get_status()
+        assert status.preview.time_to_ready == session.time_to_ready
+    finally:
+        await manager.runner.stop()
+        WorkspaceManager._instance = None
@@ -73,7 +73,7 @@ async def test_resident_preview_log_streaming():
     # 2. Log message
     runner._log("test", "Hello A")
     line = await task
-    assert "Hello A" in line
+    assert "Hello A" in line.text
     
     # 3. Client B subscribes (simulating new preview switch)
     # In real app, switch_preview calls runner.stop()
@@ -88,3 +88,129 @@ async def test_resident_preview_log_streaming():
         
     # 5. Verify observers cleared
     assert len(runner.observers) == 0
+
+@pytest.mark.asyncio
+async def test_late_subscriber_replays_and_resumes():
+    base_path = MagicMock()
+    runner = PreviewRunner(base_path)
+    manager = WorkspaceManager(base_path)
+    manager.runner = runner
+
+    for i in range(5):
+        runner._log("test", f"line {i}")
+
+    # A late client gets the history first, then live lines
+    stream = manager.subscribe_to_logs(since=0)
+    seen = [await stream.__anext__() for _ in range(5)]
+    assert [line.seq for line in seen] == [0, 1, 2, 3, 4]
+    runner._log("test", "live")
+    assert "live" in (await stream.__anext__()).text
+    await stream.aclose()
+
+    # A reconnecting client continues after the last line it saw
+    session = seen[0].session
+    stream = manager.subscribe_to_logs(since=3, session=session)
+    assert [(await stream.__anext__()).seq for _ in range(3)] == [3, 4, 5]
+    await stream.aclose()
+
+    # Once the preview is switched, the old session has nothing more to give
+    await runner.stop()
+    stale = [line async for line in manager.subscribe_to_logs(since=0, session=session)]
+    assert stale == []
+
+@pytest.mark.asyncio
+async def test_stalled_subscriber_stays_bounded():
+    base_path = MagicMock()
+    runner = PreviewRunner(base_path)
+    runner.echo = False
+    manager = WorkspaceManager(base_path)
+    manager.runner = runner
+
+    stalled = runner.subscribe(maxsize=100)
+    for i in range(20000):
+        runner._log("build", f"noise {i}")
+
+    assert len(stalled.queue) == 100
+    assert len(runner.logs.lines) == 10000
+    metrics = manager.get_metrics()
+    [entry] = metrics.log_subscribers
+    assert entry.dropped == 19900
+    assert entry.lag == 20000
+    assert metrics.log_buffered_lines == 10000
+
+@pytest.mark.asyncio
+async def test_runner_keeps_structured_records(tmp_path, capsys):
+    from workspace_cli.models import LogStream
+
+    runner = PreviewRunner(tmp_path, echo=True)
+    await runner.start_preview(["echo '[bold]out'; echo err >&2"])
+    process, _, _ = runner.processes[0]
+    await process.wait()
+    await asyncio.sleep(0.3)
+
+    records = {(line.source, line.stream, line.text) for line in runner.logs.since(0)}
+    assert ("preview", LogStream.STDOUT, "[bold]out") in records
+    assert ("preview", LogStream.STDERR, "err") in records
+    assert all(line.time > 0 for line in runner.logs.since(0))
+
+    # The daemon's own copy is plain text, written in one batch
+    out = capsys.readouterr().out
+    assert "[preview] [bold]out\n" in out
+    assert "[preview] err\n" in out
+    await runner.stop()
+
+@pytest.mark.asyncio
+async def test_filtered_subscribers_share_one_matcher():
+    from workspace_cli.models import LogFilter, LogStream
+    from workspace_cli.server import logs as logs_module
+
+    base_path = MagicMock()
+    runner = PreviewRunner(base_path, echo=False)
+    manager = WorkspaceManager(base_path)
+    manager.runner = runner
+
+    runner._log("preview", "early error", LogStream.STDERR)
+    errors = LogFilter(streams=[LogStream.STDERR])
+    agents = [manager.subscribe_to_logs(since=0, filter=errors) for _ in range(10)]
+    everything = manager.subscribe_to_logs(since=0)
+    # The backlog is filtered too
+    assert [(await agent.__anext__()).text for agent in agents] == ["early error"] * 10
+    assert (await everything.__anext__()).text == "early error"
+
+    calls = []
+    original = logs_module.LogMatcher.matches
+    with patch.object(logs_module.LogMatcher, "matches", lambda self, line: calls.append(line.seq) or original(self, line)):
+        for i in range(100):
+            runner._log("preview", f"out {i}", LogStream.STDOUT)
+        runner._log("preview", "late error", LogStream.STDERR)
+
+    # One evaluation per line for all ten agents
+    assert len(calls) == 101
+    assert [(await agent.__anext__()).text for agent in agents] == ["late error"] * 10
+    assert (await everything.__anext__()).text == "out 0"
+    for stream in agents + [everything]:
+        await stream.aclose()
+    assert runner._groups == {}
+
+@pytest.mark.asyncio
+async def test_archive_is_written_off_the_event_loop(tmp_path):
+    import threading
+    from workspace_cli.server.archive import LogArchive, list_sessions, read_session
+
+    threads = []
+
+    class RecordingArchive(LogArchive):
+        def write(self, lines):
+            threads.append(threading.current_thread())
+            super().write(lines)
+
+    runner = PreviewRunner(tmp_path, echo=False)
+    runner.set_archive(RecordingArchive(tmp_path / "archive"))
+    runner.start_archive_session("A")
+    for i in range(100):
+        runner._log("preview", f"line {i}")
+    await runner.close_archive()
+
+    assert threads and threading.current_thread() not in threads
+    [session] = list_sessions(tmp_path / "archive")
+    assert [line.text for line in read_session(tmp_path / "archive" / session.id)] == [f"line {i}" for i in range(100)]
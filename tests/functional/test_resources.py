@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+import pytest
+from workspace_cli.models import LogStream, ResourceLimits, WorkspaceConfig
+from workspace_cli.server.git import MockGitProvider
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.server.resources import sample_groups
+from workspace_cli.server.runner import PreviewRunner
+
+pytestmark = pytest.mark.skipif(not os.path.exists("/proc/self/stat"), reason="needs /proc")
+
+def test_sample_groups_reads_own_group():
+    usage = sample_groups({os.getpgrp()})
+    group = usage[os.getpgrp()]
+    assert group.processes >= 1
+    assert group.rss_bytes > 0
+    assert group.cpu_seconds > 0
+
+@pytest.mark.asyncio
+async def test_monitor_tracks_preview_groups_and_soft_limits(tmp_path):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(tmp_path, git_provider=MockGitProvider())
+    manager.runner = PreviewRunner(tmp_path, echo=False)
+    manager.config = WorkspaceConfig(base_path=tmp_path, preview_limits=ResourceLimits(rss_mb=50))
+
+    # A shell with a child holding ~100 MiB
+    hog = f"{sys.executable} -c \"import time; data = bytearray(100 * 2**20); data[::4096] = b'x' * len(data[::4096]); time.sleep(30)\""
+    await manager.runner.start_preview([f"{hog}; true"])
+    try:
+        await asyncio.sleep(1.0)
+        await manager.resources.sample()
+        await asyncio.sleep(0.2)
+        await manager.resources.sample()
+
+        [stats] = (await manager.get_status()).preview_processes
+        assert stats.source == "preview"
+        assert stats.processes >= 2
+        assert stats.rss_bytes > 100 * 2**20
+        assert stats.peak_rss_bytes >= stats.rss_bytes
+        assert manager.get_metrics().preview_processes[0].pgid == stats.pgid
+
+        # Warned once per crossing, not on every sample
+        warnings = [line for line in manager.runner.logs.since(0) if line.stream == LogStream.ERROR and "soft limit" in line.text]
+        assert len(warnings) == 1
+    finally:
+        await manager.runner.stop()
+        WorkspaceManager._instance = None
+
+    await manager.resources.sample()
+    assert manager.resources.snapshot() == []
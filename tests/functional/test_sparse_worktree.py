@@ -0,0 +1,87 @@
+import pytest
+import json
+import subprocess
+from pathlib import Path
+from workspace_cli.server.manager import WorkspaceManager
+
+def rev(path, ref):
+    return subprocess.run(["git", "rev-parse", ref], cwd=path, capture_output=True, text=True).stdout.strip()
+
+@pytest.fixture
+def sparse_base(base_workspace, git_author_config):
+    """Base workspace with a couple of extra top-level directories and profiles."""
+    for name in ["docs", "tools"]:
+        (base_workspace / name).mkdir()
+        (base_workspace / name / f"{name}.txt").write_text(name)
+    subprocess.run(["git", "add", "docs", "tools"], cwd=base_workspace, check=True)
+    subprocess.run(["git"] + git_author_config + ["commit", "-m", "add dirs"], cwd=base_workspace, check=True)
+
+    config_path = base_workspace / "workspace.json"
+    config = json.loads(config_path.read_text())
+    config["profiles"] = {"docs": ["docs"], "backend": ["backend"]}
+    config_path.write_text(json.dumps(config))
+    return base_workspace
+
+@pytest.mark.asyncio
+async def test_create_with_profile(sparse_base):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(sparse_base)
+    await manager.initialize()
+
+    await manager.create_workspace(["docs-only"], profile="docs")
+    ws_path = sparse_base.parent / "base-ws-docs-only"
+    assert (ws_path / "docs" / "docs.txt").exists()
+    assert not (ws_path / "tools").exists()
+    # Submodule outside the profile is never initialised
+    assert not (ws_path / "backend" / "backend.txt").exists()
+
+    await manager.create_workspace(["backend-only"], profile="backend")
+    ws_path = sparse_base.parent / "base-ws-backend-only"
+    assert (ws_path / "backend" / "backend.txt").exists()
+    assert not (ws_path / "docs").exists()
+
+    saved = json.loads((sparse_base / "workspace.json").read_text())
+    assert saved["workspaces"]["docs-only"]["profile"] == "docs"
+
+@pytest.mark.asyncio
+async def test_partial_submodule_never_writes_excluded_paths(sparse_base, git_author_config):
+    # Give the backend submodule two directories and take only one of them
+    test_dir = sparse_base.parent
+    clone = test_dir / "backend-dirs"
+    subprocess.run(["git", "clone", "-q", str(test_dir / "remote-backend"), str(clone)], check=True)
+    for name in ["src", "fixtures"]:
+        (clone / name).mkdir()
+        (clone / name / f"{name}.txt").write_text(name)
+    subprocess.run(["git", "add", "."], cwd=clone, check=True)
+    subprocess.run(["git"] + git_author_config + ["commit", "-q", "-m", "dirs"], cwd=clone, check=True)
+    subprocess.run(["git", "push", "-q", "origin", "HEAD:main"], cwd=clone, check=True)
+    subprocess.run(["git", "pull", "-q", "origin", "main"], cwd=sparse_base / "backend", check=True)
+    subprocess.run(["git"] + git_author_config + ["commit", "-q", "-am", "bump backend"], cwd=sparse_base, check=True)
+
+    config_path = sparse_base / "workspace.json"
+    config = json.loads(config_path.read_text())
+    config["profiles"]["backend-src"] = ["backend/src"]
+    config_path.write_text(json.dumps(config))
+
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(sparse_base)
+    await manager.initialize()
+    ws_path = test_dir / "base-ws-partial"
+
+    written = []
+    original_set_sparse = manager.git.set_sparse_checkout
+    def set_sparse_checkout(path, patterns):
+        if path == ws_path / "backend":
+            written.append((path / "fixtures").exists())
+        original_set_sparse(path, patterns)
+    manager.git.set_sparse_checkout = set_sparse_checkout
+
+    await manager.create_workspace(["partial"], profile="backend-src")
+
+    assert written == [False]
+    assert (ws_path / "backend" / "src" / "src.txt").exists()
+    assert not (ws_path / "backend" / "fixtures").exists()
+    # Still a submodule git knows about, at the recorded commit
+    assert rev(ws_path / "backend", "HEAD") == rev(sparse_base, "HEAD:backend")
+    status = subprocess.run(["git", "submodule", "status", "backend"], cwd=ws_path, capture_output=True, text=True, check=True)
+    assert status.stdout.startswith(" ")
@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from workspace_cli.models import CommandState, PreviewCommand
+from workspace_cli.server import runner as runner_module
+from workspace_cli.server.runner import PreviewRunner
+
+@pytest.fixture
+def fast_restarts(monkeypatch):
+    monkeypatch.setattr(runner_module, "RESTART_BACKOFF", 0.05)
+    monkeypatch.setattr(runner_module, "CRASH_LOOP_RESTARTS", 3)
+
+async def _wait_for_state(runner, source, state, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while runner.commands[source].state != state:
+        assert loop.time() < deadline, f"{source} is {runner.commands[source].state}, not {state}"
+        await asyncio.sleep(0.02)
+
+@pytest.mark.asyncio
+async def test_crashed_command_is_restarted_in_place(tmp_path, fast_restarts):
+    runner = PreviewRunner(tmp_path, echo=False)
+    marker = tmp_path / "crashed"
+    # Crashes on the first run only
+    await runner.start_preview([f"if [ -e {marker} ]; then sleep 30; else touch {marker}; exit 7; fi", "sleep 30"])
+    first, _, _ = runner.processes[0]
+    other, _, _ = runner.processes[1]
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 5
+        while runner.commands["preview"].restarts == 0:
+            assert loop.time() < deadline
+            await asyncio.sleep(0.02)
+        status = runner.commands["preview"]
+        assert status.state == CommandState.RUNNING
+        assert status.last_exit_code == 7
+        process, source, _ = runner.processes[0]
+        assert process is not first and process.returncode is None and source == "preview"
+        assert status.pid == process.pid
+        # The other command is left alone
+        assert runner.processes[1][0] is other and other.returncode is None
+        texts = [line.text for line in runner.logs.since(0)]
+        assert any(text.startswith("Exited with code 7, restarting in") for text in texts)
+    finally:
+        await runner.stop()
+
+@pytest.mark.asyncio
+async def test_crash_loop_gives_up(tmp_path, fast_restarts):
+    runner = PreviewRunner(tmp_path, echo=False)
+    await runner.start_preview(["exit 1"])
+    try:
+        await _wait_for_state(runner, "preview", CommandState.FAILED)
+        assert runner.commands["preview"].restarts == 3
+        errors = [line.text for line in runner.logs.since(0) if line.stream == "error"]
+        assert "not restarting" in errors[-1]
+        # Backoff doubled between restarts
+        assert [text.split("restarting in ")[1] for text in errors[:-1]] == ["0.05s", "0.1s", "0.2s"]
+    finally:
+        await runner.stop()
+
+@pytest.mark.asyncio
+async def test_clean_exit_and_opt_out_are_not_restarted(tmp_path, fast_restarts):
+    runner = PreviewRunner(tmp_path, echo=False)
+    await runner.start_preview(["true", PreviewCommand(run="exit 2", restart=False)])
+    try:
+        await _wait_for_state(runner, "preview", CommandState.EXITED)
+        await _wait_for_state(runner, "preview-2", CommandState.CRASHED)
+        await asyncio.sleep(0.2)
+        assert all(status.restarts == 0 for status in runner.command_status())
+    finally:
+        await runner.stop()
+
+@pytest.mark.asyncio
+async def test_stop_does_not_restart(tmp_path, fast_restarts):
+    runner = PreviewRunner(tmp_path, echo=False)
+    await runner.start_preview(["sleep 30"])
+    process, _, _ = runner.processes[0]
+    await runner.stop()
+    await asyncio.sleep(0.2)
+    assert process.returncode is not None
+    assert runner.processes == [] and runner.commands == {}
+
+@pytest.mark.asyncio
+async def test_stop_during_restart_stops_the_new_process(tmp_path, fast_restarts):
+    runner = PreviewRunner(tmp_path, echo=False)
+    spawned = []
+    spawn = runner._spawn
+
+    async def slow_spawn(cmd, source):
+        if spawned:
+            # The restart: stop() is called while this is in progress
+            await asyncio.sleep(0.3)
+        process = await spawn(cmd, source)
+        spawned.append(process)
+        return process
+    runner._spawn = slow_spawn
+
+    marker = tmp_path / "crashed"
+    await runner.start_preview([f"if [ -e {marker} ]; then sleep 30; else touch {marker}; exit 1; fi"])
+    await _wait_for_state(runner, "preview", CommandState.RESTARTING)
+    await asyncio.sleep(0.1)
+    await runner.stop()
+
+    assert len(spawned) == 2
+    assert spawned[1].returncode is not None
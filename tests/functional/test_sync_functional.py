@@ -254,3 +254,26 @@ def test_sync_updates_submodule_to_main(base_workspace, run_cli, daemon):
     # Verify still on main
     res = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=backend_path, capture_output=True, text=True)
     assert res.stdout.strip() == "main", "Submodule should be on main branch"
+
+@pytest.mark.asyncio
+async def test_sync_base_without_all(base_workspace):
+    from workspace_cli.models import SyncStatus
+    from workspace_cli.server.manager import WorkspaceManager
+
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    test_dir = base_workspace.parent
+    update = test_dir / "main-update-base"
+    subprocess.run(["git", "clone", "-q", str(test_dir / "remote-main"), str(update)], check=True)
+    (update / "base_update.txt").write_text("update")
+    subprocess.run(["git", "add", "."], cwd=update, check=True)
+    subprocess.run(["git", "-c", "user.email=test@example.com", "-c", "user.name=Test User", "commit", "-q", "-m", "update"], cwd=update, check=True)
+    subprocess.run(["git", "push", "-q"], cwd=update, check=True)
+
+    result = await manager.sync_workspace("base", rebuild_preview=False)
+
+    # Only the base, no placeholder entry
+    assert [(ws.name, ws.status) for ws in result.workspaces] == [("base", SyncStatus.SUCCEEDED)]
+    assert (base_workspace / "base_update.txt").exists()
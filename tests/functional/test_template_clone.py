@@ -0,0 +1,65 @@
+import pytest
+import subprocess
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.models import CreateStatus
+
+def git(path, *args):
+    return subprocess.run(["git"] + list(args), cwd=path, capture_output=True, text=True, check=True).stdout.strip()
+
+@pytest.mark.asyncio
+async def test_create_from_template(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    await manager.create_workspace(["golden"])
+    golden = base_workspace.parent / "base-ws-golden"
+    # "Install dependencies" in the template
+    (golden / "node_modules").mkdir()
+    (golden / "node_modules" / "dep.js").write_text("dep")
+    (golden / "backend" / "build-cache").write_text("warm")
+
+    result = await manager.create_workspace(["agent"], template="golden")
+    assert result.workspaces[0].status == CreateStatus.CREATED
+
+    ws_path = base_workspace.parent / "base-ws-agent"
+    assert (ws_path / "node_modules" / "dep.js").read_text() == "dep"
+    assert (ws_path / "backend" / "build-cache").read_text() == "warm"
+    assert git(ws_path, "rev-parse", "--abbrev-ref", "HEAD") == "workspace-agent/stand"
+    assert git(ws_path, "status", "--porcelain", "--untracked-files=no") == ""
+
+    # The submodule has its own git dir, bound to the new checkout
+    assert git(ws_path / "backend", "rev-parse", "--show-toplevel") == str(ws_path / "backend")
+    assert git(ws_path / "backend", "status", "--porcelain", "--untracked-files=no") == ""
+    assert git(ws_path / "backend", "rev-parse", "--absolute-git-dir") != git(golden / "backend", "rev-parse", "--absolute-git-dir")
+    git(ws_path / "backend", "checkout", "-b", "agent-only")
+    assert git(golden / "backend", "rev-parse", "--abbrev-ref", "HEAD") != "agent-only"
+
+def test_template_and_profile_conflict(base_workspace):
+    import asyncio
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    asyncio.run(manager.initialize())
+    manager.config.profiles = {"docs": ["docs"]}
+    with pytest.raises(ValueError):
+        asyncio.run(manager.create_workspace(["x"], profile="docs", template="golden"))
+
+@pytest.mark.asyncio
+async def test_template_copy_waits_for_template_lock(base_workspace):
+    import asyncio
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+
+    await manager.create_workspace(["golden"])
+    golden = base_workspace.parent / "base-ws-golden"
+    ws_path = base_workspace.parent / "base-ws-copy"
+
+    # E.g. a sync of the template is rewriting it
+    async with manager._repo_lock(golden):
+        task = asyncio.create_task(manager.create_workspace(["copy"], template="golden"))
+        await asyncio.sleep(0.3)
+        assert not ws_path.exists()
+    result = await task
+    assert result.workspaces[0].status == CreateStatus.CREATED
+    assert git(ws_path, "status", "--porcelain", "--untracked-files=no") == ""
@@ -0,0 +1,26 @@
+import pytest
+import subprocess
+from workspace_cli.server.manager import WorkspaceManager
+
+@pytest.mark.asyncio
+async def test_delete_workspace_uses_trash(base_workspace):
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(base_workspace)
+    await manager.initialize()
+    await manager.create_workspace(["doomed"])
+    ws_path = base_workspace.parent / "base-ws-doomed"
+    (ws_path / "node_modules").mkdir()
+    (ws_path / "node_modules" / "dep.js").write_text("dep")
+
+    await manager.delete_workspace("doomed")
+
+    assert not ws_path.exists()
+    worktrees = subprocess.run(["git", "worktree", "list"], cwd=base_workspace, capture_output=True, text=True).stdout
+    assert "base-ws-doomed" not in worktrees
+    assert manager.trash.drain(timeout=30)
+    assert list(manager.trash.root.iterdir()) == []
+    assert (await manager.get_status()).trash.deleted_bytes > 0
+
+    # The name can be reused straight away
+    await manager.create_workspace(["doomed"])
+    assert (ws_path / "backend" / "backend.txt").exists()
@@ -1,9 +1,11 @@
 import pytest
 import asyncio
+import time
 from pathlib import Path
 from unittest.mock import MagicMock
 from workspace_cli.server.manager import WorkspaceManager
-from workspace_cli.server.git import MockGitProvider
+from workspace_cli.server.git import MockGitProvider, GitError
+from workspace_cli.models import Workspace, SyncStatus
 
 @pytest.fixture
 def manager():
@@ -56,3 +58,89 @@ def test_concurrent_mixed_ops(manager):
         assert "ws2" in manager.workspaces
 
     asyncio.run(_test())
+
+def test_sync_all_runs_workspaces_concurrently(manager):
+    class SlowGit(MockGitProvider):
+        def __init__(self):
+            super().__init__()
+            self.active = 0
+            self.max_active = 0
+
+        def rebase(self, path, upstream=None):
+            super().rebase(path, upstream)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            time.sleep(0.1)
+            self.active -= 1
+            if path.name == "ws3":
+                raise GitError("conflict")
+
+    async def _test():
+        manager.git = SlowGit()
+        for name in ["ws1", "ws2", "ws3"]:
+            manager.workspaces[name] = Workspace(name=name, path=f"/tmp/{name}", branch="feature")
+
+        result = await manager.sync_workspace("ws1", sync_all=True, rebuild_preview=False)
+
+        # Workspaces overlap instead of running one after another
+        assert manager.git.max_active > 1
+        statuses = {ws.name: ws.status for ws in result.workspaces}
+        assert statuses == {
+            "base": SyncStatus.SUCCEEDED,
+            "ws1": SyncStatus.SUCCEEDED,
+            "ws2": SyncStatus.SUCCEEDED,
+            "ws3": SyncStatus.FAILED,
+        }
+        assert not manager.is_syncing
+
+    asyncio.run(_test())
+
+def test_sync_reports_skipped(manager):
+    async def _test():
+        result = await manager.sync_workspace("missing", rebuild_preview=False)
+        assert result.workspaces[0].name == "missing"
+        assert result.workspaces[0].status == SyncStatus.SKIPPED
+
+    asyncio.run(_test())
+
+def test_fine_grained_locks(manager):
+    async def _test():
+        # A long preview switch holds the preview slot...
+        async with manager._preview_lock:
+            # ...yet workspaces can still be created
+            await asyncio.wait_for(manager.create_workspace(["ws1"]), timeout=1)
+            assert "ws1" in manager.workspaces
+
+        # get_status never waits, even behind a registry operation
+        async with manager._registry_lock:
+            status = await asyncio.wait_for(manager.get_status(), timeout=1)
+            assert [ws.name for ws in status.workspaces] == ["ws1"]
+
+    asyncio.run(_test())
+
+def test_batch_create_runs_concurrently(manager):
+    class SlowGit(MockGitProvider):
+        def update_submodules(self, path, paths=None, jobs=None):
+            time.sleep(0.3)
+            super().update_submodules(path, paths, jobs)
+            if path.name.endswith("-bad"):
+                raise GitError("clone failed")
+
+    from workspace_cli.models import WorkspaceConfig, CreateStatus
+    manager.git = SlowGit()
+    manager.config = WorkspaceConfig(base_path=manager.base_path, create_concurrency=4)
+    manager.save_config = MagicMock()
+
+    start = time.monotonic()
+    result = asyncio.run(manager.create_workspace(["a", "b", "bad", "c"]))
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.0
+    statuses = {ws.name: ws.status for ws in result.workspaces}
+    assert statuses == {"a": CreateStatus.CREATED, "b": CreateStatus.CREATED,
+                        "bad": CreateStatus.FAILED, "c": CreateStatus.CREATED}
+    assert "bad" not in manager.workspaces
+    assert sorted(manager.config.workspaces) == ["a", "b", "c"]
+    manager.save_config.assert_called_once()
+    # The half-created worktree is removed so the name can be retried
+    assert ("prune_worktrees", manager.base_path) in manager.git.calls
@@ -0,0 +1,50 @@
+import os
+from workspace_cli.utils.fs import clone_tree, is_git_object, tree_size
+
+def test_clone_tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "node_modules" / "dep").mkdir(parents=True)
+    (src / "node_modules" / "dep" / "index.js").write_text("dep")
+    (src / "app.js").write_text("app")
+    (src / ".git").write_text("gitdir: elsewhere")
+    os.symlink("node_modules/dep", src / "dep-link")
+
+    dst = tmp_path / "dst"
+    dst.mkdir()
+    (dst / ".git").write_text("gitdir: mine")
+    method = clone_tree(src, dst, ignore=lambda dir, names: [n for n in names if n == ".git"])
+
+    assert method in ("reflink", "copy")
+    assert (dst / "node_modules" / "dep" / "index.js").read_text() == "dep"
+    assert (dst / "app.js").read_text() == "app"
+    assert os.readlink(dst / "dep-link") == "node_modules/dep"
+    assert (dst / ".git").read_text() == "gitdir: mine"
+
+def test_clone_tree_never_shares_working_tree_files(tmp_path):
+    src = tmp_path / "src"
+    (src / "backend").mkdir(parents=True)
+    (src / "backend" / "backend.txt").write_text("template")
+    dst = tmp_path / "dst"
+
+    clone_tree(src, dst)
+    with open(dst / "backend" / "backend.txt", "a") as f:
+        f.write(" edited in place")
+
+    assert (src / "backend" / "backend.txt").read_text() == "template"
+    assert os.stat(src / "backend" / "backend.txt").st_ino != os.stat(dst / "backend" / "backend.txt").st_ino
+
+def test_is_git_object():
+    assert is_git_object("objects/ab/cdef0123")
+    assert is_git_object("objects/pack/pack-1.pack")
+    assert not is_git_object("objects/info/alternates")
+    assert not is_git_object("index")
+    assert not is_git_object("refs/heads/main")
+
+def test_tree_size_excludes_subtrees(tmp_path):
+    (tmp_path / "objects").mkdir()
+    (tmp_path / "objects" / "pack").write_bytes(b"x" * 100000)
+    (tmp_path / "modules" / "sub").mkdir(parents=True)
+    (tmp_path / "modules" / "sub" / "pack").write_bytes(b"x" * 100000)
+
+    assert tree_size(tmp_path, [tmp_path / "modules"]) < tree_size(tmp_path)
+    assert tree_size(tmp_path, [tmp_path / "modules"]) == tree_size(tmp_path / "objects")
@@ -1,4 +1,5 @@
 import pytest
+import subprocess
 from pathlib import Path
 from workspace_cli.server.git import MockGitProvider, ShellGitProvider, GitError
 
@@ -36,3 +37,21 @@ def test_mock_git_provider_methods():
     
     provider.set_upstream(path, "branch", "upstream")
     assert ("set_upstream", path, "branch", "upstream") in provider.calls
+
+def test_shell_is_ancestor(tmp_path):
+    provider = ShellGitProvider()
+    git = ["git", "-c", "user.email=test@example.com", "-c", "user.name=Test User"]
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "one"], cwd=tmp_path, check=True)
+    first = provider.get_commit_hash(tmp_path)
+    subprocess.run(git + ["commit", "-q", "--allow-empty", "-m", "two"], cwd=tmp_path, check=True)
+
+    assert provider.is_ancestor(tmp_path, first, "HEAD")
+    assert not provider.is_ancestor(tmp_path, "HEAD", first)
+    with pytest.raises(GitError):
+        provider.is_ancestor(tmp_path, "no-such-ref")
+
+    (tmp_path / "a file.txt").write_text("a")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "three"], cwd=tmp_path, check=True)
+    assert provider.diff_names(tmp_path, first, "HEAD") == [("A", "a file.txt")]
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from workspace_cli.models import HookSpec, PreviewHooks
+from workspace_cli.server.hooks import build_hook_graph, run_hook_graph
+
+def test_plain_commands_run_in_sequence():
+    hooks = build_hook_graph(["a", "b", "c"])
+    assert [hook.needs for hook in hooks] == [[], ["#1"], ["#2"]]
+
+def test_groups_and_explicit_needs():
+    config = PreviewHooks(before_clear=[
+        [{"name": "clean-frontend", "run": "rm -rf frontend/.cache"}, {"name": "clean-backend", "run": "rm -rf backend/.cache"}],
+        "make",
+        {"name": "lint", "run": "make lint", "needs": ["clean-frontend"], "timeout": 30}
+    ])
+    hooks = {hook.name: hook for hook in build_hook_graph(config.before_clear)}
+
+    assert hooks["clean-frontend"].needs == [] and hooks["clean-backend"].needs == []
+    assert hooks["#3"].needs == ["clean-frontend", "clean-backend"]
+    assert hooks["lint"].needs == ["clean-frontend"]
+    assert hooks["lint"].timeout == 30
+
+@pytest.mark.parametrize("entries, message", [
+    ([HookSpec(name="a", run="x"), HookSpec(name="a", run="y")], "Duplicate"),
+    ([HookSpec(name="a", run="x", needs=["missing"])], "unknown"),
+    ([HookSpec(name="a", run="x", needs=["b"]), HookSpec(name="b", run="y", needs=["a"])], "cycle"),
+])
+def test_invalid_graphs(entries, message):
+    with pytest.raises(ValueError, match=message):
+        build_hook_graph(entries)
+
+@pytest.mark.asyncio
+async def test_independent_hooks_overlap_and_failure_skips_dependents():
+    hooks = build_hook_graph([
+        [HookSpec(name="a", run="a"), HookSpec(name="b", run="b"), HookSpec(name="fail", run="fail")],
+        HookSpec(name="after", run="after")
+    ])
+    running, peak, ran = set(), [0], []
+
+    async def run_one(hook):
+        running.add(hook.name)
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.05)
+        running.discard(hook.name)
+        ran.append(hook.name)
+        if hook.name == "fail":
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        await run_hook_graph(hooks, run_one)
+    assert peak[0] == 3
+    assert "after" not in ran
@@ -0,0 +1,52 @@
+import pytest
+import asyncio
+from workspace_cli.server.jobs import JobManager, report_progress
+from workspace_cli.models import JobStatus
+
+@pytest.mark.asyncio
+async def test_job_reports_progress_and_result():
+    jobs = JobManager()
+
+    async def work():
+        report_progress("fetch", "Fetching base")
+        # Progress from a worker thread is delivered on the event loop
+        await asyncio.to_thread(report_progress, "rebase", "Syncing ws1")
+        return {"synced": 1}
+
+    job = jobs.submit("sync", work)
+    assert job.status == JobStatus.PENDING
+
+    events = [event async for event in jobs.events(job.id)]
+    assert [e.phase for e in events] == ["started", "fetch", "rebase", "succeeded"]
+
+    job = jobs.get(job.id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"synced": 1}
+
+@pytest.mark.asyncio
+async def test_job_failure_and_cancel():
+    jobs = JobManager()
+
+    async def fail():
+        raise ValueError("Workspace x not found")
+
+    failed = jobs.submit("preview", fail)
+    await jobs.wait(failed.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "Workspace x not found"
+
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    job = jobs.submit("sync", slow)
+    await started.wait()
+    jobs.cancel(job.id)
+    await jobs.wait(job.id)
+    assert job.status == JobStatus.CANCELLED
+
+def test_report_progress_outside_job():
+    # Local CLI mode has no job; reporting must be harmless
+    report_progress("fetch", "nothing listens")
@@ -0,0 +1,61 @@
+import pytest
+from workspace_cli.models import LogStream
+from workspace_cli.server import archive as archive_module
+from workspace_cli.server.archive import LogArchive, list_sessions, read_session
+from workspace_cli.server.logs import LogBuffer
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(archive_module, "BLOCK_BYTES", 2000)
+    monkeypatch.setattr(archive_module, "SEGMENT_BYTES", 10000)
+
+def _write(archive, buffer, count, batch=50):
+    lines = [buffer.append("preview", LogStream.STDOUT, f"line {i} " + "x" * 80) for i in range(count)]
+    for start in range(0, count, batch):
+        archive.write(lines[start:start + batch])
+    return lines
+
+def test_round_trip_while_writing(tmp_path, small_blocks):
+    archive = LogArchive(tmp_path)
+    archive.start_session("A", 0)
+    lines = _write(archive, LogBuffer(), 1000)
+
+    # Readable before close: the open member is sync-flushed after each batch
+    session = archive.session_dir
+    assert [line.seq for line in read_session(session)] == list(range(1000))
+    assert len(list(session.glob("*.ndjson.gz"))) > 5
+
+    archive.close()
+    assert [line.text for line in read_session(session)] == [line.text for line in lines]
+
+def test_since_seeks_to_the_covering_segment(tmp_path, small_blocks, monkeypatch):
+    archive = LogArchive(tmp_path)
+    archive.start_session("A", 0)
+    lines = _write(archive, LogBuffer(), 1000)
+    archive.close()
+
+    opened = []
+    original = archive_module._read_segment
+    monkeypatch.setattr(archive_module, "_read_segment", lambda path, offset: (opened.append((path.name, offset)), original(path, offset))[1])
+
+    result = list(read_session(archive.session_dir, since_seq=900))
+    assert [line.seq for line in result] == list(range(900, 1000))
+    # Only the tail of the session is decompressed
+    assert len(opened) <= 3 and opened[0][0] != "000001.ndjson.gz"
+
+    by_time = list(read_session(archive.session_dir, since_time=lines[500].time))
+    assert by_time[0].seq <= 500 and by_time[-1].seq == 999
+
+def test_retention_drops_old_sessions_first(tmp_path, small_blocks):
+    archive = LogArchive(tmp_path, retention_bytes=30000)
+    for name in ("A", "B", "C"):
+        archive.start_session(name, 0)
+        _write(archive, LogBuffer(), 1500)
+    archive.close()
+
+    sessions = list_sessions(tmp_path)
+    assert sessions[-1].workspace == "C"
+    assert "A" not in [info.workspace for info in sessions]
+    assert sum(info.size_bytes for info in sessions) <= 30000 + 10000
+    # What is left of the current session is still readable, newest lines included
+    assert list(read_session(tmp_path / sessions[-1].id))[-1].seq == 1499
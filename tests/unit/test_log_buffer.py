@@ -0,0 +1,121 @@
+import pytest
+from workspace_cli.models import LogFilter, LogOverflowPolicy, LogStream
+from workspace_cli.server.logs import LineSplitter, LogBuffer, LogMatcher, LogSubscriber
+
+def test_sequence_numbers_and_capacity():
+    buffer = LogBuffer(capacity=3)
+    for i in range(5):
+        buffer.append("preview", LogStream.STDOUT, f"line {i}")
+
+    assert [line.seq for line in buffer.lines] == [2, 3, 4]
+    assert buffer.first_seq == 2
+    assert buffer.next_seq == 5
+
+def test_since_and_tail():
+    buffer = LogBuffer(capacity=3)
+    for i in range(5):
+        buffer.append("preview", LogStream.STDOUT, f"line {i}")
+
+    # Lines that fell out of the buffer are skipped
+    assert [line.seq for line in buffer.since(0)] == [2, 3, 4]
+    assert [line.seq for line in buffer.since(4)] == [4]
+    assert buffer.since(5) == []
+    assert [line.text for line in buffer.tail(2)] == ["line 3", "line 4"]
+    assert len(buffer.tail(10)) == 3
+    assert buffer.tail(0) == []
+
+def test_reset_starts_new_session():
+    buffer = LogBuffer()
+    buffer.append("preview", LogStream.STDOUT, "old")
+    session = buffer.session
+
+    buffer.reset()
+    line = buffer.append("preview", LogStream.STDOUT, "new")
+
+    assert line.session == session + 1
+    assert line.seq == 0
+    assert (line.source, line.stream, line.text) == ("preview", LogStream.STDOUT, "new")
+    assert buffer.since(0) == [line]
+
+def _fill(subscriber, count):
+    buffer = LogBuffer()
+    for i in range(count):
+        subscriber.put(buffer.append("preview", LogStream.STDOUT, f"line {i}"))
+    return buffer
+
+@pytest.mark.asyncio
+async def test_subscriber_drop_oldest_reports_gap():
+    subscriber = LogSubscriber(maxsize=3, policy=LogOverflowPolicy.DROP_OLDEST)
+    _fill(subscriber, 10000)
+
+    assert len(subscriber.queue) == 3
+    first = await subscriber.get()
+    assert first.seq == 9997
+    assert first.dropped == 9997
+    assert (await subscriber.get()).dropped == 0
+
+@pytest.mark.asyncio
+async def test_subscriber_drop_newest_reports_gap_after_queued_lines():
+    subscriber = LogSubscriber(maxsize=2, policy=LogOverflowPolicy.DROP_NEWEST)
+    buffer = _fill(subscriber, 5)
+
+    assert [(await subscriber.get()).seq for _ in range(2)] == [0, 1]
+    subscriber.put(buffer.append("preview", LogStream.STDOUT, "after"))
+    line = await subscriber.get()
+    assert (line.seq, line.dropped) == (5, 3)
+    assert subscriber.dropped == 3
+
+@pytest.mark.asyncio
+async def test_subscriber_disconnect_and_metrics():
+    subscriber = LogSubscriber(maxsize=2, policy=LogOverflowPolicy.DISCONNECT)
+    buffer = _fill(subscriber, 3)
+
+    assert subscriber.closed
+    assert await subscriber.get() is None
+    metrics = subscriber.metrics(buffer.next_seq)
+    assert metrics.queued == 0
+    assert metrics.dropped == 1
+    assert metrics.lag == 3
+
+@pytest.mark.asyncio
+async def test_subscriber_close_delivers_queued_lines():
+    subscriber = LogSubscriber()
+    _fill(subscriber, 2)
+    subscriber.close()
+
+    assert (await subscriber.get()).seq == 0
+    assert (await subscriber.get()).seq == 1
+    assert await subscriber.get() is None
+
+def test_line_splitter_carries_partial_lines_and_characters():
+    splitter = LineSplitter()
+    data = "héllo\r\nwörld\npartial".encode()
+
+    lines = []
+    for i in range(len(data)):
+        lines += splitter.feed(data[i:i + 1])
+
+    assert lines == ["héllo", "wörld"]
+    assert splitter.flush() == ["partial"]
+    assert splitter.flush() == []
+
+def test_line_splitter_truncates_long_lines():
+    splitter = LineSplitter(max_length=10)
+
+    assert splitter.feed(b"x" * 8) == []
+    assert splitter.feed(b"x" * 100000) == []
+    assert splitter.feed(b"y\nnext\n") == ["x" * 10 + " [... 99999 characters truncated]", "next"]
+
+def test_matcher_criteria():
+    buffer = LogBuffer()
+    out = buffer.append("preview-2", LogStream.STDOUT, "compiled")
+    err = buffer.append("before_clear:codegen", LogStream.STDERR, "ERROR: missing schema")
+
+    assert LogMatcher(LogFilter(sources=["preview-2"])).matches(out)
+    assert not LogMatcher(LogFilter(sources=["preview"])).matches(out)
+    assert LogMatcher(LogFilter(stages=["preview"])).matches(out)
+    assert LogMatcher(LogFilter(stages=["before_clear"], streams=[LogStream.STDERR])).matches(err)
+    assert not LogMatcher(LogFilter(stages=["before_clear"], streams=[LogStream.STDOUT])).matches(err)
+    assert LogMatcher(LogFilter(grep=r"ERROR|WARN")).matches(err)
+    assert not LogMatcher(LogFilter(grep=r"ERROR|WARN")).matches(out)
+    assert LogFilter(streams=[LogStream.STDERR], grep="x").key() == LogFilter(grep="x", streams=["stderr", "stderr"]).key()
@@ -35,3 +35,18 @@ def test_workspace_config():
     assert config.base_path == Path("/base")
     assert len(config.workspaces) == 1
 
+
+def test_preview_command_with_readiness_probe():
+    import pytest
+    from pydantic import ValidationError
+
+    config = WorkspaceConfig(
+        base_path=Path("/tmp"),
+        preview=["npm run worker", {"run": "npm run dev", "ready": {"url": "http://localhost:3000"}}]
+    )
+    assert config.preview[0] == "npm run worker"
+    assert config.preview[1].ready.url == "http://localhost:3000"
+    assert config.preview[1].ready.timeout == 120
+
+    with pytest.raises(ValidationError, match="exactly one"):
+        WorkspaceConfig(base_path=Path("/tmp"), preview=[{"run": "x", "ready": {"port": 1, "log": "ok"}}])
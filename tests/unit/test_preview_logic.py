@@ -40,7 +40,7 @@ def test_switch_preview(manager):
                 mock_copy.assert_called()
                 
                 # Verify Watcher
-                MockWatcher.assert_called_with(Path("/tmp/feature"), Path("/tmp/base"))
+                MockWatcher.assert_called_with(Path("/tmp/feature"), Path("/tmp/base"), include_paths=None)
                 mock_watcher_instance.start.assert_called()
                 
                 # Verify Session
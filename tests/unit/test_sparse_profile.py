@@ -0,0 +1,63 @@
+import pytest
+import asyncio
+from pathlib import Path
+from workspace_cli.config import in_profile, split_profile
+from workspace_cli.models import RepoConfig, WorkspaceConfig
+from workspace_cli.server.manager import WorkspaceManager
+from workspace_cli.server.git import MockGitProvider
+
+@pytest.fixture
+def manager(tmp_path):
+    WorkspaceManager._instance = None
+    git = MockGitProvider()
+    base = tmp_path / "base"
+    base.mkdir()
+    mgr = WorkspaceManager.get_instance(base, git_provider=git)
+    mgr.config = WorkspaceConfig(
+        base_path=base,
+        profiles={"frontend": ["frontend"]}
+    )
+    return mgr
+
+def test_in_profile():
+    patterns = ["frontend/src"]
+    assert in_profile(Path("README.md"), patterns)
+    assert in_profile(Path("frontend/package.json"), patterns)
+    assert in_profile(Path("frontend/src/app/main.js"), patterns)
+    assert not in_profile(Path("backend/api.py"), patterns)
+    assert not in_profile(Path("frontend/test/app.js"), patterns)
+    assert in_profile(Path("backend/api.py"), None)
+
+def test_split_profile():
+    submodules = [
+        RepoConfig(name="frontend", path=Path("frontend")),
+        RepoConfig(name="backend", path=Path("backend")),
+        RepoConfig(name="ui", path=Path("packages/ui")),
+    ]
+    selection = split_profile(["frontend", "packages/ui/src"], submodules)
+    assert selection == {"frontend": None, "packages/ui": ["src"]}
+
+    # A parent directory covers the submodule completely
+    assert split_profile(["packages"], submodules) == {"packages/ui": None}
+
+def test_create_workspace_with_profile(manager):
+    async def _test():
+        await manager.create_workspace(["ws1"], profile="frontend")
+
+        ws_path = manager.base_path.parent / "base-ws1"
+        calls = manager.git.calls
+        assert ("create_worktree", manager.base_path, "workspace-ws1/stand", ws_path, True) in calls
+        assert ("set_sparse_checkout", ws_path, ["frontend"]) in calls
+        assert ("update_submodules", ws_path) not in calls
+        assert manager.workspaces["ws1"].profile == "frontend"
+        assert manager.config.workspaces["ws1"].profile == "frontend"
+
+    asyncio.run(_test())
+
+def test_create_workspace_unknown_profile(manager):
+    async def _test():
+        with pytest.raises(ValueError):
+            await manager.create_workspace(["ws1"], profile="missing")
+        assert "ws1" not in manager.workspaces
+
+    asyncio.run(_test())
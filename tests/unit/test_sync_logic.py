@@ -3,8 +3,8 @@ import asyncio
 from unittest.mock import MagicMock, patch, AsyncMock
 from pathlib import Path
 from workspace_cli.server.manager import WorkspaceManager
-from workspace_cli.server.git import MockGitProvider
-from workspace_cli.models import Workspace, PreviewSession, PreviewStatus
+from workspace_cli.server.git import MockGitProvider, GitError
+from workspace_cli.models import Workspace, PreviewSession, PreviewStatus, WorkspaceConfig
 
 @pytest.fixture
 def manager():
@@ -24,7 +24,7 @@ def test_sync_workspace(manager):
         await manager.sync_workspace("ws1", rebuild_preview=False)
         
         assert ("fetch", Path("/tmp/ws1")) in manager.git.calls
-        assert ("pull", Path("/tmp/ws1"), True) in manager.git.calls
+        assert ("rebase", Path("/tmp/ws1")) in manager.git.calls
         manager._switch_preview_internal.assert_not_called()
         
         # Test Sync with Rebuild (but no active session)
@@ -40,6 +40,14 @@ def test_sync_workspace(manager):
             status=PreviewStatus.RUNNING
         )
         
+        # Previewed workspace is refreshed in place rather than re-switched
+        manager._refresh_preview = AsyncMock()
+        await manager.sync_workspace("ws1", rebuild_preview=True)
+        manager._refresh_preview.assert_called_with("ws1", {"": "hash123"})
+        manager._switch_preview_internal.assert_not_called()
+
+        # Falls back to a full rebuild if the refresh fails
+        manager._refresh_preview = AsyncMock(side_effect=GitError("bad revision"))
         await manager.sync_workspace("ws1", rebuild_preview=True)
         manager._switch_preview_internal.assert_called_with("ws1", rebuild=True)
 
@@ -50,9 +58,137 @@ def test_sync_all(manager):
         manager.workspaces["ws1"] = Workspace(name="ws1", path="/tmp/ws1", branch="feature")
         manager.workspaces["ws2"] = Workspace(name="ws2", path="/tmp/ws2", branch="feature")
         
+        # Worktrees share the object store of the base
+        for path in ["/tmp/base", "/tmp/ws1", "/tmp/ws2"]:
+            manager.git.responses[f"get_common_dir:{path}"] = Path("/tmp/base/.git")
+
         await manager.sync_workspace("ws1", sync_all=True, rebuild_preview=False)
         
+        fetch_calls = [c for c in manager.git.calls if c[0] == "fetch"]
+        assert fetch_calls == [("fetch", Path("/tmp/base"))]
+        assert ("rebase", Path("/tmp/base")) in manager.git.calls
+        assert ("rebase", Path("/tmp/ws1")) in manager.git.calls
+        assert ("rebase", Path("/tmp/ws2")) in manager.git.calls
+
+    asyncio.run(_test())
+
+def test_sync_collects_submodule_errors(tmp_path):
+    class FailingGit(MockGitProvider):
+        def rebase(self, path, upstream=None):
+            super().rebase(path, upstream)
+            if path.name == "broken":
+                raise GitError("conflict")
+
+    ws_path = tmp_path / "ws1"
+    ws_path.mkdir()
+    (ws_path / ".gitmodules").write_text(
+        '[submodule "ok"]\n\tpath = ok\n[submodule "broken"]\n\tpath = broken\n'
+    )
+    (ws_path / "ok").mkdir()
+    (ws_path / "broken").mkdir()
+
+    WorkspaceManager._instance = None
+    manager = WorkspaceManager.get_instance(tmp_path, git_provider=FailingGit())
+    manager.config = WorkspaceConfig(base_path=tmp_path, sync_jobs=2)
+    manager.workspaces["ws1"] = Workspace(name="ws1", path=str(ws_path), branch="feature")
+
+    result = asyncio.run(manager.sync_workspace("ws1", rebuild_preview=False))
+
+    assert ("update_submodules", ws_path) in manager.git.calls
+    assert ("rebase", ws_path / "ok") in manager.git.calls
+    assert result.workspaces[0].name == "ws1"
+    assert result.workspaces[0].submodule_errors == {"broken": "conflict"}
+
+def test_sync_skips_up_to_date_workspace(manager):
+    async def _test():
+        from datetime import datetime
+        manager.workspaces["ws1"] = Workspace(name="ws1", path="/tmp/ws1", branch="feature")
+        manager.preview_session = PreviewSession(
+            workspace_name="ws1",
+            start_time=datetime.now(),
+            status=PreviewStatus.RUNNING
+        )
+        manager._switch_preview_internal = AsyncMock()
+        manager.git.responses["is_ancestor:/tmp/ws1"] = True
+
+        result = await manager.sync_workspace("ws1", rebuild_preview=True)
+
         assert ("fetch", Path("/tmp/ws1")) in manager.git.calls
-        assert ("fetch", Path("/tmp/ws2")) in manager.git.calls
+        assert not [c for c in manager.git.calls if c[0] in ("rebase", "update_submodules")]
+        assert result.workspaces[0].changed is False
+        manager._switch_preview_internal.assert_not_called()
 
     asyncio.run(_test())
+
+def test_sync_applies_preview_changes_incrementally(tmp_path):
+    class MovingGit(MockGitProvider):
+        def __init__(self):
+            super().__init__()
+            self.head = "old"
+
+        def get_commit_hash(self, path, ref="HEAD"):
+            super().get_commit_hash(path, ref)
+            return self.head
+
+        def rebase(self, path, upstream=None):
+            super().rebase(path, upstream)
+            self.head = "new"
+
+    base_path = tmp_path / "base"
+    ws_path = tmp_path / "ws1"
+    for root in (base_path, ws_path):
+        (root / "src").mkdir(parents=True)
+        (root / "package.json").write_text("{}")
+    (ws_path / "src" / "app.js").write_text("v2")
+    (base_path / "src" / "app.js").write_text("v1")
+    (base_path / "src" / "old.js").write_text("gone")
+
+    WorkspaceManager._instance = None
+    git = MovingGit()
+    git.responses[f"diff_names:{ws_path}"] = [("M", "src/app.js"), ("D", "src/old.js")]
+    manager = WorkspaceManager.get_instance(base_path, git_provider=git)
+    manager.config = WorkspaceConfig(base_path=base_path, preview=["npm run dev"], preview_dependencies=["package.json"])
+    manager.workspaces["ws1"] = Workspace(name="ws1", path=str(ws_path), branch="feature")
+    from datetime import datetime
+    manager.preview_session = PreviewSession(workspace_name="ws1", start_time=datetime.now(), status=PreviewStatus.RUNNING)
+    manager.runner = MagicMock()
+    manager.runner.stop = AsyncMock()
+    manager.runner.restart = AsyncMock()
+    manager._switch_preview_internal = AsyncMock()
+
+    result = asyncio.run(manager.sync_workspace("ws1", rebuild_preview=True))
+
+    assert result.workspaces[0].changed is True
+    assert ("diff_names", ws_path, "old", "new") in git.calls
+    assert (base_path / "src" / "app.js").read_text() == "v2"
+    assert not (base_path / "src" / "old.js").exists()
+    manager._switch_preview_internal.assert_not_called()
+    # No dependency changed, so the processes keep running
+    manager.runner.restart.assert_not_called()
+
+    # A dependency change restarts them, without ending the log session
+    git.head = "old"
+    git.responses[f"diff_names:{ws_path}"] = [("M", "package.json")]
+    asyncio.run(manager.sync_workspace("ws1", rebuild_preview=True))
+    manager.runner.restart.assert_called_once_with(["npm run dev"])
+    manager.runner.stop.assert_not_called()
+
+def test_changed_files_handles_added_and_removed_submodules(tmp_path):
+    from workspace_cli.server.git import MockGitProvider, EMPTY_TREE
+
+    WorkspaceManager._instance = None
+    git = MockGitProvider()
+    manager = WorkspaceManager.get_instance(tmp_path, git_provider=git)
+    git.responses[f"diff_names:{tmp_path}"] = [("D", "old-sub"), ("A", "new-sub"), ("M", "README.md")]
+    git.responses[f"diff_names:{tmp_path / 'new-sub'}"] = [("A", "package.json"), ("A", "src/index.js")]
+    git.responses[f"diff_names:{tmp_path / 'old-sub'}"] = [("D", "lib.py")]
+
+    changes = manager._changed_files(tmp_path, {"": "old", "old-sub": "sub1"}, {"": "new", "new-sub": "sub2"})
+
+    assert changes == [
+        ("D", "old-sub"), ("M", "README.md"),
+        ("A", "new-sub/package.json"), ("A", "new-sub/src/index.js"),
+        ("D", "old-sub/lib.py"),
+    ]
+    assert ("diff_names", tmp_path / "new-sub", EMPTY_TREE, "sub2") in git.calls
+    assert ("diff_names", tmp_path / "old-sub", "sub1", EMPTY_TREE) in git.calls
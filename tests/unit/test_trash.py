@@ -0,0 +1,30 @@
+from workspace_cli.server.trash import Trash
+
+def test_trash_moves_and_deletes(tmp_path):
+    victim = tmp_path / "ws" / "node_modules"
+    victim.mkdir(parents=True)
+    (victim / "big.js").write_bytes(b"x" * 100000)
+
+    trash = Trash(tmp_path / ".base-trash")
+    target = trash.move(tmp_path / "ws")
+
+    assert not (tmp_path / "ws").exists()
+    assert target.parent == tmp_path / ".base-trash"
+    assert trash.drain(timeout=10)
+    assert not target.exists()
+    status = trash.status()
+    assert status.entries == 0
+    assert status.deleted_bytes >= 100000
+
+    # Missing paths are ignored
+    assert trash.move(tmp_path / "missing") is None
+
+def test_trash_resumes_leftovers(tmp_path):
+    leftover = tmp_path / ".base-trash" / "old-1234"
+    leftover.mkdir(parents=True)
+    (leftover / "file").write_text("x")
+
+    trash = Trash(tmp_path / ".base-trash")
+    assert trash.status().entries == 1
+    assert trash.drain(timeout=10)
+    assert not leftover.exists()
@@ -1,7 +1,13 @@
 import httpx
+import json
 import os
-from typing import Optional, List
-from workspace_cli.models import DaemonStatus
+from typing import Callable, Optional, List
+from workspace_cli.models import DaemonStatus, SyncResult, CreateResult, GcReport, Job, JobEvent, JobStatus, LogFilter, LogLine, LogOverflowPolicy, Metrics, PreviewSession
+
+class JobFailedError(Exception):
+    def __init__(self, job: Job):
+        self.job = job
+        super().__init__(job.error or f"Job {job.id} {job.status.value.lower()}")
 
 class DaemonClient:
     def __init__(self, port: int = None):
@@ -22,20 +28,68 @@ class DaemonClient:
         response.raise_for_status()
         return DaemonStatus(**response.json())
 
-    def switch_preview(self, workspace_name: str, rebuild: bool = False):
+    def get_metrics(self) -> Metrics:
+        response = self.client.get("/metrics")
+        response.raise_for_status()
+        return Metrics(**response.json())
+
+    def list_jobs(self) -> List[Job]:
+        response = self.client.get("/jobs")
+        response.raise_for_status()
+        return [Job(**job) for job in response.json()]
+
+    def get_job(self, job_id: str) -> Job:
+        response = self.client.get(f"/jobs/{job_id}")
+        response.raise_for_status()
+        return Job(**response.json())
+
+    def cancel_job(self, job_id: str) -> Job:
+        response = self.client.delete(f"/jobs/{job_id}")
+        response.raise_for_status()
+        return Job(**response.json())
+
+    def stream_job_events(self, job_id: str, since: int = 0):
+        with self.client.stream("GET", f"/jobs/{job_id}/events", params={"since": since}, timeout=None) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield JobEvent(**json.loads(line))
+
+    def wait_for_job(self, job_id: str, on_event: Callable[[JobEvent], None] = None) -> Job:
+        """Follow a daemon job until it finishes; raises JobFailedError unless it succeeded."""
+        for event in self.stream_job_events(job_id):
+            if on_event:
+                on_event(event)
+        job = self.get_job(job_id)
+        if job.status != JobStatus.SUCCEEDED:
+            raise JobFailedError(job)
+        return job
+
+    def _submit(self, path: str, payload: dict, wait: bool, on_event: Callable[[JobEvent], None]):
+        response = self.client.post(path, json=payload)
+        response.raise_for_status()
+        job_id = response.json()["job_id"]
+        if not wait:
+            return job_id
+        return self.wait_for_job(job_id, on_event)
+
+    def switch_preview(self, workspace_name: str, rebuild: bool = False, wait: bool = True, on_event: Callable[[JobEvent], None] = None,
+                       wait_ready: bool = False):
         from workspace_cli.config import find_config_root
         from pathlib import Path
         
         project_root = find_config_root(Path.cwd())
         
-        response = self.client.post("/preview", json={
+        job = self._submit("/preview", {
             "workspace_name": workspace_name, 
             "rebuild": rebuild,
-            "project_root": str(project_root.parent) if project_root else None
-        })
-        response.raise_for_status()
+            "project_root": str(project_root.parent) if project_root else None,
+            "wait_ready": wait_ready
+        }, wait, on_event)
+        return PreviewSession(**job.result) if wait else job
 
-    def create_workspaces(self, names: List[str], base_path: Optional[str] = None):
+    def create_workspaces(self, names: List[str], base_path: Optional[str] = None, profile: Optional[str] = None,
+                          template: Optional[str] = None, wait: bool = True, on_event: Callable[[JobEvent], None] = None):
         from workspace_cli.config import find_config_root
         from pathlib import Path
         
@@ -44,29 +98,61 @@ class DaemonClient:
              if project_root:
                  base_path = str(project_root.parent)
 
-        response = self.client.post("/workspaces", json={"names": names, "base_path": base_path})
-        response.raise_for_status()
+        job = self._submit("/workspaces", {"names": names, "base_path": base_path, "profile": profile, "template": template}, wait, on_event)
+        return CreateResult(**job.result) if wait else job
 
     def delete_workspace(self, name: str):
         response = self.client.delete(f"/workspaces/{name}")
         response.raise_for_status()
 
-    def sync_workspace(self, workspace_name: str, sync_all: bool = False, rebuild_preview: bool = True):
+    def sync_workspace(self, workspace_name: str, sync_all: bool = False, rebuild_preview: bool = True,
+                       on_event: Callable[[JobEvent], None] = None, fetch: bool = False) -> SyncResult:
         from workspace_cli.config import find_config_root
         from pathlib import Path
         
         project_root = find_config_root(Path.cwd())
         
-        response = self.client.post("/sync", json={
+        job = self._submit("/sync", {
             "workspace_name": workspace_name,
             "sync_all": sync_all,
             "rebuild_preview": rebuild_preview,
+            "fetch": fetch,
             "project_root": str(project_root.parent) if project_root else None
-        })
-        response.raise_for_status()
+        }, True, on_event)
+        return SyncResult(**job.result)
+
+    def gc(self, dry_run: bool = False, remove_orphans: bool = False, on_event: Callable[[JobEvent], None] = None) -> GcReport:
+        job = self._submit("/gc", {"dry_run": dry_run, "remove_orphans": remove_orphans}, True, on_event)
+        return GcReport(**job.result)
 
-    def stream_logs(self):
-        with self.client.stream("GET", "/preview/logs", timeout=None) as response:
+    def stream_logs(
+        self,
+        since: Optional[int] = None,
+        tail: Optional[int] = None,
+        session: Optional[int] = None,
+        overflow: Optional[LogOverflowPolicy] = None,
+        filter: Optional[LogFilter] = None
+    ):
+        """
+        Yield preview log lines, starting at sequence number `since` or with the
+        last `tail` buffered lines. Pass the `session` of the lines already seen
+        to resume after a dropped connection; the stream is empty if it ended.
+        `overflow` picks what the daemon does when this client falls behind;
+        with a `filter`, the daemon only sends the lines matching it.
+        """
+        params = {key: value for key, value in (("since", since), ("tail", tail), ("session", session)) if value is not None}
+        if overflow is not None:
+            params["overflow"] = overflow.value
+        if filter is not None:
+            params.update({
+                "source": filter.sources,
+                "stream": [stream.value for stream in filter.streams],
+                "stage": filter.stages
+            })
+            if filter.grep:
+                params["grep"] = filter.grep
+        with self.client.stream("GET", "/preview/logs", params=params, timeout=None) as response:
             response.raise_for_status()
             for line in response.iter_lines():
-                yield line
+                if line:
+                    yield LogLine(**json.loads(line))
@@ -1,7 +1,7 @@
 import json
 import configparser
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from workspace_cli.models import WorkspaceConfig, RepoConfig, WorkspaceEntry
 
 def get_managed_repos(base_path: Path) -> List[RepoConfig]:
@@ -30,6 +30,53 @@ def get_managed_repos(base_path: Path) -> List[RepoConfig]:
                 ))
     return repos
 
+def _profile_parts(patterns: List[str]) -> List[tuple]:
+    return [Path(p.strip("/")).parts for p in patterns if p.strip("/")]
+
+def in_profile(rel_path: Path, patterns: Optional[List[str]]) -> bool:
+    """
+    Check whether a path (relative to the workspace root) is materialised by a
+    cone-mode sparse profile. Top-level entries and the immediate children of
+    directories leading to a profile path are always kept by git.
+    """
+    if patterns is None:
+        return True
+    parts = Path(rel_path).parts
+    if len(parts) <= 1:
+        return True
+    for pattern in _profile_parts(patterns):
+        # Inside a profile directory
+        if parts[:len(pattern)] == pattern:
+            return True
+        # Entry of a parent directory of a profile path
+        if len(parts) - 1 < len(pattern) and pattern[:len(parts) - 1] == parts[:-1]:
+            return True
+    return False
+
+def split_profile(patterns: List[str], submodules: List[RepoConfig]) -> Dict[str, Optional[List[str]]]:
+    """
+    Work out which submodules a sparse profile touches.
+
+    Returns submodule path -> None when the whole submodule is inside the
+    profile, or the patterns relative to the submodule when the profile only
+    reaches into part of it. Submodules outside the profile are left out.
+    """
+    selection = {}
+    pattern_parts = _profile_parts(patterns)
+    for sub in submodules:
+        sub_parts = Path(sub.path).parts
+        sub_patterns = []
+        for pattern in pattern_parts:
+            if sub_parts[:len(pattern)] == pattern:
+                # Profile covers the whole submodule
+                sub_patterns = None
+                break
+            if pattern[:len(sub_parts)] == sub_parts:
+                sub_patterns.append(str(Path(*pattern[len(sub_parts):])))
+        if sub_patterns is None or sub_patterns:
+            selection[str(sub.path)] = sub_patterns
+    return selection
+
 def find_config_root(start_path: Path = None) -> Optional[Path]:
     """Find workspace.json in start_path or its parents."""
     if start_path is None:
@@ -114,7 +161,18 @@ def load_config(path: Path = None) -> WorkspaceConfig:
         workspaces=workspaces,
         preview=data.get("preview") or [],
         preview_hook=data.get("preview_hook") or {},
-        log_path=Path(data["log_path"]) if data.get("log_path") else None
+        log_path=Path(data["log_path"]) if data.get("log_path") else None,
+        preview_dependencies=data.get("preview_dependencies") or [],
+        template=data.get("template"),
+        profiles=data.get("profiles") or {},
+        sync_jobs=data.get("sync_jobs"),
+        sync_concurrency=data.get("sync_concurrency") or 4,
+        create_concurrency=data.get("create_concurrency") or 4,
+        prefetch_interval=data.get("prefetch_interval"),
+        gc_interval=data.get("gc_interval"),
+        resource_interval=data["resource_interval"] if data.get("resource_interval") is not None else 5,
+        preview_limits=data.get("preview_limits") or {},
+        log_retention_mb=data.get("log_retention_mb") or 200
     )
 
 def save_config(config: WorkspaceConfig, path: Path) -> None:
@@ -125,9 +183,20 @@ def save_config(config: WorkspaceConfig, path: Path) -> None:
             name: entry.model_dump() 
             for name, entry in config.workspaces.items()
         },
-        "preview": config.preview,
-        "preview_hook": config.preview_hook.model_dump(),
-        "log_path": str(config.log_path) if config.log_path else None
+        "preview": [command if isinstance(command, str) else command.model_dump(exclude_defaults=True) for command in config.preview],
+        "preview_hook": config.preview_hook.model_dump(exclude_none=True),
+        "log_path": str(config.log_path) if config.log_path else None,
+        "preview_dependencies": config.preview_dependencies,
+        "template": config.template,
+        "profiles": config.profiles,
+        "sync_jobs": config.sync_jobs,
+        "sync_concurrency": config.sync_concurrency,
+        "create_concurrency": config.create_concurrency,
+        "prefetch_interval": config.prefetch_interval,
+        "gc_interval": config.gc_interval,
+        "resource_interval": config.resource_interval,
+        "preview_limits": config.preview_limits.model_dump(exclude_none=True),
+        "log_retention_mb": config.log_retention_mb
     }
     
     with open(path, "w") as f:
@@ -21,10 +21,17 @@ def main(
         logger = get_logger()
         logger.debug("Debug mode enabled")
 
+def _print_job_event(event):
+    """Show daemon job progress; lifecycle-only events carry no message."""
+    if event.message:
+        typer.echo(f"[{event.phase}] {event.message}")
+
 @app.command()
 def create(
     names: List[str] = typer.Argument(..., help="List of workspace names to create"),
     base: Path = typer.Option(None, help="Path to base workspace (required if config missing)"),
+    profile: str = typer.Option(None, "--profile", help="Sparse-checkout profile from workspace.json"),
+    template: str = typer.Option(None, "--template", help="Clone from this prepared workspace (defaults to 'template' in workspace.json)"),
 ):
     """
     Create new workspace(s).
@@ -41,6 +48,12 @@ def create(
     
     # Create with base path (first run)
     $ workspace create feature-a --base /path/to/base
+
+    # Only check out the paths of the "frontend" profile
+    $ workspace create feature-a --profile frontend
+
+    # Start from the prepared "golden" workspace (dependencies installed)
+    $ workspace create feature-a --template golden
     """
     import asyncio
     from workspace_cli.config import find_config_root, load_config
@@ -57,10 +70,11 @@ def create(
     try:
         if use_daemon:
             if base:
-                client.create_workspaces(names, base_path=str(base.resolve()))
+                result = client.create_workspaces(names, base_path=str(base.resolve()), profile=profile, template=template, on_event=_print_job_event)
             else:
-                client.create_workspaces(names)
-            typer.echo(f"Created workspaces via daemon: {', '.join(names)}")
+                result = client.create_workspaces(names, profile=profile, template=template, on_event=_print_job_event)
+            typer.echo("Created workspaces via daemon:")
+            failed = _print_create_result(result)
         else:
             # Local execution
             if not config_path:
@@ -77,8 +91,9 @@ def create(
                 manager = WorkspaceManager.get_instance(config.base_path)
                 asyncio.run(manager.initialize())
 
-            asyncio.run(manager.create_workspace(names))
-            typer.echo(f"Created workspaces locally: {', '.join(names)}")
+            result = asyncio.run(manager.create_workspace(names, profile=profile, template=template))
+            typer.echo("Created workspaces locally:")
+            failed = _print_create_result(result)
             
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
@@ -86,6 +101,21 @@ def create(
         # traceback.print_exc()
         raise typer.Exit(code=1)
 
+    if failed:
+        raise typer.Exit(code=1)
+
+def _print_create_result(result) -> bool:
+    """Print per-workspace create results; returns True if any workspace failed."""
+    from workspace_cli.models import CreateStatus
+
+    for ws in result.workspaces:
+        line = f"- {ws.name}: {ws.status.value}"
+        if ws.error:
+            line += f" ({ws.error})"
+        typer.echo(line)
+
+    return any(ws.status == CreateStatus.FAILED for ws in result.workspaces)
+
 @app.command()
 def delete(name: str):
     """
@@ -132,7 +162,7 @@ def status():
     """
     from workspace_cli.client.api import DaemonClient
     from workspace_cli.config import load_config, find_config_root
-    from workspace_cli.models import Workspace
+    from workspace_cli.models import CommandState, Workspace
     
     client = DaemonClient()
     daemon_running = client.is_running()
@@ -143,6 +173,25 @@ def status():
             typer.echo(f"Daemon Status: {'Syncing' if status.is_syncing else 'Idle'} (Running)")
             if status.active_preview:
                 typer.echo(f"Active Preview: {status.active_preview}")
+            if status.preview:
+                _print_readiness(status.preview)
+                if status.preview.shutdown_seconds is not None:
+                    typer.echo(f"Previous preview stopped in {status.preview.shutdown_seconds:.1f}s")
+            for command in status.preview_commands:
+                if command.state != CommandState.RUNNING or command.restarts:
+                    exit_code = f", last exit code {command.last_exit_code}" if command.last_exit_code is not None else ""
+                    typer.echo(f"- {command.source}: {command.state.value.lower()}, restarted {command.restarts} times{exit_code}")
+            for stats in status.preview_processes:
+                typer.echo(
+                    f"- {stats.source}: {stats.processes} processes, {stats.rss_bytes // 2**20} MiB "
+                    f"(peak {stats.peak_rss_bytes // 2**20} MiB), {stats.cpu_percent:.0f}% CPU "
+                    f"(peak {stats.peak_cpu_percent:.0f}%), {stats.read_bytes // 2**20}/{stats.write_bytes // 2**20} MiB read/written"
+                )
+            if status.trash and (status.trash.entries or status.trash.deleted_bytes):
+                typer.echo(
+                    f"Trash: {status.trash.entries} pending ({status.trash.pending_bytes // 2**20} MiB in progress), "
+                    f"{status.trash.deleted_bytes // 2**20} MiB freed"
+                )
             
             typer.echo("\nWorkspaces:")
             for ws in status.workspaces:
@@ -171,7 +220,8 @@ def daemon(
     host: str = typer.Option("127.0.0.1", help="Host to bind"),
     port: int = typer.Option(9000, help="Port to bind"),
     reload: bool = typer.Option(False, help="Enable auto-reload"),
-    debug: bool = typer.Option(False, "--debug", help="Enable debug logging")
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+    echo_preview: bool = typer.Option(True, "--echo-preview/--no-echo-preview", help="Also print preview logs on the daemon's output")
 ):
     """
     Start the Workspace Daemon.
@@ -182,6 +232,8 @@ def daemon(
     if debug:
         os.environ["WORKSPACE_DEBUG"] = "1"
         typer.echo("Debug mode enabled")
+    if not echo_preview:
+        os.environ["WORKSPACE_PREVIEW_ECHO"] = "0"
 
     typer.echo(f"Starting daemon on {host}:{port}...")
     uvicorn.run("workspace_cli.server.app:app", host=host, port=port, reload=reload)
@@ -190,7 +242,12 @@ def daemon(
 def preview(
     workspace: str = typer.Option(None, help="Target workspace name"),
     once: bool = typer.Option(False, "--once", help="Run sync once and exit (no live watch)"),
-    rebuild: bool = typer.Option(False, "--rebuild", help="Force rebuild of preview")
+    rebuild: bool = typer.Option(False, "--rebuild", help="Force rebuild of preview"),
+    wait_ready: bool = typer.Option(False, "--wait-ready", help="Wait until the preview commands' readiness probes pass"),
+    source: List[str] = typer.Option(None, "--source", help="Only show lines of this source (e.g. preview-2); repeatable"),
+    stream: List[str] = typer.Option(None, "--stream", help="Only show this stream (stdout, stderr, info, error); repeatable"),
+    stage: List[str] = typer.Option(None, "--stage", help="Only show this stage (preview, before_clear, after_preview); repeatable"),
+    grep: str = typer.Option(None, "--grep", help="Only show lines matching this regular expression")
 ):
     """
     Start preview sync.
@@ -214,35 +271,130 @@ def preview(
                  
             typer.echo(f"Auto-detected workspace: {workspace}")
 
-        client.switch_preview(workspace, rebuild=rebuild)
+        session = client.switch_preview(workspace, rebuild=rebuild, on_event=_print_job_event, wait_ready=wait_ready)
         typer.echo(f"Preview switched to {workspace}")
+        if session.time_to_ready is not None:
+            typer.echo(f"Preview ready after {session.time_to_ready:.1f}s")
         
         if not once:
             typer.echo("Streaming logs... (Ctrl+C to stop)")
-            from rich.console import Console
-            console = Console()
+            log_filter = None
+            if source or stream or stage or grep:
+                from workspace_cli.models import LogFilter
+                log_filter = LogFilter(sources=source or [], streams=stream or [], stages=stage or [], grep=grep)
             try:
-                for line in client.stream_logs():
-                    console.print(line)
+                _follow_logs(client, log_filter)
             except KeyboardInterrupt:
                 typer.echo("Stopping preview...")
-                # Optional: Send stop request? Or just disconnect?
-                # If we disconnect, server might keep running until next switch.
-                # But requirement says "resident command line will automatically exit".
-                # If user Ctrl+C, they exit.
+                # Disconnecting leaves the preview running until the next switch
                 pass
             except Exception as e:
-                # If server closes connection (e.g. new preview), we might get here or just loop ends.
                 typer.echo(f"Disconnected: {e}")
         
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(code=1)
 
+class _LogRenderer:
+    """Formats preview log records: one color per source, errors in red."""
+
+    COLORS = ["cyan", "magenta", "green", "yellow", "blue"]
+
+    def __init__(self):
+        self.colors = {}
+
+    def __call__(self, line):
+        from rich.text import Text
+        from workspace_cli.models import LogStream
+
+        color = self.colors.setdefault(line.source, self.COLORS[len(self.colors) % len(self.COLORS)])
+        if line.stream in (LogStream.STDERR, LogStream.ERROR):
+            color = "red"
+        label = line.source.replace("_", " ").capitalize()
+        # Process output is shown as is, never interpreted as markup
+        return Text.assemble((f"[{label}] ", color), line.text)
+
+# Reconnect attempts after the log stream drops, one second apart
+LOG_RECONNECT_ATTEMPTS = 10
+
+def _follow_logs(client, log_filter=None):
+    """
+    Print the preview logs until the preview session ends (the next switch).
+
+    Starts with everything the session has logged so far and resumes after
+    the last line seen when the connection drops, or when the daemon
+    disconnects us for falling behind, so nothing is lost or printed twice.
+    """
+    import time
+    import httpx
+    from rich.console import Console
+    from workspace_cli.models import LogOverflowPolicy
+
+    console = Console()
+    render = _LogRenderer()
+    session, next_seq = None, 0
+    attempts = 0
+    while True:
+        received = 0
+        try:
+            for line in client.stream_logs(since=next_seq, session=session, overflow=LogOverflowPolicy.DISCONNECT, filter=log_filter):
+                if session is None:
+                    session = line.session
+                if line.dropped:
+                    console.print(f"[dim]... {line.dropped} lines dropped, the terminal fell behind[/dim]")
+                missing = line.seq - next_seq - line.dropped
+                # With a filter, skipped sequence numbers are just lines that didn't match
+                if missing > 0 and log_filter is None:
+                    console.print(f"[dim]... {missing} lines no longer buffered[/dim]")
+                console.print(render(line))
+                next_seq = line.seq + 1
+                received += 1
+                attempts = 0
+        except httpx.TransportError as e:
+            attempts += 1
+            if attempts > LOG_RECONNECT_ATTEMPTS:
+                raise
+            typer.echo(f"Log stream interrupted ({e}), reconnecting...", err=True)
+            time.sleep(1)
+            continue
+        # An empty stream means the session is over; otherwise we may have been
+        # disconnected for falling behind, and the next request tells which
+        if session is None or not received:
+            return
+
+def _print_readiness(session):
+    from workspace_cli.models import ReadinessStatus
+
+    if session.readiness == ReadinessStatus.READY:
+        typer.echo(f"Ready: yes (after {session.time_to_ready:.1f}s)")
+    elif session.readiness == ReadinessStatus.WAITING:
+        typer.echo("Ready: waiting")
+    elif session.readiness == ReadinessStatus.FAILED:
+        typer.echo(f"Ready: failed ({session.ready_error})")
+
+def _print_sync_result(result) -> bool:
+    """Print per-workspace sync results; returns True if any workspace failed."""
+    from workspace_cli.models import SyncStatus
+
+    for ws in result.workspaces:
+        line = f"- {ws.name}: {ws.status.value}"
+        if ws.status == SyncStatus.SUCCEEDED and not ws.changed:
+            line += " (up to date)"
+        if ws.error:
+            line += f" ({ws.error})"
+        if ws.fetch_skipped_age is not None:
+            line += f" [not fetched: fetched {ws.fetch_skipped_age:.0f}s ago, --no-prefetch-cache to fetch]"
+        typer.echo(line)
+        for sub, error in ws.submodule_errors.items():
+            typer.echo(f"Warning: {ws.name}: submodule {sub} failed to sync: {error}", err=True)
+
+    return any(ws.status == SyncStatus.FAILED for ws in result.workspaces)
+
 @app.command()
 def sync(
     all: bool = typer.Option(False, "--all", help="Sync all workspaces (current + siblings)"),
-    rebuild_preview: bool = typer.Option(True, "--rebuild-preview/--no-rebuild-preview", help="Clean and rebuild preview after sync")
+    rebuild_preview: bool = typer.Option(True, "--rebuild-preview/--no-rebuild-preview", help="Clean and rebuild preview after sync"),
+    no_prefetch_cache: bool = typer.Option(False, "--no-prefetch-cache", help="Fetch even if the background prefetch fetched recently")
 ):
     """
     Sync workspaces.
@@ -263,6 +415,7 @@ def sync(
     config_path = find_config_root()
     client = DaemonClient()
     use_daemon = config_path and client.is_running()
+    failed = False
 
     try:
         # Determine workspace
@@ -277,12 +430,15 @@ def sync(
         target = workspace_name if workspace_name and workspace_name != "base" else None
 
         if use_daemon:
-            client.sync_workspace(
-                workspace_name=target if target else "dummy", 
+            result = client.sync_workspace(
+                workspace_name=target if target else "base", 
                 sync_all=all, 
-                rebuild_preview=rebuild_preview
+                rebuild_preview=rebuild_preview,
+                on_event=_print_job_event,
+                fetch=no_prefetch_cache
             )
             typer.echo("Sync completed via daemon.")
+            failed = _print_sync_result(result)
         else:
             if not config_path:
                 typer.echo("Error: No workspace configuration found.", err=True)
@@ -291,16 +447,200 @@ def sync(
             config = load_config(config_path)
             manager = WorkspaceManager.get_instance(config.base_path)
             asyncio.run(manager.initialize())
-            asyncio.run(manager.sync_workspace(
-                workspace_name=target if target else "dummy",
+            result = asyncio.run(manager.sync_workspace(
+                workspace_name=target if target else "base",
                 sync_all=all,
-                rebuild_preview=rebuild_preview
+                rebuild_preview=rebuild_preview,
+                fetch=no_prefetch_cache
             ))
             typer.echo("Sync completed locally.")
+            failed = _print_sync_result(result)
         
     except Exception as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(code=1)
 
+    if failed:
+        raise typer.Exit(code=1)
+
+@app.command()
+def jobs(
+    job_id: str = typer.Argument(None, help="Job to follow (lists recent jobs if omitted)"),
+    cancel: bool = typer.Option(False, "--cancel", help="Cancel the job instead of following it"),
+):
+    """
+    List, follow or cancel daemon jobs.
+
+    Long operations (sync, preview, create) run as jobs on the daemon.
+
+    Examples:
+
+    $ workspace jobs
+
+    $ workspace jobs 3f2a9c1b7d4e
+
+    $ workspace jobs 3f2a9c1b7d4e --cancel
+    """
+    from workspace_cli.client.api import DaemonClient
+
+    client = DaemonClient()
+    if not client.is_running():
+        typer.echo("Daemon is not running.", err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        if job_id is None:
+            for job in client.list_jobs():
+                typer.echo(f"- {job.id} {job.kind} {job.status.value} ({job.phase or '-'})")
+        elif cancel:
+            job = client.cancel_job(job_id)
+            typer.echo(f"Cancel requested for {job.id} ({job.status.value})")
+        else:
+            job = client.wait_for_job(job_id, on_event=_print_job_event)
+            typer.echo(f"Job {job.id} {job.status.value.lower()}")
+    except Exception as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
+
+def _print_gc_report(report):
+    verb = "Would remove" if report.dry_run else "Removed"
+    for line in report.pruned_worktrees:
+        typer.echo(f"- {line}")
+    for path in report.removed_directories:
+        typer.echo(f"- {verb} orphaned directory {path}")
+    for path in report.orphaned_directories:
+        typer.echo(f"- Kept orphaned directory {path}, it has files in it (remove with --remove-orphans)")
+    for name in report.unregistered_workspaces:
+        typer.echo(f"- {verb} missing workspace {name} from workspace.json")
+    for name in report.adopted_workspaces:
+        typer.echo(f"- {'Would register' if report.dry_run else 'Registered'} worktree {name} in workspace.json")
+    for branch in report.deleted_branches:
+        typer.echo(f"- {'Would delete' if report.dry_run else 'Deleted'} branch {branch}")
+    for repo in report.repositories:
+        if repo.error:
+            typer.echo(f"- {repo.path}: maintenance failed ({repo.error})", err=True)
+        else:
+            typer.echo(
+                f"- {repo.path}: {repo.size_before // 2**20} -> {repo.size_after // 2**20} MiB, "
+                f"lookups {repo.lookup_ms_before:.1f} -> {repo.lookup_ms_after:.1f} ms"
+            )
+    typer.echo(f"Reclaimed {report.reclaimed_bytes / 2**20:.1f} MiB")
+
+@app.command()
+def gc(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only report what would be cleaned up"),
+    remove_orphans: bool = typer.Option(False, "--remove-orphans", help="Also remove orphaned directories that still contain files"),
+):
+    """
+    Clean up stale worktrees, directories and branches and maintain the repositories.
+
+    Prunes worktree metadata of deleted directories, removes orphaned
+    <base>-<name> directories (only reporting those with files in them,
+    unless --remove-orphans is given), reconciles workspace.json with the worktrees
+    on disk, deletes the idle preview branch and merged branches of deleted
+    workspaces, and repacks every repository (commit-graph included).
+
+    Examples:
+
+    $ workspace gc --dry-run
+
+    $ workspace gc
+    """
+    import asyncio
+    from workspace_cli.config import find_config_root, load_config
+    from workspace_cli.server.manager import WorkspaceManager
+    from workspace_cli.client.api import DaemonClient
+
+    client = DaemonClient()
+    try:
+        if client.is_running():
+            report = client.gc(dry_run=dry_run, remove_orphans=remove_orphans, on_event=_print_job_event)
+        else:
+            config_path = find_config_root()
+            if not config_path:
+                typer.echo("Error: No workspace configuration found.", err=True)
+                raise typer.Exit(code=1)
+            config = load_config(config_path)
+            manager = WorkspaceManager.get_instance(config.base_path)
+            asyncio.run(manager.initialize())
+            report = asyncio.run(manager.gc(dry_run, remove_orphans))
+            manager.trash.drain()
+        _print_gc_report(report)
+    except typer.Exit:
+        raise
+    except Exception as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
+
+def _parse_since(value: str):
+    """Returns (sequence number, unix time): `120` is a sequence number, `10m` a duration ago, anything else an ISO time."""
+    import time
+    from datetime import datetime
+
+    if value.isdigit():
+        return int(value), None
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if value[:-1].isdigit() and value[-1:] in units:
+        return None, time.time() - int(value[:-1]) * units[value[-1]]
+    return None, datetime.fromisoformat(value).timestamp()
+
+@app.command()
+def logs(
+    session: str = typer.Option(None, "--session", help="Session id (or its start) or workspace name; defaults to the latest session"),
+    since: str = typer.Option(None, "--since", help="Sequence number, duration ago (30s, 10m, 2h, 1d) or ISO time"),
+    grep: str = typer.Option(None, "--grep", help="Only lines matching this regular expression"),
+    list_sessions: bool = typer.Option(False, "--list", help="List the archived sessions"),
+):
+    """
+    Show archived preview logs.
+
+    Every preview session's logs are kept in compressed segments under the
+    base repository's git dir (see log_retention_mb). --since seeks straight
+    to the segment containing that point.
+
+    Examples:
+
+    $ workspace logs --list
+
+    $ workspace logs --session A --since 10m --grep "ERROR|Failed"
+    """
+    import re
+    from rich.console import Console
+    from workspace_cli.config import find_config_root, load_config
+    from workspace_cli.server.archive import ARCHIVE_DIR, list_sessions as archived_sessions, read_session
+    from workspace_cli.server.git import ShellGitProvider
+
+    try:
+        config_path = find_config_root()
+        if not config_path:
+            typer.echo("Error: No workspace configuration found.", err=True)
+            raise typer.Exit(code=1)
+        config = load_config(config_path)
+        root = ShellGitProvider().get_git_dir(config.base_path) / ARCHIVE_DIR
+        sessions = archived_sessions(root)
+
+        if list_sessions:
+            for info in sessions:
+                typer.echo(f"{info.id}  {info.workspace}  {info.started:%Y-%m-%d %H:%M:%S}  {info.size_bytes // 1024} KiB")
+            return
+        if session:
+            sessions = [info for info in sessions if info.id.startswith(session) or info.workspace == session]
+        if not sessions:
+            typer.echo("No archived preview logs found.", err=True)
+            raise typer.Exit(code=1)
+
+        since_seq, since_time = _parse_since(since) if since else (None, None)
+        pattern = re.compile(grep) if grep else None
+        console = Console()
+        render = _LogRenderer()
+        for line in read_session(root / sessions[-1].id, since_seq, since_time):
+            if pattern is None or pattern.search(line.text):
+                console.print(render(line))
+    except typer.Exit:
+        raise
+    except Exception as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
+
 if __name__ == "__main__":
     app()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, model_validator
+from typing import Any, List, Optional, Dict, Union
 from enum import Enum
 from pathlib import Path
 from datetime import datetime
@@ -9,22 +9,243 @@ class Workspace(BaseModel):
     path: str
     branch: str
     is_active: bool = False
+    profile: Optional[str] = None
 
 class PreviewStatus(str, Enum):
     RUNNING = "RUNNING"
     STOPPED = "STOPPED"
     ERROR = "ERROR"
 
+class ReadinessStatus(str, Enum):
+    # No preview command has a readiness probe
+    UNKNOWN = "UNKNOWN"
+    WAITING = "WAITING"
+    READY = "READY"
+    FAILED = "FAILED"
+
 class PreviewSession(BaseModel):
     workspace_name: str
     start_time: datetime
     pid: Optional[int] = None
     status: PreviewStatus
+    readiness: ReadinessStatus = ReadinessStatus.UNKNOWN
+    ready_at: Optional[datetime] = None
+    # Seconds from the start of the switch until every readiness probe passed
+    time_to_ready: Optional[float] = None
+    ready_error: Optional[str] = None
+    # Seconds the switch spent stopping the previous preview's commands
+    shutdown_seconds: Optional[float] = None
+
+class SyncStatus(str, Enum):
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
+
+class WorkspaceSyncResult(BaseModel):
+    name: str
+    path: Optional[str] = None
+    status: SyncStatus = SyncStatus.SUCCEEDED
+    error: Optional[str] = None
+    # False when the checkout and its submodules already contained their upstream
+    changed: bool = False
+    # Submodule path -> error message; a failing submodule doesn't fail the workspace
+    submodule_errors: Dict[str, str] = {}
+    # Seconds since the repository was last fetched, when sync reused that fetch instead of fetching
+    fetch_skipped_age: Optional[float] = None
+
+class SyncResult(BaseModel):
+    workspaces: List[WorkspaceSyncResult] = []
+
+class CreateStatus(str, Enum):
+    CREATED = "CREATED"
+    EXISTS = "EXISTS"
+    FAILED = "FAILED"
+
+class WorkspaceCreateResult(BaseModel):
+    name: str
+    path: Optional[str] = None
+    status: CreateStatus = CreateStatus.CREATED
+    error: Optional[str] = None
+
+class CreateResult(BaseModel):
+    workspaces: List[WorkspaceCreateResult] = []
+
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class JobEvent(BaseModel):
+    seq: int
+    time: datetime
+    phase: str
+    message: Optional[str] = None
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    phase: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    events: List[JobEvent] = []
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+class LogStream(str, Enum):
+    STDOUT = "stdout"
+    STDERR = "stderr"
+    # Messages of the runner itself (starting, stopping, failures)
+    INFO = "info"
+    ERROR = "error"
+
+class LogLine(BaseModel):
+    # Preview session the line belongs to; a preview switch starts a new one
+    session: int
+    # Position within the session, starting at 0
+    seq: int
+    # What produced the line: "preview" (or "preview-2", ...) or a hook stage
+    source: str
+    stream: LogStream
+    # Unix timestamp at which the daemon read the line
+    time: float
+    # The line as the process wrote it, without the line break; formatting is up to the client
+    text: str
+    # Lines this subscriber lost right before this one because it fell behind
+    dropped: int = 0
+
+class LogSessionInfo(BaseModel):
+    # An archived preview session (see `workspace logs`)
+    id: str
+    workspace: str
+    started: datetime
+    # The daemon's session number (restarts from 0 with the daemon)
+    session: int
+    size_bytes: int = 0
+
+class LogOverflowPolicy(str, Enum):
+    # What happens when a log subscriber's queue is full
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    DISCONNECT = "disconnect"
+
+class LogFilter(BaseModel):
+    # A line is sent if it matches every criterion given (any of the listed values)
+    # Exact sources, e.g. "preview-2" or "before_clear:codegen"
+    sources: List[str] = []
+    streams: List[LogStream] = []
+    # "preview" or a hook stage such as "before_clear"
+    stages: List[str] = []
+    # Regular expression searched in the line text
+    grep: Optional[str] = None
+
+    def key(self) -> tuple:
+        """Identifies equal filters, so they are evaluated once per line."""
+        return (
+            tuple(sorted(set(self.sources))),
+            tuple(sorted({stream.value for stream in self.streams})),
+            tuple(sorted(set(self.stages))),
+            self.grep
+        )
+
+class LogSubscriberMetrics(BaseModel):
+    id: int
+    policy: LogOverflowPolicy
+    filter: Optional[LogFilter] = None
+    queued: int
+    capacity: int
+    dropped: int
+    # Lines logged in the session that this subscriber hasn't received yet
+    lag: int
+
+class ProcessStats(BaseModel):
+    # A preview command's process group, as last sampled from /proc
+    source: str
+    command: str
+    pgid: int
+    processes: int = 0
+    rss_bytes: int = 0
+    peak_rss_bytes: int = 0
+    # CPU time of the group's live processes
+    cpu_seconds: float = 0.0
+    # Share of one core since the previous sample
+    cpu_percent: float = 0.0
+    peak_cpu_percent: float = 0.0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    sampled_at: Optional[datetime] = None
+
+class CommandState(str, Enum):
+    RUNNING = "RUNNING"
+    # Crashed, waiting out the backoff before the next start
+    RESTARTING = "RESTARTING"
+    # Exited with code 0
+    EXITED = "EXITED"
+    # Crashed and not restarted (`restart` is off)
+    CRASHED = "CRASHED"
+    # Crashed too often in a row; given up until the next switch
+    FAILED = "FAILED"
+
+class PreviewCommandStatus(BaseModel):
+    # A preview command as supervised by the runner
+    source: str
+    command: str
+    state: CommandState = CommandState.RUNNING
+    pid: Optional[int] = None
+    restarts: int = 0
+    last_exit_code: Optional[int] = None
+    last_exit_at: Optional[datetime] = None
+
+class Metrics(BaseModel):
+    log_session: int
+    log_buffered_lines: int
+    log_subscribers: List[LogSubscriberMetrics] = []
+    preview_processes: List[ProcessStats] = []
+
+class RepoGcResult(BaseModel):
+    path: str
+    size_before: int = 0
+    size_after: int = 0
+    # Best-of-three time of a few common ref/commit lookups, in milliseconds
+    lookup_ms_before: float = 0.0
+    lookup_ms_after: float = 0.0
+    error: Optional[str] = None
+
+class GcReport(BaseModel):
+    dry_run: bool = False
+    pruned_worktrees: List[str] = []
+    removed_directories: List[str] = []
+    # Orphaned directories with files in them, kept without `remove_orphans`
+    orphaned_directories: List[str] = []
+    # In workspace.json but gone from disk
+    unregistered_workspaces: List[str] = []
+    # Worktrees following the naming scheme that workspace.json didn't know about
+    adopted_workspaces: List[str] = []
+    deleted_branches: List[str] = []
+    repositories: List[RepoGcResult] = []
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return sum(max(0, repo.size_before - repo.size_after) for repo in self.repositories)
+
+class TrashStatus(BaseModel):
+    # Directories waiting to be deleted (including the one in progress)
+    entries: int = 0
+    # Size of the directory being deleted
+    pending_bytes: int = 0
+    # Freed since the daemon started
+    deleted_bytes: int = 0
 
 class DaemonStatus(BaseModel):
     active_preview: Optional[str] = None
+    preview: Optional[PreviewSession] = None
     workspaces: List[Workspace]
     is_syncing: bool = False
+    trash: Optional[TrashStatus] = None
+    preview_processes: List[ProcessStats] = []
+    preview_commands: List[PreviewCommandStatus] = []
 
 # Legacy Models (to be refactored/removed)
 class RepoConfig(BaseModel):
@@ -34,17 +255,80 @@ class RepoConfig(BaseModel):
 
 class WorkspaceEntry(BaseModel):
     path: str  # Relative or absolute path
+    profile: Optional[str] = None  # Sparse-checkout profile name
+
+class ReadinessProbe(BaseModel):
+    # Exactly one of: a TCP port accepting connections, a URL answering
+    # (any status below 500), or a regex matching a line of the command's output
+    port: Optional[int] = None
+    host: str = "127.0.0.1"
+    url: Optional[str] = None
+    log: Optional[str] = None
+    # Seconds after which the preview counts as failed to start
+    timeout: float = 120
+
+    @model_validator(mode="after")
+    def _one_check(self):
+        if sum(check is not None for check in (self.port, self.url, self.log)) != 1:
+            raise ValueError("A readiness probe needs exactly one of port, url or log")
+        return self
+
+class PreviewCommand(BaseModel):
+    run: str
+    ready: Optional[ReadinessProbe] = None
+    # Start the command again when it crashes (exits with a non-zero code)
+    restart: bool = True
+    # Seconds between SIGTERM and SIGKILL when the preview stops
+    grace: float = 5.0
+
+class ResourceLimits(BaseModel):
+    # Soft limits per preview command (process group): exceeding one logs a warning
+    rss_mb: Optional[int] = None
+    cpu_percent: Optional[float] = None
+
+class HookSpec(BaseModel):
+    run: str
+    # Referenced by other hooks' `needs`; also labels the hook's output
+    name: Optional[str] = None
+    # Hooks that must have succeeded first; defaults to the previous entry
+    needs: Optional[List[str]] = None
+    # Seconds before the hook is killed and counted as failed
+    timeout: Optional[float] = None
+
+# A command, a hook object, or a list of them that run in parallel
+HookEntry = Union[str, HookSpec, List[Union[str, HookSpec]]]
 
 class PreviewHooks(BaseModel):
-    before_clear: List[str] = []
-    after_preview: List[str] = []
+    before_clear: List[HookEntry] = []
+    after_preview: List[HookEntry] = []
 
 class WorkspaceConfig(BaseModel):
     base_path: Path
     workspaces: Dict[str, WorkspaceEntry] = {}
-    preview: List[str] = []
+    preview: List[Union[str, PreviewCommand]] = []
     preview_hook: PreviewHooks = PreviewHooks()
     log_path: Optional[Path] = None
+    # Files whose change requires restarting the preview processes (e.g. "package.json")
+    preview_dependencies: List[str] = []
+    # Prepared workspace (dependencies installed, caches warm) new workspaces are cloned from
+    template: Optional[str] = None
+    # Named sparse-checkout profiles: name -> directories (cone mode)
+    profiles: Dict[str, List[str]] = {}
+    # Parallel submodule jobs during sync (defaults to the CPU count)
+    sync_jobs: Optional[int] = None
+    # Workspaces synced concurrently by `sync --all`
+    sync_concurrency: int = 4
+    # Workspaces set up concurrently by `create a b c ...`
+    create_concurrency: int = 4
+    # Seconds between background fetches by the daemon (disabled when unset)
+    prefetch_interval: Optional[int] = None
+    # Seconds between garbage collections by the daemon (disabled when unset)
+    gc_interval: Optional[int] = None
+    # Seconds between samples of the preview processes' resource use (0 turns it off)
+    resource_interval: float = 5
+    preview_limits: ResourceLimits = ResourceLimits()
+    # Size the preview log archive is kept under
+    log_retention_mb: int = 200
 
 class Context(BaseModel):
     root_path: Path
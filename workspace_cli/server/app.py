@@ -1,9 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query
 from contextlib import asynccontextmanager
 from pathlib import Path
 import os
+import re
 from workspace_cli.server.manager import WorkspaceManager
-from workspace_cli.models import DaemonStatus
+from workspace_cli.models import DaemonStatus, Job, LogFilter, LogOverflowPolicy, LogStream, Metrics
 
 # Default base path, should be configured via args
 BASE_PATH = Path(os.getcwd())
@@ -19,9 +20,12 @@ async def lifespan(app: FastAPI):
     
     manager = WorkspaceManager.get_instance(BASE_PATH)
     await manager.initialize()
+    # Prefetch, gc and resource sampling; also started once a config is loaded later
+    await manager.start_background()
     yield
     # Shutdown
-    pass
+    await manager.stop_background()
+    await manager.runner.close_archive()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -30,43 +34,68 @@ async def get_status():
     manager = WorkspaceManager.get_instance()
     return await manager.get_status()
 
+@app.get("/metrics", response_model=Metrics)
+async def get_metrics():
+    manager = WorkspaceManager.get_instance()
+    return manager.get_metrics()
+
 from pydantic import BaseModel
 from typing import List, Optional
 class PreviewRequest(BaseModel):
     workspace_name: str
     rebuild: bool = False
     project_root: Optional[str] = None
+    # Finish the job only once the preview commands' readiness probes passed
+    wait_ready: bool = False
 
-@app.post("/preview")
+@app.post("/preview", status_code=202)
 async def switch_preview(request: PreviewRequest):
     manager = WorkspaceManager.get_instance()
     if request.project_root:
         await manager.ensure_config(request.project_root)
-    await manager.switch_preview(request.workspace_name, request.rebuild)
-    return {"status": "ok"}
+    job = manager.jobs.submit("preview", lambda: manager.switch_preview(request.workspace_name, request.rebuild, request.wait_ready))
+    return {"status": "accepted", "job_id": job.id}
 
 from fastapi.responses import StreamingResponse
 @app.get("/preview/logs")
-async def preview_logs():
+async def preview_logs(
+    since: Optional[int] = None,
+    tail: Optional[int] = None,
+    session: Optional[int] = None,
+    overflow: LogOverflowPolicy = LogOverflowPolicy.DROP_OLDEST,
+    source: List[str] = Query([]),
+    stream: List[LogStream] = Query([]),
+    stage: List[str] = Query([]),
+    grep: Optional[str] = None
+):
     manager = WorkspaceManager.get_instance()
+    log_filter = None
+    if source or stream or stage or grep:
+        try:
+            log_filter = LogFilter(sources=source, streams=stream, stages=stage, grep=grep)
+            re.compile(grep or "")
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid grep pattern: {e}")
     
     async def event_generator():
-        async for line in manager.subscribe_to_logs():
-            yield f"{line}\n"
+        async for line in manager.subscribe_to_logs(since=since, tail=tail, session=session, overflow=overflow, filter=log_filter):
+            yield line.model_dump_json() + "\n"
             
-    return StreamingResponse(event_generator(), media_type="text/plain")
+    return StreamingResponse(event_generator(), media_type="application/x-ndjson")
 
 class CreateRequest(BaseModel):
     names: List[str]
     base_path: Optional[str] = None
+    profile: Optional[str] = None
+    template: Optional[str] = None
 
-@app.post("/workspaces")
+@app.post("/workspaces", status_code=202)
 async def create_workspaces(request: CreateRequest):
     manager = WorkspaceManager.get_instance()
     if request.base_path:
         await manager.ensure_config(request.base_path)
-    await manager.create_workspace(request.names)
-    return {"status": "created"}
+    job = manager.jobs.submit("create", lambda: manager.create_workspace(request.names, profile=request.profile, template=request.template))
+    return {"status": "accepted", "job_id": job.id}
 
 @app.delete("/workspaces/{name}")
 async def delete_workspace(name: str):
@@ -79,11 +108,58 @@ class SyncRequest(BaseModel):
     sync_all: bool = False
     rebuild_preview: bool = True
     project_root: Optional[str] = None
+    # Fetch even if the prefetcher fetched recently
+    fetch: bool = False
 
-@app.post("/sync")
+@app.post("/sync", status_code=202)
 async def sync_workspace(request: SyncRequest):
     manager = WorkspaceManager.get_instance()
     if request.project_root:
         await manager.ensure_config(request.project_root)
-    await manager.sync_workspace(request.workspace_name, request.sync_all, request.rebuild_preview)
-    return {"status": "synced"}
+    job = manager.jobs.submit(
+        "sync", lambda: manager.sync_workspace(request.workspace_name, request.sync_all, request.rebuild_preview, request.fetch)
+    )
+    return {"status": "accepted", "job_id": job.id}
+
+class GcRequest(BaseModel):
+    dry_run: bool = False
+    remove_orphans: bool = False
+
+@app.post("/gc", status_code=202)
+async def gc(request: GcRequest):
+    manager = WorkspaceManager.get_instance()
+    job = manager.jobs.submit("gc", lambda: manager.gc(request.dry_run, request.remove_orphans))
+    return {"status": "accepted", "job_id": job.id}
+
+@app.get("/jobs", response_model=List[Job])
+async def list_jobs():
+    manager = WorkspaceManager.get_instance()
+    return manager.jobs.list()
+
+def _get_job(job_id: str) -> Job:
+    manager = WorkspaceManager.get_instance()
+    try:
+        return manager.jobs.get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+@app.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    return _get_job(job_id)
+
+@app.delete("/jobs/{job_id}", response_model=Job)
+async def cancel_job(job_id: str):
+    _get_job(job_id)
+    return WorkspaceManager.get_instance().jobs.cancel(job_id)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, since: int = 0):
+    """Stream progress events as JSON lines until the job finishes."""
+    _get_job(job_id)
+    manager = WorkspaceManager.get_instance()
+
+    async def event_generator():
+        async for event in manager.jobs.events(job_id, since):
+            yield event.model_dump_json() + "\n"
+
+    return StreamingResponse(event_generator(), media_type="application/x-ndjson")
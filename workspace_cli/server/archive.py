@@ -0,0 +1,215 @@
+import json
+import shutil
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+from workspace_cli.models import LogLine, LogSessionInfo
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+# Directory in the base repository's git dir
+ARCHIVE_DIR = "workspace-logs"
+# Uncompressed bytes per gzip member; each member start is an index entry
+BLOCK_BYTES = 64 * 1024
+# Uncompressed bytes per segment file
+SEGMENT_BYTES = 4 * 1024 * 1024
+DEFAULT_RETENTION_MB = 200
+
+def _segment_name(number: int) -> str:
+    return f"{number:06d}.ndjson.gz"
+
+class LogArchive:
+    """
+    Preview logs on disk, one directory per preview session.
+
+    A session is a series of segment files of concatenated gzip members
+    holding NDJSON records. `index.ndjson` has one entry per member: the
+    segment, the byte offset and the sequence number and time of its first
+    record. Readers can start at the member covering a sequence number or
+    time instead of decompressing everything. Whole old sessions (and then
+    the oldest segments of the current one) are deleted to keep the archive
+    under `retention_bytes`, when a session starts or a segment is full.
+
+    All methods block; the runner calls them from its archive writer thread.
+    """
+
+    def __init__(self, root: Path, retention_bytes: int = DEFAULT_RETENTION_MB * 2**20):
+        self.root = root
+        self.retention_bytes = retention_bytes
+        self.session_dir: Optional[Path] = None
+        self._file = None
+        self._index = None
+        self._compressor = None
+        self._segment = 0
+        self._segment_bytes = 0
+        self._block_bytes = 0
+
+    def start_session(self, workspace: str, session: int):
+        """Archive the following lines as a new session (the runner's `session` number)."""
+        self.close()
+        started = datetime.now()
+        name = f"{started:%Y%m%d-%H%M%S}-{workspace}"
+        path = self.root / name
+        suffix = 1
+        while path.exists():
+            suffix += 1
+            path = self.root / f"{name}-{suffix}"
+        path.mkdir(parents=True)
+        info = LogSessionInfo(id=path.name, workspace=workspace, started=started, session=session)
+        (path / "session.json").write_text(info.model_dump_json())
+        self.session_dir = path
+        self._index = open(path / "index.ndjson", "a", encoding="utf-8")
+        self._segment = 0
+        self._open_segment()
+        self._enforce_retention()
+
+    def _open_segment(self):
+        self._segment += 1
+        self._file = open(self.session_dir / _segment_name(self._segment), "ab")
+        self._segment_bytes = 0
+        self._compressor = None
+
+    def write(self, lines: List[LogLine]):
+        """Append a batch of lines; they are readable once this returns."""
+        if self._file is None or not lines:
+            return
+        try:
+            for line in lines:
+                if self._compressor is None:
+                    self._start_block(line)
+                data = (line.model_dump_json() + "\n").encode()
+                self._file.write(self._compressor.compress(data))
+                self._block_bytes += len(data)
+                self._segment_bytes += len(data)
+                if self._block_bytes >= BLOCK_BYTES:
+                    self._finish_block()
+                    if self._segment_bytes >= SEGMENT_BYTES:
+                        self._file.close()
+                        self._open_segment()
+                        self._enforce_retention()
+            if self._compressor is not None:
+                self._file.write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+            self._file.flush()
+        except OSError as e:
+            logger.warning(f"Failed to archive preview logs: {e}")
+
+    def _start_block(self, line: LogLine):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        self._block_bytes = 0
+        entry = {"segment": self._segment, "offset": self._file.tell(), "seq": line.seq, "time": line.time}
+        self._index.write(json.dumps(entry) + "\n")
+        self._index.flush()
+
+    def _finish_block(self):
+        self._file.write(self._compressor.flush())
+        self._compressor = None
+
+    def close(self):
+        if self._file is not None:
+            try:
+                if self._compressor is not None:
+                    self._finish_block()
+                self._file.close()
+                self._index.close()
+            except OSError as e:
+                logger.warning(f"Failed to close preview log archive: {e}")
+        self._file = self._index = self._compressor = None
+
+    def _enforce_retention(self):
+        sessions = list_sessions(self.root)
+        sizes = {info.id: info.size_bytes for info in sessions}
+        total = sum(sizes.values())
+        # Oldest sessions first, then the oldest segments of the current one
+        for info in sessions:
+            if total <= self.retention_bytes:
+                return
+            if self.session_dir is not None and info.id == self.session_dir.name:
+                continue
+            shutil.rmtree(self.root / info.id, ignore_errors=True)
+            total -= sizes[info.id]
+        if self.session_dir is None:
+            return
+        for segment in sorted(self.session_dir.glob("*.ndjson.gz")):
+            if total <= self.retention_bytes or segment.name == _segment_name(self._segment):
+                return
+            total -= segment.stat().st_size
+            segment.unlink()
+
+def list_sessions(root: Path) -> List[LogSessionInfo]:
+    """Archived sessions, oldest first."""
+    sessions = []
+    if not root.is_dir():
+        return sessions
+    for path in sorted(root.iterdir()):
+        try:
+            info = LogSessionInfo.model_validate_json((path / "session.json").read_text())
+        except (OSError, ValueError):
+            continue
+        info.size_bytes = sum(entry.stat().st_size for entry in path.iterdir() if entry.is_file())
+        sessions.append(info)
+    sessions.sort(key=lambda info: info.started)
+    return sessions
+
+def read_session(path: Path, since_seq: Optional[int] = None, since_time: Optional[float] = None) -> Iterator[LogLine]:
+    """
+    Lines of an archived session, starting at the first with a sequence
+    number >= `since_seq` or a time >= `since_time`. Only the segments from
+    the indexed member covering that point on are decompressed.
+    """
+    entries = []
+    try:
+        with open(path / "index.ndjson", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        pass
+
+    start = None
+    for entry in entries:
+        if not (path / _segment_name(entry["segment"])).exists():
+            continue
+        if start is None:
+            start = entry
+        elif since_seq is not None and entry["seq"] <= since_seq:
+            start = entry
+        elif since_time is not None and entry["time"] <= since_time:
+            start = entry
+    if start is None:
+        return
+
+    segments = sorted(int(p.name.split(".")[0]) for p in path.glob("*.ndjson.gz"))
+    for segment in segments:
+        if segment < start["segment"]:
+            continue
+        offset = start["offset"] if segment == start["segment"] else 0
+        for line in _read_segment(path / _segment_name(segment), offset):
+            if since_seq is not None and line.seq < since_seq:
+                continue
+            if since_time is not None and line.time < since_time:
+                continue
+            yield line
+
+def _read_segment(path: Path, offset: int) -> Iterator[LogLine]:
+    # Reads member after member; a member still being written (no gzip
+    # trailer yet) ends the segment instead of raising
+    with open(path, "rb") as f:
+        f.seek(offset)
+        decompressor = zlib.decompressobj(31)
+        pending = b""
+        while True:
+            chunk = f.read(256 * 1024)
+            if not chunk:
+                break
+            while chunk:
+                data = decompressor.decompress(chunk)
+                pending += data
+                if decompressor.eof:
+                    chunk = decompressor.unused_data
+                    decompressor = zlib.decompressobj(31)
+                else:
+                    chunk = b""
+            *complete, pending = pending.split(b"\n")
+            for raw in complete:
+                if raw:
+                    yield LogLine.model_validate_json(raw)
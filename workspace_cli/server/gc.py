@@ -0,0 +1,219 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from workspace_cli.models import GcReport, RepoGcResult, Workspace, WorkspaceEntry
+from workspace_cli.server.jobs import report_progress
+from workspace_cli.utils.fs import tree_size
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+if TYPE_CHECKING:
+    from workspace_cli.server.manager import WorkspaceManager
+
+class GarbageCollector:
+    """
+    Cleans up what accumulates around the base over time.
+
+    - worktree metadata of deleted directories (`git worktree prune`)
+    - orphaned `<base>-<name>` directories whose worktree is gone (ones
+      with anything besides the `.git` file only with `remove_orphans`)
+    - workspace.json entries without a directory, and worktrees it misses
+    - the idle `preview` branch and merged branches of deleted workspaces
+    - repository maintenance (packed refs, repack, prune, commit-graph)
+      of every object store, with its size and lookup time before and after
+    """
+
+    def __init__(self, manager: "WorkspaceManager"):
+        self.manager = manager
+        # Seconds between scheduled runs, while started
+        self.interval: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self, dry_run: bool = False, remove_orphans: bool = False) -> GcReport:
+        from workspace_cli.server.manager import _in_thread
+
+        manager = self.manager
+        report = GcReport(dry_run=dry_run)
+
+        async with manager._registry_lock:
+            report_progress("worktrees", "Pruning worktree metadata")
+            report.pruned_worktrees = await _in_thread(self._prune_worktrees, dry_run)
+            # Only the disk is scanned in a thread; the registry is changed here on the loop
+            registered = {name: Path(ws.path) for name, ws in manager.workspaces.items()}
+            adopted, orphans = await _in_thread(self._scan, registered, report, remove_orphans)
+            if not dry_run:
+                self._apply(report, adopted)
+                for path in orphans:
+                    await _in_thread(manager.trash.move, path)
+            if report.unregistered_workspaces or report.adopted_workspaces:
+                if not dry_run:
+                    await _in_thread(manager.save_config)
+
+            report_progress("branches", "Removing stale branches")
+            async with manager._preview_lock, manager._repo_lock(manager.base_path):
+                await _in_thread(self._collect_branches, report, dry_run)
+
+        stores = await _in_thread(manager.object_stores)
+        for store, (repo, _) in stores.items():
+            result = RepoGcResult(path=str(repo))
+            report.repositories.append(result)
+            report_progress("maintenance", f"Maintaining {repo}")
+            async with manager._repo_lock(store):
+                try:
+                    await _in_thread(self._maintain, repo, store, result, dry_run)
+                except Exception as e:
+                    logger.warning(f"Maintenance of {repo} failed: {e}")
+                    result.error = str(e)
+        return report
+
+    def _prune_worktrees(self, dry_run: bool):
+        with self.manager._git_config_lock:
+            return self.manager.git.prune_worktrees(self.manager.base_path, dry_run)
+
+    def _scan(self, registered: Dict[str, Path], report: GcReport, remove_orphans: bool) -> Tuple[List[Workspace], List[Path]]:
+        """
+        Match the registered workspaces (name -> path) with the directories
+        and worktrees on disk (blocking). Fills in the report and returns the
+        worktrees to register and the orphaned directories to remove; nothing
+        is changed here.
+        """
+        base = self.manager.base_path
+        prefix = f"{base.name}-"
+
+        # Registered workspaces whose directory is gone
+        report.unregistered_workspaces += [name for name, path in registered.items() if not path.exists()]
+
+        # Worktrees following the naming scheme that nobody registered
+        known = {path.resolve() for path in registered.values()}
+        worktrees = {path.resolve(): branch for path, branch in self.manager.git.list_worktrees(base)}
+        adopted = []
+        for path, branch in worktrees.items():
+            if path == base.resolve() or path in known or path.parent != base.parent.resolve():
+                continue
+            if not path.name.startswith(prefix) or not path.exists():
+                continue
+            name = path.name[len(prefix):]
+            report.adopted_workspaces.append(name)
+            adopted.append(Workspace(name=name, path=str(path), branch=branch or "HEAD"))
+
+        # <base>-<name> directories that point at a worktree git no longer knows
+        orphans = []
+        for path in sorted(base.parent.glob(f"{prefix}*")):
+            if not path.is_dir() or path.resolve() in worktrees:
+                continue
+            dot_git = path / ".git"
+            if dot_git.is_file():
+                git_dir = dot_git.read_text().split("gitdir:", 1)[-1].strip()
+                orphaned = not (path / git_dir).exists()
+            else:
+                # Never touch real clones or unrelated data, only leftovers
+                orphaned = not dot_git.exists() and not any(path.iterdir())
+            if not orphaned:
+                continue
+            # It may still hold uncommitted or untracked work, so that is only deleted on request
+            if remove_orphans or all(entry.name == ".git" for entry in path.iterdir()):
+                report.removed_directories.append(str(path))
+                orphans.append(path)
+            else:
+                report.orphaned_directories.append(str(path))
+        return adopted, orphans
+
+    def _apply(self, report: GcReport, adopted: List[Workspace]):
+        """Apply a scan to the registry and workspace.json (on the loop, under the registry lock)."""
+        manager = self.manager
+        base = manager.base_path
+        for name in report.unregistered_workspaces:
+            manager.workspaces.pop(name, None)
+            if manager.config:
+                manager.config.workspaces.pop(name, None)
+        for workspace in adopted:
+            manager.workspaces[workspace.name] = workspace
+            if manager.config:
+                manager.config.workspaces[workspace.name] = WorkspaceEntry(path=os.path.relpath(workspace.path, base))
+
+    def _collect_branches(self, report: GcReport, dry_run: bool):
+        """Delete the idle preview branch and merged branches of deleted workspaces (blocking)."""
+        manager = self.manager
+        base = manager.base_path
+        checked_out = {branch for _, branch in manager.git.list_worktrees(base) if branch}
+
+        candidates = []
+        if manager.preview_session is None and "preview" not in checked_out:
+            candidates += manager.git.list_branches(base, "preview")
+        for branch in manager.git.list_branches(base, "workspace-*/stand"):
+            name = branch[len("workspace-"):-len("/stand")]
+            if branch in checked_out or name in manager.workspaces:
+                continue
+            # Unmerged work is kept
+            try:
+                if not manager.git.is_ancestor(base, branch, "origin/main"):
+                    continue
+            except Exception:
+                continue
+            candidates.append(branch)
+
+        for branch in candidates:
+            report.deleted_branches.append(branch)
+            if not dry_run:
+                manager.git.delete_branch(base, branch)
+
+    def _store_size(self, store: Path) -> int:
+        # Submodule stores inside it are measured as repositories of their own,
+        # and the preview log archive isn't part of the repository
+        from workspace_cli.server.archive import ARCHIVE_DIR
+
+        exclude = [store / "modules", store / ARCHIVE_DIR] + list(store.glob("worktrees/*/modules"))
+        return tree_size(store, exclude)
+
+    def _maintain(self, repo: Path, store: Path, result: RepoGcResult, dry_run: bool):
+        result.size_before = self._store_size(store)
+        result.lookup_ms_before = self._time_lookups(repo)
+        if dry_run:
+            result.size_after, result.lookup_ms_after = result.size_before, result.lookup_ms_before
+            return
+        self.manager.git.maintain(repo)
+        result.size_after = self._store_size(store)
+        result.lookup_ms_after = self._time_lookups(repo)
+
+    def _time_lookups(self, repo: Path) -> float:
+        """Best of three runs of lookups the daemon does all the time, in milliseconds."""
+        git = self.manager.git
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            try:
+                git.get_commit_hash(repo, "HEAD")
+                git.run_git_cmd(["for-each-ref", "--count=100"], repo)
+                git.run_git_cmd(["rev-list", "--count", "--max-count=1000", "HEAD"], repo)
+            except Exception:
+                return 0.0
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return round(best, 2)
+
+    def start(self, interval: float):
+        """Run a collection every `interval` seconds in the background."""
+        if self._task is None:
+            self.interval = interval
+            self._task = asyncio.get_running_loop().create_task(self._loop(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                report = await self.run()
+                logger.info(f"Scheduled gc reclaimed {report.reclaimed_bytes} bytes")
+            except Exception as e:
+                logger.warning(f"Scheduled gc failed: {e}")
@@ -1,8 +1,11 @@
-from typing import Protocol, List, Optional
+from typing import Protocol, List, Optional, Tuple
 from pathlib import Path
 import subprocess
 import shutil
 
+# The tree with nothing in it: diffing a commit against it lists all its files
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
 class GitError(Exception):
     pass
 
@@ -10,7 +13,7 @@ class GitProvider(Protocol):
     def get_current_branch(self, path: Path) -> str:
         ...
     
-    def create_worktree(self, repo_path: Path, branch: str, path: Path) -> None:
+    def create_worktree(self, repo_path: Path, branch: str, path: Path, no_checkout: bool = False) -> None:
         ...
     
     def remove_worktree(self, path: Path) -> None:
@@ -21,32 +24,89 @@ class GitProvider(Protocol):
 
     def get_common_base(self, path: Path, commit1: str, commit2: str) -> str:
         ...
+
+    def is_ancestor(self, path: Path, ancestor: str, descendant: str = "HEAD") -> bool:
+        ...
+
+    def diff_names(self, path: Path, old: str, new: str) -> List[Tuple[str, str]]:
+        ...
         
     def checkout(self, path: Path, ref: str, force: bool = False) -> None:
         ...
         
     def clean(self, path: Path) -> None:
         ...
+
+    def list_untracked(self, path: Path) -> List[str]:
+        ...
+
+    def prune_worktrees(self, path: Path, dry_run: bool = False) -> List[str]:
+        ...
+
+    def list_worktrees(self, path: Path) -> List[Tuple[Path, Optional[str]]]:
+        ...
+
+    def list_branches(self, path: Path, pattern: str) -> List[str]:
+        ...
+
+    def delete_branch(self, path: Path, branch: str) -> None:
+        ...
+
+    def maintain(self, path: Path) -> None:
+        ...
         
     def fetch(self, path: Path) -> None:
         ...
+
+    def prefetch(self, path: Path) -> None:
+        ...
+
+    def publish_prefetch(self, path: Path) -> None:
+        ...
         
     def pull(self, path: Path, rebase: bool = False) -> None:
         ...
 
+    def rebase(self, path: Path, upstream: Optional[str] = None) -> None:
+        ...
+
+    def get_common_dir(self, path: Path) -> Path:
+        ...
+
+    def get_git_dir(self, path: Path) -> Path:
+        ...
+
     def push(self, path: Path, remote: str = "origin", branch: str = "main") -> None:
         ...
 
-    def update_submodules(self, path: Path) -> None:
+    def init_submodules(self, path: Path, paths: Optional[List[str]] = None) -> None:
+        ...
+
+    def update_submodules(self, path: Path, paths: Optional[List[str]] = None, jobs: Optional[int] = None) -> None:
+        ...
+
+    def clone_submodule(self, path: Path, sub_path: str) -> None:
+        ...
+
+    def set_sparse_checkout(self, path: Path, patterns: List[str]) -> None:
         ...
 
     def set_upstream(self, path: Path, branch: str, upstream: str) -> None:
         ...
 
+    def supports_fsmonitor(self) -> bool:
+        ...
+
+    def enable_fs_cache(self, path: Path) -> None:
+        ...
+
     def run_git_cmd(self, args: List[str], cwd: Path) -> str:
         ...
 
 class ShellGitProvider:
+    def __init__(self):
+        self._fsmonitor_supported: Optional[bool] = None
+
     def run_git_cmd(self, args: List[str], cwd: Path) -> str:
         try:
             result = subprocess.run(
@@ -63,7 +123,7 @@ class ShellGitProvider:
     def get_current_branch(self, path: Path) -> str:
         return self.run_git_cmd(["rev-parse", "--abbrev-ref", "HEAD"], path)
 
-    def create_worktree(self, repo_path: Path, branch: str, path: Path) -> None:
+    def create_worktree(self, repo_path: Path, branch: str, path: Path, no_checkout: bool = False) -> None:
         # Check if branch exists
         try:
             self.run_git_cmd(["rev-parse", "--verify", branch], repo_path)
@@ -72,6 +132,9 @@ class ShellGitProvider:
             exists = False
 
         cmd = ["worktree", "add", "-f"]
+        if no_checkout:
+            # Caller materialises the tree later (e.g. after setting sparse patterns)
+            cmd.append("--no-checkout")
         if not exists:
             cmd.extend(["-b", branch, str(path)])
         else:
@@ -93,6 +156,24 @@ class ShellGitProvider:
     def get_common_base(self, path: Path, commit1: str, commit2: str) -> str:
         return self.run_git_cmd(["merge-base", commit1, commit2], path)
 
+    def is_ancestor(self, path: Path, ancestor: str, descendant: str = "HEAD") -> bool:
+        # Exit status 1 is the answer "no", anything else non-zero is an error
+        result = subprocess.run(
+            ["git", "merge-base", "--is-ancestor", ancestor, descendant],
+            cwd=path,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode not in (0, 1):
+            raise GitError(f"Git command failed: {result.stderr}")
+        return result.returncode == 0
+
+    def diff_names(self, path: Path, old: str, new: str) -> List[Tuple[str, str]]:
+        # (status letter, path) of every file that differs between two commits
+        output = self.run_git_cmd(["diff", "--name-status", "--no-renames", "-z", old, new], path)
+        fields = [field for field in output.split("\0") if field]
+        return [(fields[i][0], fields[i + 1]) for i in range(0, len(fields) - 1, 2)]
+
     def checkout(self, path: Path, ref: str, force: bool = False) -> None:
         args = ["checkout", ref]
         if force:
@@ -103,24 +184,151 @@ class ShellGitProvider:
         self.run_git_cmd(["clean", "-fdx"], path)
         self.run_git_cmd(["reset", "--hard", "HEAD"], path)
 
+    def list_untracked(self, path: Path) -> List[str]:
+        # What `clean -fdx` would remove; untracked directories are listed once
+        output = self.run_git_cmd(["clean", "-ndx"], path)
+        prefix = "Would remove "
+        return [
+            line[len(prefix):].rstrip("/")
+            for line in output.splitlines()
+            if line.startswith(prefix) and not line.startswith(prefix + '"')
+        ]
+
+    def prune_worktrees(self, path: Path, dry_run: bool = False) -> List[str]:
+        # Returns git's "Removing worktrees/<id>: <reason>" lines (printed on stderr)
+        args = ["git", "worktree", "prune", "--verbose"]
+        if dry_run:
+            args.append("--dry-run")
+        result = subprocess.run(args, cwd=path, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise GitError(f"Git command failed: {result.stderr}")
+        return [line for line in result.stderr.splitlines() if line.startswith("Removing ")]
+
+    def list_worktrees(self, path: Path) -> List[Tuple[Path, Optional[str]]]:
+        # (path, branch or None when detached) of every worktree, the main one first
+        worktrees = []
+        for block in self.run_git_cmd(["worktree", "list", "--porcelain"], path).split("\n\n"):
+            fields = dict(line.split(" ", 1) for line in block.splitlines() if " " in line)
+            if "worktree" in fields:
+                branch = fields.get("branch")
+                worktrees.append((Path(fields["worktree"]), branch[len("refs/heads/"):] if branch else None))
+        return worktrees
+
+    def list_branches(self, path: Path, pattern: str) -> List[str]:
+        output = self.run_git_cmd(["branch", "--list", "--format=%(refname:short)", pattern], path)
+        return output.splitlines() if output else []
+
+    def delete_branch(self, path: Path, branch: str) -> None:
+        self.run_git_cmd(["branch", "-D", branch], path)
+
+    def maintain(self, path: Path) -> None:
+        # What `git gc` does, minus the parts that would race with the daemon:
+        # unreachable objects younger than two weeks are kept
+        self.run_git_cmd(["pack-refs", "--all"], path)
+        self.run_git_cmd(["repack", "-d", "-l", "-A", "--unpack-unreachable=2.weeks.ago", "-q"], path)
+        self.run_git_cmd(["prune", "--expire=2.weeks.ago"], path)
+        self.run_git_cmd(["commit-graph", "write", "--reachable"], path)
+
     def fetch(self, path: Path) -> None:
         self.run_git_cmd(["fetch", "--all"], path)
 
+    def prefetch(self, path: Path) -> None:
+        # Like `git maintenance run --task=prefetch`: objects, plus refs under
+        # refs/prefetch/ only. Remote-tracking refs and FETCH_HEAD, which
+        # checkouts read, stay where they are.
+        for remote in self.run_git_cmd(["remote"], path).split():
+            self.run_git_cmd([
+                "fetch", remote, "--prune", "--no-tags", "--no-write-fetch-head",
+                "--recurse-submodules=no", "--refmap=",
+                f"+refs/heads/*:refs/prefetch/remotes/{remote}/*"
+            ], path)
+
+    def publish_prefetch(self, path: Path) -> None:
+        # Local and quick: move the remote-tracking refs to what prefetch fetched
+        self.run_git_cmd([
+            "fetch", ".", "--no-tags", "--no-write-fetch-head", "--recurse-submodules=no", "--refmap=",
+            "+refs/prefetch/remotes/*:refs/remotes/*"
+        ], path)
+
     def pull(self, path: Path, rebase: bool = False) -> None:
         args = ["pull"]
         if rebase:
             args.append("--rebase")
         self.run_git_cmd(args, path)
 
+    def rebase(self, path: Path, upstream: Optional[str] = None) -> None:
+        # Local-only counterpart of `pull --rebase` once the remote has been fetched
+        args = ["rebase"]
+        if upstream:
+            args.append(upstream)
+        self.run_git_cmd(args, path)
+
+    def get_common_dir(self, path: Path) -> Path:
+        # Worktrees of one repository share this directory (and its object store)
+        common_dir = Path(self.run_git_cmd(["rev-parse", "--git-common-dir"], path))
+        if not common_dir.is_absolute():
+            common_dir = path / common_dir
+        return common_dir.resolve()
+
+    def get_git_dir(self, path: Path) -> Path:
+        # Per-worktree (or per-submodule) git directory, unlike get_common_dir
+        return Path(self.run_git_cmd(["rev-parse", "--absolute-git-dir"], path))
+
     def push(self, path: Path, remote: str = "origin", branch: str = "main") -> None:
         self.run_git_cmd(["push", remote, branch], path)
 
-    def update_submodules(self, path: Path) -> None:
-        self.run_git_cmd(["submodule", "update", "--init", "--recursive"], path)
+    def init_submodules(self, path: Path, paths: Optional[List[str]] = None) -> None:
+        # Only registers the submodules in .git/config; `update` does the cloning
+        args = ["submodule", "init"]
+        if paths is not None:
+            args.append("--")
+            args.extend(paths)
+        self.run_git_cmd(args, path)
+
+    def update_submodules(self, path: Path, paths: Optional[List[str]] = None, jobs: Optional[int] = None) -> None:
+        args = ["submodule", "update", "--init", "--recursive"]
+        if jobs:
+            args.extend(["--jobs", str(jobs)])
+        if paths is not None:
+            args.append("--")
+            args.extend(paths)
+        self.run_git_cmd(args, path)
+
+    def clone_submodule(self, path: Path, sub_path: str) -> None:
+        # Clone an initialised submodule into git's usual place without
+        # checking anything out, so a sparse checkout can be set up first
+        output = self.run_git_cmd(["config", "-f", ".gitmodules", "--get-regexp", r"^submodule\..*\.path$"], path)
+        names = {value: key[len("submodule."):-len(".path")]
+                 for key, value in (line.split(" ", 1) for line in output.splitlines())}
+        name = names[sub_path]
+        url = self.run_git_cmd(["config", f"submodule.{name}.url"], path)
+        git_dir = self.get_git_dir(path) / "modules" / name
+        git_dir.parent.mkdir(parents=True, exist_ok=True)
+        self.run_git_cmd(["clone", "--no-checkout", "--separate-git-dir", str(git_dir), url, str(path / sub_path)], path)
+
+    def set_sparse_checkout(self, path: Path, patterns: List[str]) -> None:
+        self.run_git_cmd(["sparse-checkout", "set", "--cone"] + patterns, path)
 
     def set_upstream(self, path: Path, branch: str, upstream: str) -> None:
         self.run_git_cmd(["branch", "--set-upstream-to", upstream, branch], path)
 
+    def supports_fsmonitor(self) -> bool:
+        """Whether this git build ships the built-in fsmonitor daemon."""
+        if self._fsmonitor_supported is None:
+            try:
+                options = self.run_git_cmd(["version", "--build-options"], Path.cwd())
+                self._fsmonitor_supported = "fsmonitor--daemon" in options
+            except GitError:
+                self._fsmonitor_supported = False
+        return self._fsmonitor_supported
+
+    def enable_fs_cache(self, path: Path) -> None:
+        # Cache untracked directory mtimes and let the fsmonitor daemon report
+        # changed paths, so status/diff/reset stop stat-ing the whole tree.
+        self.run_git_cmd(["config", "core.untrackedCache", "true"], path)
+        if self.supports_fsmonitor():
+            self.run_git_cmd(["config", "core.fsmonitor", "true"], path)
+
 class MockGitProvider:
     def __init__(self):
         self.calls = []
@@ -135,8 +343,11 @@ class MockGitProvider:
         self.calls.append(("get_current_branch", path))
         return self.responses.get("get_current_branch", "main")
 
-    def create_worktree(self, repo_path: Path, branch: str, path: Path) -> None:
-        self.calls.append(("create_worktree", repo_path, branch, path))
+    def create_worktree(self, repo_path: Path, branch: str, path: Path, no_checkout: bool = False) -> None:
+        if no_checkout:
+            self.calls.append(("create_worktree", repo_path, branch, path, no_checkout))
+        else:
+            self.calls.append(("create_worktree", repo_path, branch, path))
         self.worktrees[str(path)] = branch
 
     def remove_worktree(self, path: Path) -> None:
@@ -152,23 +363,88 @@ class MockGitProvider:
         self.calls.append(("get_common_base", path, commit1, commit2))
         return self.responses.get("get_common_base", "base_hash")
 
+    def is_ancestor(self, path: Path, ancestor: str, descendant: str = "HEAD") -> bool:
+        self.calls.append(("is_ancestor", path, ancestor, descendant))
+        return self.responses.get(f"is_ancestor:{path}", False)
+
+    def diff_names(self, path: Path, old: str, new: str) -> List[Tuple[str, str]]:
+        self.calls.append(("diff_names", path, old, new))
+        return self.responses.get(f"diff_names:{path}", [])
+
     def checkout(self, path: Path, ref: str, force: bool = False) -> None:
         self.calls.append(("checkout", path, ref, force))
 
     def clean(self, path: Path) -> None:
         self.calls.append(("clean", path))
 
+    def list_untracked(self, path: Path) -> List[str]:
+        self.calls.append(("list_untracked", path))
+        return self.responses.get("list_untracked", [])
+
+    def prune_worktrees(self, path: Path, dry_run: bool = False) -> List[str]:
+        self.calls.append(("prune_worktrees", path))
+        return self.responses.get("prune_worktrees", [])
+
+    def list_worktrees(self, path: Path) -> List[Tuple[Path, Optional[str]]]:
+        self.calls.append(("list_worktrees", path))
+        return self.responses.get("list_worktrees", [(path, "main")] + [(Path(p), b) for p, b in self.worktrees.items()])
+
+    def list_branches(self, path: Path, pattern: str) -> List[str]:
+        self.calls.append(("list_branches", path, pattern))
+        return self.responses.get(f"list_branches:{pattern}", [])
+
+    def delete_branch(self, path: Path, branch: str) -> None:
+        self.calls.append(("delete_branch", path, branch))
+
+    def maintain(self, path: Path) -> None:
+        self.calls.append(("maintain", path))
+
     def fetch(self, path: Path) -> None:
         self.calls.append(("fetch", path))
 
+    def prefetch(self, path: Path) -> None:
+        self.calls.append(("prefetch", path))
+
+    def publish_prefetch(self, path: Path) -> None:
+        self.calls.append(("publish_prefetch", path))
+
     def pull(self, path: Path, rebase: bool = False) -> None:
         self.calls.append(("pull", path, rebase))
 
+    def rebase(self, path: Path, upstream: Optional[str] = None) -> None:
+        self.calls.append(("rebase", path))
+
+    def get_common_dir(self, path: Path) -> Path:
+        self.calls.append(("get_common_dir", path))
+        return self.responses.get(f"get_common_dir:{path}", path / ".git")
+
+    def get_git_dir(self, path: Path) -> Path:
+        self.calls.append(("get_git_dir", path))
+        return self.responses.get(f"get_git_dir:{path}", path / ".git")
+
     def push(self, path: Path, remote: str = "origin", branch: str = "main") -> None:
         self.calls.append(("push", path, remote, branch))
 
-    def update_submodules(self, path: Path) -> None:
-        self.calls.append(("update_submodules", path))
+    def init_submodules(self, path: Path, paths: Optional[List[str]] = None) -> None:
+        self.calls.append(("init_submodules", path, paths))
+
+    def update_submodules(self, path: Path, paths: Optional[List[str]] = None, jobs: Optional[int] = None) -> None:
+        if paths is not None:
+            self.calls.append(("update_submodules", path, paths))
+        else:
+            self.calls.append(("update_submodules", path))
+
+    def clone_submodule(self, path: Path, sub_path: str) -> None:
+        self.calls.append(("clone_submodule", path, sub_path))
+
+    def set_sparse_checkout(self, path: Path, patterns: List[str]) -> None:
+        self.calls.append(("set_sparse_checkout", path, patterns))
 
     def set_upstream(self, path: Path, branch: str, upstream: str) -> None:
         self.calls.append(("set_upstream", path, branch, upstream))
+
+    def supports_fsmonitor(self) -> bool:
+        return self.responses.get("supports_fsmonitor", False)
+
+    def enable_fs_cache(self, path: Path) -> None:
+        self.calls.append(("enable_fs_cache", path))
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from workspace_cli.models import HookEntry, HookSpec
+
+class Hook:
+    def __init__(self, name: str, run: str, needs: List[str], timeout: Optional[float] = None, named: bool = False):
+        self.name = name
+        self.run = run
+        self.needs = needs
+        self.timeout = timeout
+        # Given a name in workspace.json (its output is labelled with it)
+        self.named = named
+
+    def __repr__(self):
+        return f"Hook({self.name!r}, needs={self.needs})"
+
+def build_hook_graph(entries: List[HookEntry]) -> List[Hook]:
+    """
+    Turn the hook entries of workspace.json into a dependency graph.
+
+    Each entry waits for all hooks of the entry before it, so a plain list
+    of commands still runs one after another. A list entry is a group whose
+    hooks run in parallel, and a hook with `needs` waits for exactly the
+    named hooks instead. Raises ValueError for duplicate or unknown names
+    and for cycles.
+    """
+    hooks: List[Hook] = []
+    by_name: Dict[str, Hook] = {}
+    previous: List[str] = []
+    for entry in entries:
+        group = entry if isinstance(entry, list) else [entry]
+        current = []
+        for item in group:
+            spec = HookSpec(run=item) if isinstance(item, str) else item
+            name = spec.name or f"#{len(hooks) + 1}"
+            if name in by_name:
+                raise ValueError(f"Duplicate hook name: {name}")
+            needs = list(spec.needs) if spec.needs is not None else list(previous)
+            hook = Hook(name, spec.run, needs, spec.timeout, named=spec.name is not None)
+            hooks.append(hook)
+            by_name[name] = hook
+            current.append(name)
+        previous = current
+
+    for hook in hooks:
+        for need in hook.needs:
+            if need not in by_name:
+                raise ValueError(f"Hook {hook.name} needs unknown hook {need}")
+
+    # Kahn's algorithm: anything left over is part of a cycle
+    pending = {hook.name: len(set(hook.needs)) for hook in hooks}
+    ready = [name for name, count in pending.items() if count == 0]
+    while ready:
+        done = ready.pop()
+        for hook in hooks:
+            if done in hook.needs:
+                pending[hook.name] -= 1
+                if pending[hook.name] == 0:
+                    ready.append(hook.name)
+        del pending[done]
+    if pending:
+        raise ValueError(f"Hooks depend on each other in a cycle: {', '.join(sorted(pending))}")
+    return hooks
+
+async def run_hook_graph(hooks: List[Hook], run_one: Callable[[Hook], Awaitable[None]]):
+    """
+    Run every hook as soon as the hooks it needs have succeeded.
+
+    After the first failure no new hook is started; the running ones finish
+    and the first error is raised. Hooks whose dependencies failed are skipped.
+    """
+    failures: List[Exception] = []
+    tasks: Dict[str, asyncio.Future] = {}
+
+    async def run(hook: Hook) -> bool:
+        deps = [tasks[name] for name in hook.needs]
+        if deps:
+            # asyncio.wait, unlike awaiting the task, doesn't cancel it if we're cancelled
+            await asyncio.wait(deps)
+        if failures or any(dep.cancelled() or dep.exception() or not dep.result() for dep in deps):
+            return False
+        try:
+            await run_one(hook)
+        except Exception as e:
+            failures.append(e)
+            raise
+        return True
+
+    tasks.update((hook.name, asyncio.ensure_future(run(hook))) for hook in hooks)
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    if failures:
+        raise failures[0]
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from workspace_cli.models import Job, JobEvent, JobStatus
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+# Job of the task currently running, so deep code can report progress without threading it through
+_current_job: ContextVar[Optional["JobHandle"]] = ContextVar("current_job", default=None)
+
+def report_progress(phase: str, message: Optional[str] = None):
+    """Record a progress event on the current job. No-op outside of a job (e.g. local CLI mode)."""
+    handle = _current_job.get()
+    if handle is not None:
+        handle.report(phase, message)
+
+class JobHandle:
+    """Runtime side of a Job: its task, and waiters for new events."""
+
+    def __init__(self, job: Job, loop: asyncio.AbstractEventLoop):
+        self.job = job
+        self.loop = loop
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+        self._loop_thread = threading.get_ident()
+
+    def report(self, phase: str, message: Optional[str] = None):
+        # Progress can come from worker threads (git runs off the event loop)
+        if threading.get_ident() != self._loop_thread:
+            self.loop.call_soon_threadsafe(self._append, phase, message)
+        else:
+            self._append(phase, message)
+
+    def _append(self, phase: str, message: Optional[str]):
+        event = JobEvent(seq=len(self.job.events), time=datetime.now(), phase=phase, message=message)
+        self.job.events.append(event)
+        self.job.phase = phase
+        self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    async def wait_changed(self):
+        await self._changed.wait()
+
+class JobManager:
+    """Runs long daemon operations as background tasks addressable by job id."""
+
+    def __init__(self, max_finished: int = 100):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, JobHandle]" = OrderedDict()
+
+    def submit(self, kind: str, factory: Callable[[], Awaitable]) -> Job:
+        """Start `factory()` as a job and return immediately."""
+        loop = asyncio.get_running_loop()
+        job = Job(id=uuid.uuid4().hex[:12], kind=kind, status=JobStatus.PENDING, created_at=datetime.now())
+        handle = JobHandle(job, loop)
+        self._jobs[job.id] = handle
+        handle.task = loop.create_task(self._run(handle, factory))
+        self._prune()
+        return job
+
+    async def _run(self, handle: JobHandle, factory: Callable[[], Awaitable]):
+        job = handle.job
+        _current_job.set(handle)
+        job.status = JobStatus.RUNNING
+        handle.report("started")
+        try:
+            result = await factory()
+            if hasattr(result, "model_dump"):
+                result = result.model_dump(mode="json")
+            job.result = result
+            job.status = JobStatus.SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+        except Exception as e:
+            logger.warning(f"Job {job.id} ({job.kind}) failed: {e}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = datetime.now()
+            handle.report(job.status.value.lower())
+
+    def _prune(self):
+        finished = [job_id for job_id, handle in self._jobs.items() if handle.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _handle(self, job_id: str) -> JobHandle:
+        if job_id not in self._jobs:
+            raise KeyError(job_id)
+        return self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job:
+        return self._handle(job_id).job
+
+    def list(self) -> List[Job]:
+        return [handle.job for handle in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> Job:
+        handle = self._handle(job_id)
+        if handle.job.status == JobStatus.PENDING:
+            # Never started, so _run won't get to record the cancellation
+            handle.job.status = JobStatus.CANCELLED
+            handle.job.finished_at = datetime.now()
+            handle.report("cancelled")
+        if handle.task and not handle.task.done():
+            handle.task.cancel()
+        return handle.job
+
+    async def wait(self, job_id: str) -> Job:
+        handle = self._handle(job_id)
+        while not handle.finished:
+            await handle.wait_changed()
+        return handle.job
+
+    async def events(self, job_id: str, since: int = 0):
+        """Yield progress events of a job, live, until it finishes."""
+        handle = self._handle(job_id)
+        seq = since
+        while True:
+            while seq < len(handle.job.events):
+                yield handle.job.events[seq]
+                seq += 1
+            if handle.finished:
+                break
+            await handle.wait_changed()
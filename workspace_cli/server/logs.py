@@ -0,0 +1,236 @@
+import asyncio
+import codecs
+import itertools
+import re
+import time
+from collections import deque
+from typing import Deque, Iterable, List, Optional
+from workspace_cli.models import LogFilter, LogLine, LogOverflowPolicy, LogStream, LogSubscriberMetrics
+
+# Lines kept per preview session; older ones are dropped
+DEFAULT_CAPACITY = 10000
+# Live lines queued per subscriber before its overflow policy applies
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Longer lines (in characters) are cut, e.g. minified bundles in a stack trace
+MAX_LINE_LENGTH = 64 * 1024
+
+_subscriber_ids = itertools.count(1)
+
+class LogBuffer:
+    """
+    Bounded history of the current preview session's log lines.
+
+    Lines are numbered from 0 within a session, so a client can resume
+    from the last sequence number it saw. Each preview switch starts a new
+    session (and numbering); memory is capped at `capacity` lines.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.session = 0
+        self.next_seq = 0
+        self.lines: Deque[LogLine] = deque(maxlen=capacity)
+
+    def reset(self):
+        self.session += 1
+        self.next_seq = 0
+        self.lines.clear()
+
+    def append(self, source: str, stream: LogStream, text: str) -> LogLine:
+        # Built without validation: this runs for every line a dev server prints
+        line = LogLine.model_construct(
+            session=self.session,
+            seq=self.next_seq,
+            source=source,
+            stream=stream,
+            time=time.time(),
+            text=text,
+            dropped=0
+        )
+        self.next_seq += 1
+        self.lines.append(line)
+        return line
+
+    @property
+    def first_seq(self) -> int:
+        """Oldest sequence number still held (== next_seq when empty)."""
+        return self.lines[0].seq if self.lines else self.next_seq
+
+    def since(self, seq: int) -> List[LogLine]:
+        """Held lines with a sequence number >= seq."""
+        start = max(0, seq - self.first_seq)
+        return list(itertools.islice(self.lines, start, None))
+
+    def tail(self, count: int) -> List[LogLine]:
+        return self.since(self.next_seq - max(0, count))
+
+def stage_of(source: str) -> str:
+    """The stage a source belongs to: "preview-2" -> "preview", "before_clear:codegen" -> "before_clear"."""
+    stage = source.split(":", 1)[0]
+    return "preview" if stage.startswith("preview-") else stage
+
+class LogMatcher:
+    """A LogFilter compiled once, for all subscribers using it."""
+
+    def __init__(self, spec: LogFilter):
+        self.spec = spec
+        self.sources = frozenset(spec.sources)
+        self.streams = frozenset(spec.streams)
+        self.stages = frozenset(spec.stages)
+        self.pattern = re.compile(spec.grep) if spec.grep else None
+
+    def matches(self, line: LogLine) -> bool:
+        if self.sources and line.source not in self.sources:
+            return False
+        if self.streams and line.stream not in self.streams:
+            return False
+        if self.stages and stage_of(line.source) not in self.stages:
+            return False
+        return self.pattern is None or self.pattern.search(line.text) is not None
+
+class LineSplitter:
+    """
+    Turns chunks of process output into lines.
+
+    Decodes UTF-8 incrementally (a character split across chunks is kept
+    for the next one) and holds at most `max_length` characters of an
+    unfinished line: the rest of an over-long line is counted and dropped,
+    and the line ends with a note saying how much was cut.
+    """
+
+    def __init__(self, max_length: int = MAX_LINE_LENGTH):
+        self.max_length = max_length
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parts: List[str] = []
+        self._length = 0
+        self._truncated = 0
+
+    def feed(self, data: bytes) -> List[str]:
+        """Complete lines in `data` (plus what was carried over), without line breaks."""
+        text = self._decoder.decode(data)
+        lines = []
+        start = 0
+        while True:
+            end = text.find("\n", start)
+            if end < 0:
+                self._add(text[start:])
+                return lines
+            self._add(text[start:end])
+            lines.append(self._take())
+            start = end + 1
+
+    def flush(self) -> List[str]:
+        """The unfinished last line, once the stream has ended."""
+        self._add(self._decoder.decode(b"", final=True))
+        return [self._take()] if self._parts or self._truncated else []
+
+    def _add(self, segment: str):
+        if not segment:
+            return
+        room = self.max_length - self._length
+        if len(segment) > room:
+            self._truncated += len(segment) - max(room, 0)
+            segment = segment[:max(room, 0)]
+            if not segment:
+                return
+        self._parts.append(segment)
+        self._length += len(segment)
+
+    def _take(self) -> str:
+        line = "".join(self._parts)
+        if line.endswith("\r"):
+            line = line[:-1]
+        if self._truncated:
+            line += f" [... {self._truncated} characters truncated]"
+        self._parts, self._length, self._truncated = [], 0, 0
+        return line
+
+class LogSubscriber:
+    """
+    One client following the preview logs.
+
+    Replayed lines come straight from the buffer; live lines wait in a queue
+    of at most `maxsize` entries, so a client that stops reading can't make
+    the daemon grow. When the queue is full, `policy` decides whether the
+    oldest queued line or the new line is dropped, or the subscriber is
+    disconnected (it can resume from the buffer). Lost lines are reported on
+    the next line the subscriber gets, in `LogLine.dropped`.
+    """
+
+    def __init__(
+        self,
+        backlog: Iterable[LogLine] = (),
+        last_seq: int = -1,
+        maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+        policy: LogOverflowPolicy = LogOverflowPolicy.DROP_OLDEST,
+        filter: Optional[LogFilter] = None
+    ):
+        self.id = next(_subscriber_ids)
+        self.filter = filter
+        # Subscribers with equal filters share a group
+        self.group: Optional[tuple] = filter.key() if filter else None
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.backlog: Deque[LogLine] = deque(backlog)
+        # [line, lines dropped right before it]
+        self.queue: Deque[list] = deque()
+        self.dropped = 0
+        # Sequence number of the last line handed out
+        self.last_seq = last_seq
+        self.closed = False
+        self._pending_dropped = 0
+        self._ready = asyncio.Event()
+
+    def put(self, line: LogLine):
+        if self.closed:
+            return
+        if len(self.queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == LogOverflowPolicy.DISCONNECT:
+                self.close(discard=True)
+                return
+            if self.policy == LogOverflowPolicy.DROP_NEWEST:
+                self._pending_dropped += 1
+                return
+            _, before = self.queue.popleft()
+            if self.queue:
+                self.queue[0][1] += before + 1
+            else:
+                self._pending_dropped += before + 1
+        self.queue.append([line, self._pending_dropped])
+        self._pending_dropped = 0
+        self._ready.set()
+
+    def close(self, discard: bool = False):
+        """End the subscription once the queued lines are read (or right away with `discard`)."""
+        self.closed = True
+        if discard:
+            self.backlog.clear()
+            self.queue.clear()
+        self._ready.set()
+
+    async def get(self) -> Optional[LogLine]:
+        """Next line, or None once the subscription has ended."""
+        if self.backlog:
+            line = self.backlog.popleft()
+        else:
+            while not self.queue:
+                if self.closed:
+                    return None
+                self._ready.clear()
+                await self._ready.wait()
+            line, before = self.queue.popleft()
+            if before:
+                line = line.model_copy(update={"dropped": before})
+        self.last_seq = line.seq
+        return line
+
+    def metrics(self, next_seq: int) -> LogSubscriberMetrics:
+        return LogSubscriberMetrics(
+            id=self.id,
+            policy=self.policy,
+            filter=self.filter,
+            queued=len(self.backlog) + len(self.queue),
+            capacity=self.maxsize,
+            dropped=self.dropped,
+            lag=max(0, next_seq - 1 - self.last_seq)
+        )
@@ -1,15 +1,44 @@
 import asyncio
-from typing import Dict, Optional, List
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, List, Set, Tuple
 from pathlib import Path
-from workspace_cli.models import Workspace, PreviewSession, DaemonStatus, PreviewStatus
-from workspace_cli.server.git import GitProvider, ShellGitProvider
+from workspace_cli.models import Workspace, PreviewSession, DaemonStatus, PreviewStatus, ReadinessStatus, SyncResult, SyncStatus, WorkspaceSyncResult, CreateResult, CreateStatus, WorkspaceCreateResult, GcReport, LogFilter, LogOverflowPolicy, Metrics
+from workspace_cli.server.git import GitProvider, ShellGitProvider, GitError
 from workspace_cli.server.watcher import Watcher
 from workspace_cli.server.runner import PreviewRunner
+from workspace_cli.server.jobs import JobManager, report_progress
+from workspace_cli.server.trash import Trash
+from workspace_cli.server.resources import ResourceMonitor
 from workspace_cli.config import load_config
 
 from workspace_cli.utils.logger import get_logger
 logger = get_logger()
 
+async def _in_thread(fn, *args):
+    """
+    Run blocking work (git, file copies) in a worker thread.
+
+    If the calling job is cancelled, the running command is allowed to finish
+    before the cancellation propagates, so locks are never released under it.
+    """
+    import contextvars
+    import functools
+
+    # asyncio.to_thread (3.9+), spelled out: the job context (progress reporting) goes along
+    context = contextvars.copy_context()
+    future = asyncio.get_running_loop().run_in_executor(None, functools.partial(context.run, fn, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        try:
+            await future
+        except Exception:
+            pass
+        raise
+
 class WorkspaceManager:
     _instance = None
 
@@ -18,11 +47,66 @@ class WorkspaceManager:
         self.git = git_provider or ShellGitProvider()
         self.workspaces: Dict[str, Workspace] = {}
         self.preview_session: Optional[PreviewSession] = None
+        self._readiness_task: Optional[asyncio.Task] = None
+        self.resources = ResourceMonitor(self)
         self.watcher = None
         self.runner = PreviewRunner(base_path)
-        self.is_syncing: bool = False
-        self._lock = asyncio.Lock()
+        self._active_syncs = 0
+        # Locking model (acquire in this order, never the reverse):
+        #   _registry_lock  - workspace registry: create, delete, config (re)load
+        #   _preview_lock   - the preview slot: session, watcher and runner
+        #   _repo_lock(p)   - one per checkout (i.e. per workspace) or git dir;
+        #                     a workspace being created before its template's
+        #   _config_lock    - writes of workspace.json (threading lock, also used off-loop)
+        # get_status takes none of them and reads a snapshot. The prefetcher only
+        # takes locks that are free, so it never waits on (or deadlocks with) them.
+        self._registry_lock = asyncio.Lock()
+        self._preview_lock = asyncio.Lock()
+        self._repo_locks: Dict[str, asyncio.Lock] = {}
+        self._config_lock = threading.Lock()
+        # Serialises git commands that write the base's shared .git/config, refs or
+        # worktree list (threading lock, taken off-loop inside a repo lock)
+        self._git_config_lock = threading.Lock()
         self.config: Optional[WorkspaceConfig] = None
+        self.jobs = JobManager()
+        # Object store -> monotonic time of its last successful fetch
+        self._fetched_at: Dict[str, float] = {}
+        self._trash: Optional[Trash] = None
+        # Background services of the daemon, following the config (see start_background)
+        self._background = False
+        self.prefetcher = None
+        self.collector = None
+
+    @property
+    def is_syncing(self) -> bool:
+        return self._active_syncs > 0
+
+    def _repo_lock(self, path: Path) -> asyncio.Lock:
+        key = str(Path(path).resolve())
+        if key not in self._repo_locks:
+            self._repo_locks[key] = asyncio.Lock()
+        return self._repo_locks[key]
+
+    @property
+    def trash(self) -> Trash:
+        """Background deletion area next to the base workspace (same filesystem)."""
+        root = self.base_path.parent / f".{self.base_path.name}-trash"
+        if self._trash is None or self._trash.root != root:
+            self._trash = Trash(root)
+        return self._trash
+
+    def mark_fetched(self, store: Path):
+        self._fetched_at[str(store)] = time.monotonic()
+
+    def fetched_within(self, store: Path, seconds: Optional[float]) -> bool:
+        """Whether an object store was fetched (by a sync or the prefetcher) in the last `seconds`."""
+        age = self.fetch_age(store)
+        return bool(seconds) and age is not None and age < seconds
+
+    def fetch_age(self, store: Path) -> Optional[float]:
+        """Seconds since an object store was last fetched, if it was."""
+        fetched_at = self._fetched_at.get(str(store))
+        return time.monotonic() - fetched_at if fetched_at is not None else None
 
     @classmethod
     def get_instance(cls, base_path: Path = None, git_provider: GitProvider = None) -> 'WorkspaceManager':
@@ -33,13 +117,18 @@ class WorkspaceManager:
         return cls._instance
 
     async def get_status(self) -> DaemonStatus:
-        async with self._lock:
-            # logger.debug(f"get_status called. Workspaces: {list(self.workspaces.keys())}")
-            return DaemonStatus(
-                active_preview=self.preview_session.workspace_name if self.preview_session else None,
-                workspaces=list(self.workspaces.values()),
-                is_syncing=self.is_syncing
-            )
+        # Lock-free: nothing here awaits, so the snapshot is consistent on the event loop
+        # logger.debug(f"get_status called. Workspaces: {list(self.workspaces.keys())}")
+        session = self.preview_session
+        return DaemonStatus(
+            active_preview=session.workspace_name if session else None,
+            preview=session.model_copy() if session else None,
+            workspaces=[ws.model_copy() for ws in self.workspaces.values()],
+            is_syncing=self.is_syncing,
+            trash=self.trash.status(),
+            preview_processes=self.resources.snapshot(),
+            preview_commands=self.runner.command_status()
+        )
 
     async def initialize(self):
         """Load existing workspaces from disk/config"""
@@ -69,6 +158,10 @@ class WorkspaceManager:
                 setup_logging(debug=debug_mode, log_file=self.config.log_path)
                 logger.debug(f"Logging configured to {self.config.log_path}")
 
+            self._enable_fs_cache(self.base_path)
+            self.trash.start()
+            self._setup_log_archive()
+
             self.workspaces = {}
             for name, entry in self.config.workspaces.items():
                 ws_path = Path(entry.path)
@@ -86,7 +179,8 @@ class WorkspaceManager:
                 self.workspaces[name] = Workspace(
                     name=name,
                     path=str(ws_path),
-                    branch=branch
+                    branch=branch,
+                    profile=entry.profile
                 )
             # logger.debug(f"Loaded config with workspaces: {list(self.workspaces.keys())}")
         except FileNotFoundError as e:
@@ -96,14 +190,26 @@ class WorkspaceManager:
             logger.warning(f"Failed to load config: {e}")
             raise e
 
+    def _setup_log_archive(self):
+        """Archive preview logs in the base repository's git dir, where `git clean` can't reach them."""
+        from workspace_cli.server.archive import ARCHIVE_DIR, LogArchive
+        try:
+            root = self.git.get_git_dir(self.base_path) / ARCHIVE_DIR
+        except Exception as e:
+            logger.warning(f"Preview logs won't be archived: {e}")
+            return
+        self.runner.set_archive(LogArchive(root, self.config.log_retention_mb * 2**20))
+
     async def ensure_config(self, project_root: str):
         """Ensure configuration is loaded from project_root."""
-        async with self._lock:
+        async with self._registry_lock:
             if self.config is None:
                 logger.debug(f"Initializing config from {project_root}")
                 self.base_path = Path(project_root)
                 self.runner.base_path = self.base_path # Update runner base path too
                 await self.initialize()
+                # Intervals of a config loaded after the daemon started apply from now on
+                await self.refresh_background()
             elif str(self.base_path) != str(project_root):
                 # Check if project_root is actually a feature workspace pointing to same base
                 try:
@@ -117,11 +223,97 @@ class WorkspaceManager:
                 except Exception:
                      logger.warning(f"Daemon is running for {self.base_path}, but request is for {project_root}. Ignoring request root.")
 
-    async def switch_preview(self, workspace_name: str, rebuild: bool = False):
-        async with self._lock:
+    async def start_background(self):
+        """
+        Start the daemon's background services (prefetch, gc, resource
+        sampling) as the config asks. They follow the config from then on,
+        including one loaded later by `ensure_config`.
+        """
+        self._background = True
+        await self.refresh_background()
+
+    async def refresh_background(self):
+        """(Re)start the background services to match the current config's intervals."""
+        if not self._background:
+            return
+        from workspace_cli.server.gc import GarbageCollector
+        from workspace_cli.server.prefetch import PrefetchScheduler
+
+        config = self.config
+        prefetch_interval = config.prefetch_interval if config else None
+        if self.prefetcher is not None and self.prefetcher.interval != prefetch_interval:
+            await self.prefetcher.stop()
+            self.prefetcher = None
+        if prefetch_interval and self.prefetcher is None:
+            self.prefetcher = PrefetchScheduler(self, prefetch_interval)
+            self.prefetcher.start()
+
+        gc_interval = config.gc_interval if config else None
+        if self.collector is not None and self.collector.interval != gc_interval:
+            await self.collector.stop()
+            self.collector = None
+        if gc_interval and self.collector is None:
+            self.collector = GarbageCollector(self)
+            self.collector.start(gc_interval)
+
+        await self.resources.stop()
+        if config and config.resource_interval:
+            self.resources.start(config.resource_interval)
+
+    async def stop_background(self):
+        self._background = False
+        await self.resources.stop()
+        if self.prefetcher is not None:
+            await self.prefetcher.stop()
+            self.prefetcher = None
+        if self.collector is not None:
+            await self.collector.stop()
+            self.collector = None
+
+    async def switch_preview(self, workspace_name: str, rebuild: bool = False, wait_ready: bool = False) -> PreviewSession:
+        """
+        Switch the preview to a workspace. With `wait_ready`, also wait for the
+        readiness probes of the preview commands (and fail if one fails);
+        otherwise their outcome shows up in the session later.
+        """
+        async with self._preview_lock:
             await self._switch_preview_internal(workspace_name, rebuild)
+            session = self.preview_session
+        if wait_ready and session.readiness == ReadinessStatus.WAITING:
+            report_progress("ready", "Waiting for the preview to be ready")
+            await asyncio.shield(self._readiness_task)
+            if session.readiness == ReadinessStatus.FAILED:
+                raise RuntimeError(f"Preview is not ready: {session.ready_error}")
+        return session.model_copy()
+
+    def _track_readiness(self, started: float):
+        """Follow the readiness probes of the preview just started, in the background."""
+        session = self.preview_session
+        if self._readiness_task is not None:
+            self._readiness_task.cancel()
+            self._readiness_task = None
+        session.readiness = ReadinessStatus.WAITING if self.runner.probes else ReadinessStatus.UNKNOWN
+        session.ready_at = session.time_to_ready = session.ready_error = None
+        if self.runner.probes:
+            self._readiness_task = asyncio.ensure_future(self._await_ready(session, started))
+
+    async def _await_ready(self, session: PreviewSession, started: float):
+        from datetime import datetime
+        try:
+            await self.runner.wait_ready()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            session.readiness = ReadinessStatus.FAILED
+            session.ready_error = str(e)
+            return
+        session.readiness = ReadinessStatus.READY
+        session.ready_at = datetime.now()
+        session.time_to_ready = round(time.monotonic() - started, 3)
+        logger.info(f"Preview of {session.workspace_name} ready after {session.time_to_ready}s")
 
     async def _switch_preview_internal(self, workspace_name: str, rebuild: bool = False):
+        started = time.monotonic()
         if workspace_name not in self.workspaces:
             # Auto-register if path exists
             ws_path = self.base_path.parent / f"{self.base_path.name}-{workspace_name}"
@@ -137,24 +329,69 @@ class WorkspaceManager:
         workspace = self.workspaces[workspace_name]
         
         # 1. Stop existing preview
+        report_progress("stop", f"Switching preview to {workspace_name}")
+        shutdown_seconds = None
         if self.preview_session:
             print(f"DEBUG: Stopping existing preview for {self.preview_session.workspace_name}")
             if self.watcher:
                 self.watcher.stop()
                 self.watcher = None
             await self.runner.stop()
+            shutdown_seconds = self.runner.last_stop_seconds
+            if shutdown_seconds is not None:
+                report_progress("stop", f"Stopped the previous preview in {shutdown_seconds:.1f}s")
+        self.runner.start_archive_session(workspace_name)
 
         # 2. Clean Preview Workspace (Base Path)
+        # Hold the base and feature checkouts so a concurrent sync can't rewrite them mid-switch
         target_path = self.base_path
-        
-        # Run before_clear hooks
-        if self.config and self.config.preview_hook.before_clear:
-            await self.runner.run_hooks(self.config.preview_hook.before_clear, "before_clear")
+        feature_path = Path(workspace.path)
+        async with self._repo_lock(target_path), self._repo_lock(feature_path):
+            # Run before_clear hooks
+            if self.config and self.config.preview_hook.before_clear:
+                report_progress("before_clear")
+                await self.runner.run_hooks(self.config.preview_hook.before_clear, "before_clear")
+
+            report_progress("reset", f"Resetting {target_path} and copying {feature_path}")
+            await _in_thread(self._reset_preview_tree, feature_path, target_path)
+
+        # 6. Start Watcher
+        # A sparse workspace only watches its profile; the rest belongs to the base
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.debug(f"Starting Watcher from {feature_path} to {target_path}")
+        self.watcher = Watcher(feature_path, target_path, include_paths=self._profile_patterns(workspace))
+        self.watcher.start()
+
+        # 7. Run Preview Commands and After Hooks
+        report_progress("start")
+        if self.config:
+            if self.config.preview:
+                await self.runner.start_preview(self.config.preview)
+            if self.config.preview_hook.after_preview:
+                # Run after hooks (maybe in background or parallel?)
+                # Usually after_preview might be "open browser" etc.
+                await self.runner.run_hooks(self.config.preview_hook.after_preview, "after_preview")
+
+        # Update Session
+        from datetime import datetime
+        self.preview_session = PreviewSession(
+            workspace_name=workspace_name,
+            start_time=datetime.now(),
+            status=PreviewStatus.RUNNING,
+            shutdown_seconds=shutdown_seconds
+        )
+        workspace.is_active = True
+        self._track_readiness(started)
 
+    def _reset_preview_tree(self, feature_path: Path, target_path: Path):
+        """Reset the preview checkout to the common base and copy the feature on top (blocking)."""
+        # Untracked trees (node_modules, build output) are renamed away and deleted in the background
+        for rel in self.git.list_untracked(target_path):
+            self.trash.move(target_path / rel)
         self.git.clean(target_path)
 
         # 3. Find Common Base
-        feature_path = Path(workspace.path)
         feature_commit = self.git.get_commit_hash(feature_path, "HEAD")
         main_commit = self.git.get_commit_hash(target_path, "main") # Or origin/main
         
@@ -177,42 +414,269 @@ class WorkspaceManager:
         
         shutil.copytree(feature_path, target_path, dirs_exist_ok=True, ignore=ignore_git)
 
-        # 6. Start Watcher
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.debug(f"Starting Watcher from {feature_path} to {target_path}")
-        self.watcher = Watcher(feature_path, target_path)
-        self.watcher.start()
+    def _repo_heads(self, path: Path, patterns: Optional[List[str]] = None) -> Dict[str, str]:
+        """HEAD of a checkout ("") and of each of its synced submodules, by relative path."""
+        heads = {"": self.git.get_commit_hash(path, "HEAD")}
+        for sub in self._synced_submodules(path, patterns):
+            if (path / sub.path / ".git").exists():
+                heads[str(sub.path)] = self.git.get_commit_hash(path / sub.path, "HEAD")
+        return heads
 
-        # 7. Run Preview Commands and After Hooks
-        if self.config:
-            if self.config.preview:
-                await self.runner.start_preview(self.config.preview)
-            if self.config.preview_hook.after_preview:
-                # Run after hooks (maybe in background or parallel?)
-                # Usually after_preview might be "open browser" etc.
-                await self.runner.run_hooks(self.config.preview_hook.after_preview, "after_preview")
+    def _changed_files(self, path: Path, before: Dict[str, str], after: Dict[str, str]) -> List[Tuple[str, str]]:
+        """
+        (status, path) of the files that changed in a checkout between two sets of repo heads.
 
-        # Update Session
-        from datetime import datetime
-        self.preview_session = PreviewSession(
-            workspace_name=workspace_name,
-            start_time=datetime.now(),
-            status=PreviewStatus.RUNNING
-        )
-        workspace.is_active = True
+        A submodule that appeared with the sync lists all its files as added.
+        One that went away is removed as a whole (its gitlink's "D"), followed
+        by the files it had, as far as its repository can still tell.
+        """
+        from workspace_cli.server.git import EMPTY_TREE
+
+        changes = []
+        for rel, new in after.items():
+            old = before.get(rel)
+            if old == new:
+                continue
+            repo = path / rel if rel else path
+            for status, name in self.git.diff_names(repo, old or EMPTY_TREE, new):
+                full = f"{rel}/{name}" if rel else name
+                # Gitlinks are covered by the submodule's own diff
+                if full not in after:
+                    changes.append((status, full))
+        for rel, old in before.items():
+            if rel in after:
+                continue
+            try:
+                files = self.git.diff_names(path / rel, old, EMPTY_TREE)
+            except Exception:
+                # The submodule's repository went with it
+                files = []
+            changes.extend(("D", f"{rel}/{name}") for _, name in files)
+        return changes
+
+    def _apply_changes(self, feature_path: Path, target_path: Path, changes: List[Tuple[str, str]], patterns: Optional[List[str]] = None):
+        """Mirror changed files of the feature checkout into the preview checkout (blocking)."""
+        import shutil
+        from workspace_cli.config import in_profile
+
+        for status, rel in changes:
+            parts = Path(rel).parts
+            if ".git" in parts or "node_modules" in parts:
+                continue
+            # Outside a sparse profile the preview keeps the base's files
+            if not in_profile(Path(rel), patterns):
+                continue
+            src = feature_path / rel
+            dst = target_path / rel
+            if dst.is_symlink() or dst.is_file():
+                dst.unlink()
+            elif dst.is_dir() and (status == "D" or not src.is_dir()):
+                shutil.rmtree(dst)
+            if status == "D" or not (src.exists() or src.is_symlink()):
+                continue
+            if src.is_dir() and not src.is_symlink():
+                shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True,
+                                ignore=lambda dir, files: [f for f in files if f in (".git", "node_modules")])
+            else:
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst, follow_symlinks=False)
+
+    async def _refresh_preview(self, workspace_name: str, before: Dict[str, str]):
+        """
+        Bring the running preview up to date after its workspace was synced.
+
+        Only the files that changed between the pre- and post-sync heads are
+        copied (or removed); the preview processes are restarted only when
+        one of the configured `preview_dependencies` changed.
+        """
+        from pathlib import PurePosixPath
+
+        workspace = self.workspaces[workspace_name]
+        feature_path = Path(workspace.path)
+        patterns = self._profile_patterns(workspace)
+        async with self._repo_lock(self.base_path), self._repo_lock(feature_path):
+            after = await _in_thread(self._repo_heads, feature_path, patterns)
+            changes = await _in_thread(self._changed_files, feature_path, before, after)
+            report_progress("preview", f"Applying {len(changes)} changed file(s) to the preview")
+            await _in_thread(self._apply_changes, feature_path, self.base_path, changes, patterns)
+
+        dependencies = self.config.preview_dependencies if self.config else []
+        changed_dependencies = [
+            rel for _, rel in changes
+            if any(PurePosixPath(rel).match(pattern) for pattern in dependencies)
+        ]
+        if changed_dependencies and self.config.preview:
+            report_progress("preview", f"Restarting preview ({changed_dependencies[0]} changed)")
+            started = time.monotonic()
+            # Same preview, same log session: clients following the logs stay connected
+            await self.runner.restart(self.config.preview)
+            if self.preview_session:
+                self.preview_session.shutdown_seconds = self.runner.last_stop_seconds
+                self._track_readiness(started)
+
+    def _enable_fs_cache(self, path: Path):
+        """Turn on the untracked cache (and fsmonitor where available) for a repo and its submodules."""
+        from workspace_cli.config import get_managed_repos
+
+        repos = [path] + [path / sub.path for sub in get_managed_repos(path)]
+        for repo in repos:
+            if not (repo / ".git").exists():
+                continue
+            try:
+                self.git.enable_fs_cache(repo)
+            except Exception as e:
+                logger.warning(f"Failed to enable fs cache for {repo}: {e}")
+
+    def _profile_patterns(self, workspace: Workspace) -> Optional[List[str]]:
+        """Sparse-checkout patterns of a workspace, or None for a full checkout."""
+        if not workspace.profile or not self.config:
+            return None
+        return self.config.profiles.get(workspace.profile)
+
+    def _create_worktree(self, ws_path: Path, branch_name: str, patterns: Optional[List[str]] = None):
+        """
+        Create and set up the worktree of a new workspace (blocking).
+
+        Safe to run for several workspaces at once: the steps that write the
+        base's shared .git/config, refs or worktree list are serialised, the
+        checkouts and submodule clones run concurrently.
+        """
+        from workspace_cli.config import get_managed_repos, split_profile
 
-    async def subscribe_to_logs(self):
-        """Subscribe to preview logs."""
-        queue = await self.runner.add_observer()
+        sparse = patterns is not None
+        with self._git_config_lock:
+            self.git.create_worktree(self.base_path, branch_name, ws_path, no_checkout=sparse)
+            self.git.set_upstream(self.base_path, branch_name, "origin/main")
+            if sparse:
+                self.git.set_sparse_checkout(ws_path, patterns)
+
+        # Only submodules inside a sparse profile are materialised
+        selection: Dict[str, Optional[List[str]]] = {}
+        sub_paths = None
+        if sparse:
+            self.git.checkout(ws_path, branch_name)
+            selection = split_profile(patterns, get_managed_repos(ws_path))
+            sub_paths = list(selection.keys())
+
+        if sub_paths is None or sub_paths:
+            with self._git_config_lock:
+                self.git.init_submodules(ws_path, sub_paths)
+        full_paths = None if sub_paths is None else [p for p in sub_paths if selection[p] is None]
+        if full_paths is None or full_paths:
+            self.git.update_submodules(ws_path, paths=full_paths)
+        for sub_path, sub_patterns in selection.items():
+            if not sub_patterns:
+                continue
+            # Partly covered: clone without a checkout and write the sparse
+            # patterns first, so the paths outside the profile are never written
+            sub_ws = ws_path / sub_path
+            self.git.clone_submodule(ws_path, sub_path)
+            self.git.set_sparse_checkout(sub_ws, sub_patterns)
+            self.git.checkout(sub_ws, self.git.get_commit_hash(ws_path, f"HEAD:{sub_path}"))
+            if (sub_ws / ".gitmodules").exists():
+                self.git.update_submodules(ws_path, paths=[sub_path])
+
+        with self._git_config_lock:
+            self._enable_fs_cache(ws_path)
+
+    def _clone_template(self, ws_path: Path, branch_name: str, template_path: Path):
+        """
+        Create a worktree and clone a prepared template workspace into it (blocking).
+
+        The template's files, including untracked dependencies and build
+        caches, are reflinked (or copied) into the new worktree; its
+        submodule git directories are cloned alongside and re-pointed at the
+        new checkout. Run with the template's repo lock held, so a sync or
+        preview switch doesn't rewrite it mid-copy.
+        """
+        from workspace_cli.utils.fs import clone_tree
+
+        with self._git_config_lock:
+            self.git.create_worktree(self.base_path, branch_name, ws_path, no_checkout=True)
+            self.git.set_upstream(self.base_path, branch_name, "origin/main")
+
+        # .git entries belong to the template; the new ones are written below
+        method = clone_tree(template_path, ws_path, ignore=lambda dir, names: [n for n in names if n == ".git"])
+        logger.info(f"Cloned template {template_path} into {ws_path} ({method})")
+        self._rebind_submodules(template_path, ws_path, self.git.get_git_dir(template_path), self.git.get_git_dir(ws_path))
+
+    def _checkout_template_clone(self, ws_path: Path):
+        """Check the workspace's own branch out on top of a template clone (blocking)."""
+        self.git.run_git_cmd(["reset", "--hard", "HEAD"], ws_path)
+        with self._git_config_lock:
+            self.git.init_submodules(ws_path)
+        self.git.update_submodules(ws_path)
+        with self._git_config_lock:
+            self._enable_fs_cache(ws_path)
+
+    def _rebind_submodules(self, template_root: Path, ws_root: Path, template_git_dir: Path, ws_git_dir: Path):
+        """Give the cloned submodules their own copy of the template's submodule git directories."""
+        import os
+        from workspace_cli.config import get_managed_repos
+        from workspace_cli.utils.fs import clone_tree, is_git_object
+
+        for sub in get_managed_repos(template_root):
+            dot_git = template_root / sub.path / ".git"
+            if not dot_git.is_file():
+                # Not initialised, or a self-contained clone that was copied as is
+                continue
+            sub_git_dir = (dot_git.parent / dot_git.read_text().split("gitdir:", 1)[1].strip()).resolve()
+            # Keep git's layout (<git dir>/modules/<name>) where the template uses it
+            try:
+                new_git_dir = ws_git_dir / sub_git_dir.relative_to(template_git_dir.resolve())
+            except ValueError:
+                new_git_dir = ws_git_dir / "modules" / sub.path
+
+            # Nested submodules get their own pass below
+            clone_tree(sub_git_dir, new_git_dir,
+                       ignore=lambda dir, names, root=str(sub_git_dir): ["modules"] if dir == root and "modules" in names else [],
+                       immutable=is_git_object)
+            ws_sub = ws_root / sub.path
+            ws_sub.mkdir(parents=True, exist_ok=True)
+            (ws_sub / ".git").write_text(f"gitdir: {os.path.relpath(new_git_dir, ws_sub)}\n")
+            self.git.run_git_cmd(
+                ["config", "--file", str(new_git_dir / "config"), "core.worktree", os.path.relpath(ws_sub, new_git_dir)],
+                ws_sub
+            )
+            self._rebind_submodules(template_root / sub.path, ws_sub, sub_git_dir, new_git_dir)
+
+    async def subscribe_to_logs(
+        self,
+        since: Optional[int] = None,
+        tail: Optional[int] = None,
+        session: Optional[int] = None,
+        overflow: LogOverflowPolicy = LogOverflowPolicy.DROP_OLDEST,
+        filter: Optional[LogFilter] = None
+    ):
+        """
+        Subscribe to preview logs.
+
+        Replays the buffered lines from sequence number `since` (or the last
+        `tail` lines) before following live; `overflow` decides what happens
+        when the client falls behind, and only lines matching `filter` are sent.
+        A `session` other than the current one has already ended, so nothing
+        is returned for it.
+        """
+        if session is not None and session != self.runner.logs.session:
+            return
+        subscriber = self.runner.subscribe(since, tail, policy=overflow, filter=filter)
         try:
             while True:
-                line = await queue.get()
+                line = await subscriber.get()
                 if line is None:
                     break
                 yield line
         finally:
-            self.runner.remove_observer(queue)
+            self.runner.remove_observer(subscriber)
+
+    def get_metrics(self) -> Metrics:
+        logs = self.runner.logs
+        return Metrics(
+            log_session=logs.session,
+            log_buffered_lines=len(logs.lines),
+            log_subscribers=[subscriber.metrics(logs.next_seq) for subscriber in self.runner.observers],
+            preview_processes=self.resources.snapshot()
+        )
 
     def save_config(self):
         """Persist current configuration to disk."""
@@ -220,7 +684,8 @@ class WorkspaceManager:
             from workspace_cli.config import save_config
             config_path = self.base_path / "workspace.json"
             logger.info(f"Saving config to {config_path}")
-            save_config(self.config, config_path)
+            with self._config_lock:
+                save_config(self.config, config_path)
 
     async def initialize_project(self, base_path: Path):
         """Complete initialization of a new project."""
@@ -239,64 +704,131 @@ class WorkspaceManager:
         self.save_config()
         logger.info(f"Initialized new project at {self.base_path}")
 
-    async def create_workspace(self, names: List[str], base_path: Path = None):
-        logger.debug(f"create_workspace called with names={names}")
-        async with self._lock:
-            for name in names:
-                if name in self.workspaces:
-                    logger.debug(f"Workspace {name} already exists")
-                    continue # Already exists
-                
-                # Logic to create workspace worktree
-                # 1. Define path
-                ws_path = self.base_path.parent / f"{self.base_path.name}-{name}"
-                
-                if ws_path.exists():
-                    pass
-                else:
-                    # 2. Create Worktree
-                    # We need to pick a branch name.
-                    # Default: workspace-{name}/stand
-                    branch_name = f"workspace-{name}/stand"
-                    
-                    logger.debug(f"Creating worktree at {ws_path} with branch {branch_name}")
-                    self.git.create_worktree(self.base_path, branch_name, ws_path)
-                    self.git.update_submodules(ws_path)
-                    self.git.set_upstream(self.base_path, branch_name, "origin/main")
-                
-                # 3. Register
-                self.workspaces[name] = Workspace(
-                    name=name,
+    async def create_workspace(self, names: List[str], base_path: Path = None, profile: Optional[str] = None,
+                               template: Optional[str] = None) -> CreateResult:
+        """
+        Create workspaces, several at a time.
+
+        With a template (explicit or from the config) new workspaces are
+        cloned from that prepared workspace instead of checked out from
+        scratch. A failure only affects its own workspace; workspace.json is
+        written once at the end for the whole batch.
+        """
+        logger.debug(f"create_workspace called with names={names} profile={profile} template={template}")
+        async with self._registry_lock:
+            patterns = None
+            if profile:
+                if not self.config or profile not in self.config.profiles:
+                    raise ValueError(f"Profile {profile} not found")
+                patterns = self.config.profiles[profile]
+
+            if template and profile:
+                raise ValueError("A template can't be combined with a sparse profile")
+            if not template and not profile and self.config:
+                template = self.config.template
+            template_path = None
+            if template:
+                if template not in self.workspaces or not Path(self.workspaces[template].path).exists():
+                    raise ValueError(f"Template workspace {template} not found")
+                template_path = Path(self.workspaces[template].path)
+
+            result = CreateResult()
+            semaphore = asyncio.Semaphore(self.config.create_concurrency if self.config else 4)
+
+            async def create_one(ws: WorkspaceCreateResult):
+                ws_path = Path(ws.path)
+                # Default branch: workspace-{name}/stand
+                branch_name = f"workspace-{ws.name}/stand"
+                if not ws_path.exists():
+                    async with semaphore, self._repo_lock(ws_path):
+                        logger.debug(f"Creating worktree at {ws_path} with branch {branch_name}")
+                        report_progress("create", f"Creating {ws.name} at {ws_path}")
+                        try:
+                            if template_path:
+                                # The new workspace's lock comes first, then its template's
+                                async with self._repo_lock(template_path):
+                                    await _in_thread(self._clone_template, ws_path, branch_name, template_path)
+                                await _in_thread(self._checkout_template_clone, ws_path)
+                            else:
+                                await _in_thread(self._create_worktree, ws_path, branch_name, patterns)
+                        except Exception as e:
+                            logger.warning(f"Failed to create {ws.name}: {e}")
+                            ws.status = CreateStatus.FAILED
+                            ws.error = str(e)
+                            await _in_thread(self._discard_worktree, ws_path)
+                            report_progress("failed", f"{ws.name}: {e}")
+                            return
+                    report_progress("created", ws.name)
+
+                # Register
+                self.workspaces[ws.name] = Workspace(
+                    name=ws.name,
                     path=str(ws_path),
-                    branch=f"workspace-{name}/stand"
+                    branch=branch_name,
+                    profile=profile
                 )
-                
                 if self.config:
                     from workspace_cli.models import WorkspaceEntry
                     try:
-                        # Try to store path relative to base_path.parent (the container directory)
-                        # or just relative to base_path if it works better.
-                        # Usually it's simpler to keep it relative to base_path.
+                        # Store path relative to base_path
                         import os
                         rel_path = os.path.relpath(ws_path, self.base_path)
-                        self.config.workspaces[name] = WorkspaceEntry(path=rel_path)
+                        self.config.workspaces[ws.name] = WorkspaceEntry(path=rel_path, profile=profile)
                     except ValueError:
-                        self.config.workspaces[name] = WorkspaceEntry(path=str(ws_path))
-                    
-                    self.save_config()
-                
-                logger.debug(f"Registered workspace {name}. Current workspaces: {list(self.workspaces.keys())}")
+                        self.config.workspaces[ws.name] = WorkspaceEntry(path=str(ws_path), profile=profile)
+                logger.debug(f"Registered workspace {ws.name}")
+
+            batch = []
+            for name in dict.fromkeys(names):
+                ws_path = self.base_path.parent / f"{self.base_path.name}-{name}"
+                if name in self.workspaces:
+                    logger.debug(f"Workspace {name} already exists")
+                    result.workspaces.append(WorkspaceCreateResult(name=name, path=str(ws_path), status=CreateStatus.EXISTS))
+                    continue
+                batch.append(WorkspaceCreateResult(name=name, path=str(ws_path)))
+            await asyncio.gather(*(create_one(ws) for ws in batch))
+            result.workspaces.extend(batch)
+
+            if self.config and any(ws.status == CreateStatus.CREATED for ws in batch):
+                await _in_thread(self.save_config)
+            return result
+
+    def _discard_worktree(self, ws_path: Path):
+        """Remove what a failed creation left behind, so the name can be retried."""
+        try:
+            self._remove_worktree(ws_path)
+        except Exception as e:
+            logger.warning(f"Failed to clean up {ws_path}: {e}")
+
+    def _remove_worktree(self, ws_path: Path):
+        """
+        Unregister a worktree and hand its files to the trash (blocking).
+
+        Only renames happen here; the checkout and its admin directory (with
+        the submodule git dirs) are deleted in the background.
+        """
+        try:
+            git_dir = self.git.get_git_dir(ws_path) if ws_path.exists() else None
+        except Exception:
+            git_dir = None
+        self.trash.move(ws_path)
+        # <base>/.git/worktrees/<id>
+        if git_dir is not None and git_dir.parent.name == "worktrees":
+            self.trash.move(git_dir)
+        with self._git_config_lock:
+            self.git.prune_worktrees(self.base_path)
 
     async def delete_workspace(self, name: str):
-        async with self._lock:
+        async with self._registry_lock:
             if name not in self.workspaces:
                 raise ValueError(f"Workspace {name} not found")
             
             workspace = self.workspaces[name]
             ws_path = Path(workspace.path)
             
-            # 1. Remove Worktree
-            self.git.remove_worktree(ws_path)
+            # 1. Remove Worktree (waits for any sync of this workspace)
+            async with self._repo_lock(ws_path):
+                await _in_thread(self._remove_worktree, ws_path)
             
             # 2. Unregister
             del self.workspaces[name]
@@ -304,74 +836,271 @@ class WorkspaceManager:
                 del self.config.workspaces[name]
                 self.save_config()
 
-    async def sync_workspace(self, workspace_name: str, sync_all: bool = False, rebuild_preview: bool = True):
-        async with self._lock:
-            self.is_syncing = True
+    async def gc(self, dry_run: bool = False, remove_orphans: bool = False) -> GcReport:
+        """Prune stale worktrees, directories and branches, reconcile the config and maintain the repositories."""
+        from workspace_cli.server.gc import GarbageCollector
+        return await GarbageCollector(self).run(dry_run, remove_orphans)
+
+    def _synced_submodules(self, path: Path, patterns: Optional[List[str]] = None):
+        """Submodules of a checkout that sync manages (only those inside a sparse profile)."""
+        from workspace_cli.config import get_managed_repos, split_profile
+
+        submodules = get_managed_repos(path)
+        if patterns is not None:
+            selection = split_profile(patterns, submodules)
+            submodules = [sub for sub in submodules if str(sub.path) in selection]
+        return submodules
+
+    def object_stores(self) -> Dict[Path, Tuple[Path, Set[Path]]]:
+        """
+        Object stores of the base, its worktrees and their submodules (blocking).
+
+        Returns store -> (a repository using it, checkouts containing such a repository).
+        """
+        checkouts = [self.base_path] + [
+            Path(ws.path) for ws in self.workspaces.values() if Path(ws.path).exists()
+        ]
+        stores: Dict[Path, Tuple[Path, Set[Path]]] = {}
+        for checkout in checkouts:
+            workspace = next((ws for ws in self.workspaces.values() if Path(ws.path) == checkout), None)
+            patterns = self._profile_patterns(workspace) if workspace else None
+            repos = [checkout] + [
+                checkout / sub.path
+                for sub in self._synced_submodules(checkout, patterns)
+                if (checkout / sub.path / ".git").exists()
+            ]
+            for repo in repos:
+                store = self.git.get_common_dir(repo)
+                stores.setdefault(store, (repo, set()))[1].add(checkout)
+        return stores
+
+    def _sync_jobs(self) -> int:
+        if self.config and self.config.sync_jobs:
+            return self.config.sync_jobs
+        return os.cpu_count() or 1
+
+    def _run_parallel(self, items: list, fn) -> Tuple[Dict, Dict]:
+        """Run fn(item) for every item with at most `sync_jobs` in flight; return (item -> result, item -> exception)."""
+        results, errors = {}, {}
+        if not items:
+            return results, errors
+        with ThreadPoolExecutor(max_workers=min(self._sync_jobs(), len(items))) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    errors[futures[future]] = e
+        return results, errors
+
+    async def _fetch_stores(self, paths: List[Path], max_age: Optional[float] = None,
+                            skipped: Optional[Dict[Path, float]] = None) -> Dict[Path, Exception]:
+        """
+        Fetch every distinct object store behind `paths` exactly once.
+
+        Worktrees share the object database of their base repository, so
+        fetching in each of them would repeat the same negotiation. Stores
+        fetched less than `max_age` seconds ago (e.g. by the prefetcher) are
+        skipped, and their paths are put in `skipped` with the age of that
+        fetch. Returns path -> error for every path whose store could not
+        be fetched.
+        """
+        errors = {}
+        stores: Dict[Path, List[Path]] = {}
+        for path in paths:
             try:
-                targets = [workspace_name] if not sync_all else list(self.workspaces.keys())
-                
-                # If sync_all, also sync base workspace
-                if sync_all:
-                    # We treat base workspace as a target too, but it's not in self.workspaces
-                    # We can handle it separately or add to targets if we handle path resolution
-                    pass 
-
-                # Helper to sync a path
-                def sync_path(path: Path):
-                    self.git.fetch(path)
-                    self.git.pull(path, rebase=True)
-                    self.git.update_submodules(path)
-                    
-                    # Sync submodules to main/latest
-                    from workspace_cli.config import get_managed_repos
-                    submodules = get_managed_repos(path)
-                    for sub in submodules:
-                        sub_path = path / sub.path
-                        if not sub_path.exists():
-                            continue
-                            
-                        # Try to checkout main if detached
-                        try:
-                            # Check if on a branch
+                store = await _in_thread(self.git.get_common_dir, path)
+            except Exception as e:
+                errors[path] = e
+                continue
+            stores.setdefault(store, []).append(path)
+
+        semaphore = asyncio.Semaphore(self._sync_jobs())
+
+        async def fetch(store: Path, members: List[Path]):
+            async with semaphore, self._repo_lock(store):
+                if self.fetched_within(store, max_age):
+                    age = self.fetch_age(store)
+                    logger.info(f"Skipping fetch of {members[0]}: fetched {age:.0f}s ago")
+                    if skipped is not None:
+                        skipped.update((member, age) for member in members)
+                    return
+                try:
+                    logger.info(f"Fetching {members[0]}")
+                    await _in_thread(self.git.fetch, members[0])
+                    self.mark_fetched(store)
+                except Exception as e:
+                    logger.warning(f"Failed to fetch {members[0]}: {e}")
+                    for member in members:
+                        errors[member] = e
+
+        await asyncio.gather(*(fetch(store, members) for store, members in stores.items()))
+        return errors
+
+    def _is_up_to_date(self, path: Path) -> bool:
+        """Whether a checkout already contains its (fetched) upstream, i.e. a rebase would be a no-op."""
+        try:
+            upstream = self.git.get_commit_hash(path, "@{upstream}")
+            return self.git.is_ancestor(path, upstream, "HEAD")
+        except GitError:
+            # No upstream (e.g. detached submodule): take the slow path
+            return False
+
+    def _sync_submodule(self, sub_path: Path) -> bool:
+        """Bring a submodule to the tip of its upstream; returns False if it already was."""
+        if self._is_up_to_date(sub_path):
+            return False
+
+        # Try to checkout main if detached
+        try:
+            # Check if on a branch
+            try:
+                self.git.get_current_branch(sub_path)
+            except Exception:
+                # Likely detached or Error
+                # Try checkout main
+                logger.info(f"Checking out main for submodule {sub_path.name}")
+                self.git.run_git_cmd(["checkout", "main"], sub_path)
+        except Exception as e:
+            logger.warning(f"Failed to checkout main for submodule {sub_path.name}: {e}")
+
+        # Rebase onto the fetched upstream
+        logger.info(f"Rebasing submodule {sub_path.name}")
+        self.git.rebase(sub_path)
+        return True
+
+    def _sync_path(self, path: Path, patterns: Optional[List[str]] = None) -> Tuple[bool, Dict[str, str]]:
+        """
+        Integrate already-fetched upstream changes into a checkout and its submodules.
+
+        Repositories that already contain their upstream are left alone.
+        Submodules are handled concurrently; returns (anything changed,
+        submodule path -> error).
+        """
+        # Only submodules inside the sparse profile are materialised
+        submodules = self._synced_submodules(path, patterns)
+
+        changed = not self._is_up_to_date(path)
+        if changed:
+            self.git.rebase(path)
+            # Gitlinks may have moved with the rebase
+            if patterns is None:
+                self.git.update_submodules(path, jobs=self._sync_jobs())
+            elif submodules:
+                self.git.update_submodules(path, paths=[str(sub.path) for sub in submodules], jobs=self._sync_jobs())
+        else:
+            logger.info(f"{path} is up to date")
+
+        # Sync submodules to main/latest
+        sub_paths = [path / sub.path for sub in submodules if (path / sub.path).exists()]
+        results, errors = self._run_parallel(sub_paths, self._sync_submodule)
+        for sub_path, error in errors.items():
+            logger.warning(f"Failed to sync submodule {sub_path.name}: {error}")
+        changed = changed or any(results.values()) or bool(errors)
+        return changed, {str(sub_path.relative_to(path)): str(error) for sub_path, error in errors.items()}
+
+    async def sync_workspace(self, workspace_name: str, sync_all: bool = False, rebuild_preview: bool = True,
+                             fetch: bool = False) -> SyncResult:
+        """
+        Fetch and rebase a workspace (or all of them, with the base).
+
+        With background prefetching, a repository fetched within the last
+        prefetch interval isn't fetched again (the result says so); `fetch`
+        always fetches.
+        """
+        self._active_syncs += 1
+        try:
+            # "base" (unless a workspace is called that) is the base checkout itself
+            sync_base = sync_all or (workspace_name == "base" and "base" not in self.workspaces)
+            targets = list(self.workspaces.keys()) if sync_all else ([] if sync_base else [workspace_name])
+            result = SyncResult()
+
+            # 1. Collect checkouts to sync (base first when syncing everything)
+            checkouts = []
+            if sync_base:
+                checkouts.append(WorkspaceSyncResult(name="base", path=str(self.base_path)))
+            for name in targets:
+                workspace = self.workspaces.get(name)
+                if workspace is None:
+                    result.workspaces.append(WorkspaceSyncResult(
+                        name=name, status=SyncStatus.SKIPPED, error="Workspace not found"
+                    ))
+                else:
+                    checkouts.append(WorkspaceSyncResult(name=name, path=workspace.path))
+
+            def patterns_of(ws_result: WorkspaceSyncResult) -> Optional[List[str]]:
+                workspace = self.workspaces.get(ws_result.name)
+                return self._profile_patterns(workspace) if workspace else None
+
+            # 2. Fetch each object store once: one for the base and all its
+            # worktrees, one per distinct submodule repository
+            report_progress("fetch", f"Fetching {len(checkouts)} checkout(s)")
+            # With background prefetching, a store fetched within the interval is fresh enough
+            max_age = self.config.prefetch_interval if self.config and self.config.prefetch_interval and not fetch else None
+            fetch_skipped: Dict[Path, float] = {}
+            fetch_errors = await self._fetch_stores([Path(ws.path) for ws in checkouts], max_age, fetch_skipped)
+            for ws in checkouts:
+                if Path(ws.path) in fetch_skipped:
+                    ws.fetch_skipped_age = round(fetch_skipped[Path(ws.path)], 1)
+            sub_paths = {
+                Path(ws.path) / sub.path: ws
+                for ws in checkouts
+                for sub in self._synced_submodules(Path(ws.path), patterns_of(ws))
+                if (Path(ws.path) / sub.path / ".git").exists()
+            }
+            for sub_path, error in (await self._fetch_stores(list(sub_paths), max_age)).items():
+                ws = sub_paths[sub_path]
+                ws.submodule_errors[str(sub_path.relative_to(ws.path))] = str(error)
+
+            # 3. Local rebase in every checkout, several workspaces at a time.
+            # Only work on the same checkout is serialised.
+            semaphore = asyncio.Semaphore(self.config.sync_concurrency if self.config else 4)
+            preview_heads: Dict[str, Dict[str, str]] = {}
+
+            async def sync_one(ws: WorkspaceSyncResult):
+                path = Path(ws.path)
+                if path in fetch_errors:
+                    ws.status = SyncStatus.FAILED
+                    ws.error = f"Fetch failed: {fetch_errors[path]}"
+                    return
+                async with semaphore, self._repo_lock(path):
+                    report_progress("rebase", f"Syncing {ws.name}")
+                    try:
+                        if self.preview_session and self.preview_session.workspace_name == ws.name:
+                            # Remember where the previewed workspace was to refresh the preview incrementally
+                            preview_heads[ws.name] = await _in_thread(self._repo_heads, path, patterns_of(ws))
+                        ws.changed, submodule_errors = await _in_thread(self._sync_path, path, patterns_of(ws))
+                        ws.submodule_errors.update(submodule_errors)
+                    except Exception as e:
+                        logger.warning(f"Failed to sync {ws.name}: {e}")
+                        ws.status = SyncStatus.FAILED
+                        ws.error = str(e)
+                        # A failed rebase may have left the tree half-way
+                        ws.changed = True
+                report_progress("synced", f"{ws.name}: {ws.status.value}" + ("" if ws.changed else " (up to date)"))
+
+            await asyncio.gather(*(sync_one(ws) for ws in checkouts))
+            result.workspaces = checkouts + result.workspaces
+
+            # 4. Refresh Preview if needed (an up-to-date workspace has nothing new to show)
+            synced = [ws.name for ws in checkouts if ws.status == SyncStatus.SUCCEEDED and ws.changed]
+            # The base is the preview checkout itself; if it moved, start over
+            base_changed = any(ws.name == "base" and ws.changed for ws in checkouts)
+            if rebuild_preview:
+                async with self._preview_lock:
+                    name = self.preview_session.workspace_name if self.preview_session else None
+                    if name in synced:
+                        refreshed = False
+                        if name in preview_heads and not base_changed:
                             try:
-                                self.git.get_current_branch(sub_path)
-                            except Exception:
-                                # Likely detached or Error
-                                # Try checkout main
-                                logger.info(f"Checking out main for submodule {sub.name}")
-                                self.git.run_git_cmd(["checkout", "main"], sub_path)
-                        except Exception as e:
-                            logger.warning(f"Failed to checkout main for submodule {sub.name}: {e}")
-                            
-                        # Pull latest
-                        try:
-                            logger.info(f"Pulling submodule {sub.name}")
-                            self.git.pull(sub_path, rebase=True)
-                        except Exception as e:
-                            logger.warning(f"Failed to pull submodule {sub.name}: {e}")
-
-                if sync_all:
-                    # Sync base
-                    # print(f"DEBUG: Syncing base path: {self.base_path}")
-                    sync_path(self.base_path)
-
-                for name in targets:
-                    if name not in self.workspaces:
-                        continue
-                    
-                    workspace = self.workspaces[name]
-                    path = Path(workspace.path)
-                    sync_path(path)
-                
-                # 3. Rebuild Preview if needed
-                if rebuild_preview:
-                    if self.preview_session and self.preview_session.workspace_name in targets:
-                        # We need to be careful with lock reentrancy here.
-                        # Since we extracted _switch_preview_internal, we can call it?
-                        # No, _switch_preview_internal does NOT acquire lock.
-                        # So it is safe to call it here since we hold the lock.
-                        await self._switch_preview_internal(self.preview_session.workspace_name, rebuild=True)
-                        
-            finally:
-                self.is_syncing = False
+                                await self._refresh_preview(name, preview_heads[name])
+                                refreshed = True
+                            except Exception as e:
+                                logger.warning(f"Incremental preview refresh failed, rebuilding: {e}")
+                        if not refreshed:
+                            report_progress("preview", f"Rebuilding preview of {name}")
+                            await self._switch_preview_internal(name, rebuild=True)
 
+            return result
+        finally:
+            self._active_syncs -= 1
@@ -0,0 +1,110 @@
+import asyncio
+import random
+from pathlib import Path
+from typing import Dict, Optional, TYPE_CHECKING
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+if TYPE_CHECKING:
+    from workspace_cli.server.manager import WorkspaceManager
+
+# Each delay is randomised by +/- this fraction so daemons don't fetch in lockstep
+JITTER = 0.2
+# Consecutive failures double the delay up to this multiple of the interval
+MAX_BACKOFF = 16
+
+class PrefetchScheduler:
+    """
+    Fetches the base and submodule repositories in the background, so a
+    user sync usually only has to rebase.
+
+    The network fetch only adds objects and refs under refs/prefetch/,
+    holding just the object store's lock, so user operations on the
+    checkouts carry on meanwhile. The remote-tracking refs they read are
+    then moved in a quick local step that runs only while no create,
+    switch, gc or operation on those checkouts does. The scheduler never
+    waits for a lock: a busy repository is left for the next round.
+    """
+
+    def __init__(self, manager: "WorkspaceManager", interval: float):
+        self.manager = manager
+        self.interval = interval
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def next_delay(self) -> float:
+        delay = self.interval * min(2 ** self.failures, MAX_BACKOFF)
+        return delay * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.next_delay())
+            try:
+                errors = await self.run_once()
+            except Exception as e:
+                errors = {self.manager.base_path: e}
+            if errors:
+                self.failures += 1
+                logger.warning(f"Prefetch failed for {len(errors)} repositories, next attempt in ~{self.interval * min(2 ** self.failures, MAX_BACKOFF):.0f}s")
+            else:
+                self.failures = 0
+
+    async def run_once(self) -> Dict[Path, Exception]:
+        """Fetch every repository that is idle and not fetched recently; returns store -> error."""
+        from workspace_cli.server.manager import _in_thread
+
+        manager = self.manager
+        errors: Dict[Path, Exception] = {}
+        targets = await _in_thread(manager.object_stores)
+        for store, (repo, checkouts) in targets.items():
+            if manager.fetched_within(store, self.interval):
+                continue
+            store_lock = manager._repo_lock(store)
+            # Never wait for a user operation; try again next round
+            if manager.is_syncing or store_lock.locked():
+                logger.debug(f"Skipping prefetch of {repo}: repository busy")
+                continue
+            async with store_lock:
+                try:
+                    # The network part: objects and refs/prefetch/ only, so the
+                    # checkouts using the store stay free for user operations
+                    logger.debug(f"Prefetching {repo}")
+                    await _in_thread(manager.git.prefetch, repo)
+                except Exception as e:
+                    logger.warning(f"Prefetch of {repo} failed: {e}")
+                    errors[store] = e
+                    continue
+
+                # Moving the remote-tracking refs is what creates, switches,
+                # rebases and gc read: only when none of them is running.
+                # Only free locks are taken, so the lock order can't deadlock.
+                locks = [manager._registry_lock, manager._preview_lock] + [manager._repo_lock(checkout) for checkout in checkouts]
+                if manager.is_syncing or any(lock.locked() for lock in locks):
+                    logger.debug(f"Not publishing prefetch of {repo}: repository busy")
+                    continue
+                for lock in locks:
+                    await lock.acquire()
+                try:
+                    await _in_thread(manager.git.publish_prefetch, repo)
+                    manager.mark_fetched(store)
+                except Exception as e:
+                    logger.warning(f"Prefetch of {repo} failed: {e}")
+                    errors[store] = e
+                finally:
+                    for lock in locks:
+                        lock.release()
+        return errors
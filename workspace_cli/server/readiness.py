@@ -0,0 +1,27 @@
+import asyncio
+from workspace_cli.models import ReadinessProbe
+
+# Seconds between two checks of a probe
+PROBE_INTERVAL = 0.25
+
+async def check_probe(probe: ReadinessProbe) -> bool:
+    """One attempt of a port or URL probe (log probes are matched by the runner)."""
+    if probe.port is not None:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(probe.host, probe.port), timeout=1.0)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    if probe.url is not None:
+        import httpx
+        try:
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.get(probe.url)
+        except httpx.HTTPError:
+            return False
+        # Anything but a server error means it is serving (a 404 on / is fine)
+        return response.status_code < 500
+
+    return False
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+from workspace_cli.models import LogStream, ProcessStats
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+if TYPE_CHECKING:
+    from workspace_cli.server.manager import WorkspaceManager
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE, CLOCK_TICKS = 4096, 100
+
+class GroupUsage:
+    def __init__(self):
+        self.processes = 0
+        self.rss_bytes = 0
+        self.cpu_seconds = 0.0
+        self.read_bytes = 0
+        self.write_bytes = 0
+
+def _read_io(pid: str) -> Tuple[int, int]:
+    read_bytes = write_bytes = 0
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            for line in f:
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = int(line.split()[1])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        # Not readable for other users' processes, or a kernel without task IO accounting
+        pass
+    return read_bytes, write_bytes
+
+def sample_groups(pgids: Set[int]) -> Dict[int, GroupUsage]:
+    """Resource use of the live processes in each process group, from one pass over /proc (blocking)."""
+    usage: Dict[int, GroupUsage] = {}
+    if not pgids:
+        return usage
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return usage
+    for pid in entries:
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses; fields follow the last ")"
+        fields = stat[stat.rfind(b")") + 2:].split()
+        try:
+            pgrp = int(fields[2])
+            # Zombies have exited; they only wait for their parent to reap them
+            if pgrp not in pgids or fields[0] == b"Z":
+                continue
+            utime, stime, rss = int(fields[11]), int(fields[12]), int(fields[21])
+        except (IndexError, ValueError):
+            continue
+        group = usage.setdefault(pgrp, GroupUsage())
+        group.processes += 1
+        group.rss_bytes += rss * PAGE_SIZE
+        group.cpu_seconds += (utime + stime) / CLOCK_TICKS
+        read_bytes, write_bytes = _read_io(pid)
+        group.read_bytes += read_bytes
+        group.write_bytes += write_bytes
+    return usage
+
+def group_alive(pgid: int) -> bool:
+    """Whether a process group still has a live (not zombie) member (blocking)."""
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    if not os.path.isdir("/proc"):
+        return True
+    return pgid in sample_groups({pgid})
+
+class ResourceMonitor:
+    """
+    Samples the memory, CPU time and disk IO of every preview command's
+    process group from /proc, keeping the latest values and peaks, and
+    warns when a group goes over the configured soft limits.
+    """
+
+    def __init__(self, manager: "WorkspaceManager"):
+        self.manager = manager
+        # pgid -> stats of the preview commands currently running
+        self.stats: Dict[int, ProcessStats] = {}
+        self._sampled: Dict[int, float] = {}
+        # (pgid, limit) pairs currently over the limit, so each crossing warns once
+        self._exceeded: Set[Tuple[int, str]] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> List[ProcessStats]:
+        return [stats.model_copy() for stats in self.stats.values()]
+
+    async def sample(self):
+        from workspace_cli.server.manager import _in_thread
+
+        runner = self.manager.runner
+        groups = {
+            process.pid: (source, cmd)
+            for process, source, cmd in runner.processes
+            if process.returncode is None
+        }
+        usage = await _in_thread(sample_groups, set(groups))
+        now = time.monotonic()
+
+        stats: Dict[int, ProcessStats] = {}
+        for pgid, (source, cmd) in groups.items():
+            group = usage.get(pgid)
+            if group is None:
+                continue
+            previous = self.stats.get(pgid)
+            current = ProcessStats(
+                source=source,
+                command=cmd,
+                pgid=pgid,
+                processes=group.processes,
+                rss_bytes=group.rss_bytes,
+                cpu_seconds=round(group.cpu_seconds, 2),
+                read_bytes=group.read_bytes,
+                write_bytes=group.write_bytes,
+                sampled_at=datetime.now()
+            )
+            if previous is not None:
+                elapsed = now - self._sampled[pgid]
+                if elapsed > 0:
+                    # Processes that exited take their CPU time with them; never report negative use
+                    current.cpu_percent = round(max(0.0, group.cpu_seconds - previous.cpu_seconds) / elapsed * 100, 1)
+                current.peak_rss_bytes = max(previous.peak_rss_bytes, current.rss_bytes)
+                current.peak_cpu_percent = max(previous.peak_cpu_percent, current.cpu_percent)
+            else:
+                current.peak_rss_bytes = current.rss_bytes
+            stats[pgid] = current
+            self._sampled[pgid] = now
+            self._check_limits(current)
+
+        self._sampled = {pgid: self._sampled[pgid] for pgid in stats}
+        self._exceeded = {key for key in self._exceeded if key[0] in stats}
+        self.stats = stats
+
+    def _check_limits(self, stats: ProcessStats):
+        config = self.manager.config
+        limits = config.preview_limits if config else None
+        if limits is None:
+            return
+        checks = []
+        if limits.rss_mb is not None:
+            checks.append(("rss", stats.rss_bytes > limits.rss_mb * 2**20,
+                           f"Memory use {stats.rss_bytes // 2**20} MiB is over the soft limit of {limits.rss_mb} MiB"))
+        if limits.cpu_percent is not None:
+            checks.append(("cpu", stats.cpu_percent > limits.cpu_percent,
+                           f"CPU use {stats.cpu_percent:.0f}% is over the soft limit of {limits.cpu_percent:g}%"))
+        for name, over, message in checks:
+            key = (stats.pgid, name)
+            if over and key not in self._exceeded:
+                self._exceeded.add(key)
+                logger.warning(f"{stats.source}: {message}")
+                self.manager.runner.log_event(stats.source, message, LogStream.ERROR)
+            elif not over:
+                self._exceeded.discard(key)
+
+    def start(self, interval: float):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop(interval))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.warning(f"Sampling preview processes failed: {e}")
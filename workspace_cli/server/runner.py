@@ -1,81 +1,276 @@
 import asyncio
+import os
+import re
 import subprocess
 import shlex
-from typing import List, Optional, Set
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple, Union
 from pathlib import Path
-from rich.console import Console
-from rich.style import Style
+from workspace_cli.models import (
+    CommandState, HookEntry, LogFilter, LogLine, LogOverflowPolicy, LogStream,
+    PreviewCommand, PreviewCommandStatus, ReadinessProbe
+)
+from workspace_cli.server.hooks import Hook, build_hook_graph, run_hook_graph
+from workspace_cli.server.jobs import report_progress
+from workspace_cli.server.archive import LogArchive
+from workspace_cli.server.logs import LineSplitter, LogBuffer, LogMatcher, LogSubscriber, SUBSCRIBER_QUEUE_SIZE
+from workspace_cli.server.readiness import PROBE_INTERVAL, check_probe
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+# The daemon's own copy and the archive of the preview logs are written at most this often (seconds)
+BATCH_INTERVAL = 0.1
+# Bytes read from a process pipe at once (also the pipe reader's buffer limit)
+READ_CHUNK = 256 * 1024
+# A hook that runs this long is reported, and again after each further interval (seconds)
+HOOK_NOTICE_INTERVAL = 30
+# Time to finish reading a hook's output once it has exited (seconds)
+HOOK_OUTPUT_GRACE = 1.0
+# Wait before restarting a crashed preview command; doubles with each restart in the window (seconds)
+RESTART_BACKOFF = 1.0
+RESTART_BACKOFF_MAX = 30.0
+# Seconds between SIGTERM and SIGKILL for commands that don't set `grace`
+STOP_GRACE = 5.0
+# How often a group whose shell has exited is checked for members left behind (seconds)
+STOP_POLL_INTERVAL = 0.05
+# A command that crashes this often within CRASH_LOOP_WINDOW seconds is not restarted again
+CRASH_LOOP_RESTARTS = 5
+CRASH_LOOP_WINDOW = 60.0
+
+def _report_archive_error(future: Future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Can't archive preview logs: {future.exception()}")
 
 class PreviewRunner:
-    def __init__(self, base_path: Path):
+    def __init__(self, base_path: Path, echo: Optional[bool] = None):
         self.base_path = base_path
-        self.console = Console()
         self.process: Optional[subprocess.Popen] = None
-        self.colors = ["cyan", "magenta", "green", "yellow", "blue"]
-        self.color_idx = 0
-        self.observers: Set[asyncio.Queue] = set()
-
-    def _get_color(self) -> str:
-        color = self.colors[self.color_idx % len(self.colors)]
-        self.color_idx += 1
-        return color
-
-    def _log(self, name: str, message: str, color: str = "cyan"):
-        # Console output
-        label = name.capitalize()
-        self.console.print(f"[{color}][{label}][/{color}] {message}")
-        # Broadcast to observers
-        for queue in list(self.observers):
+        self.observers: Set[LogSubscriber] = set()
+        # Subscribers grouped by filter: filter key -> (matcher, subscribers); None is unfiltered
+        self._groups: Dict[Optional[tuple], Tuple[Optional[LogMatcher], Set[LogSubscriber]]] = {}
+        self.logs = LogBuffer()
+        # Print the logs on the daemon's stdout as well (plain, batched)
+        if echo is None:
+            echo = os.environ.get("WORKSPACE_PREVIEW_ECHO", "1") != "0"
+        self.echo = echo
+        # Set by the manager once it knows where the archive lives
+        self.archive: Optional[LogArchive] = None
+        # Archive writes (compression, file IO, retention) run in order on one
+        # worker thread, never on the event loop
+        self._archive_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-archive")
+        self._batch_lines: List[LogLine] = []
+        self._batch_handle: Optional[asyncio.TimerHandle] = None
+        # Readiness probes of the running preview commands
+        self.probes: List[asyncio.Future] = []
+        # source -> (pattern, future) of log probes not matched yet
+        self._log_probes: Dict[str, Tuple[re.Pattern, asyncio.Future]] = {}
+        # (process, source, command) of the running preview commands; a restart replaces the entry
+        self.processes: List[Tuple[asyncio.subprocess.Process, str, str]] = []
+        # source -> supervision state of each preview command
+        self.commands: Dict[str, PreviewCommandStatus] = {}
+        self._supervisors: List[asyncio.Task] = []
+        # Output readers of the preview commands, drained by stop()
+        self._streams: Set[asyncio.Task] = set()
+        # source -> grace period of each preview command
+        self._grace: Dict[str, float] = {}
+        # Seconds the last stop() took to end the preview commands
+        self.last_stop_seconds: Optional[float] = None
+
+    def _log(self, source: str, message: str, stream: LogStream = LogStream.INFO):
+        # Keep for late and reconnecting clients, then broadcast to observers
+        line = self.logs.append(source, stream, message)
+        if self._log_probes and stream in (LogStream.STDOUT, LogStream.STDERR):
+            self._match_log_probe(source, message)
+        if self.echo or self.archive is not None:
+            self._batch(line)
+        # Each distinct filter is evaluated once per line, whatever the number of subscribers
+        for matcher, subscribers in list(self._groups.values()):
+            if matcher is not None and not matcher.matches(line):
+                continue
+            for subscriber in list(subscribers):
+                subscriber.put(line)
+                if subscriber.closed:
+                    # Disconnected for falling behind
+                    self.remove_observer(subscriber)
+
+    def log_event(self, source: str, message: str, stream: LogStream = LogStream.INFO):
+        """Add a line about a preview command to its logs, for the daemon's other services."""
+        self._log(source, message, stream)
+
+    def _batch(self, line: LogLine):
+        self._batch_lines.append(line)
+        if self._batch_handle is None:
             try:
-                queue.put_nowait(f"[{color}][{label}][/{color}] {message}")
-            except asyncio.QueueFull:
-                pass # Drop if full? Or should we use infinite queue?
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._flush_batch()
+                return
+            self._batch_handle = loop.call_later(BATCH_INTERVAL, self._flush_batch)
+
+    def _flush_batch(self):
+        self._batch_handle = None
+        lines, self._batch_lines = self._batch_lines, []
+        if not lines:
+            return
+        if self.archive is not None:
+            self._archive_call(self.archive.write, lines)
+        if self.echo:
+            sys.stdout.write("".join(f"[{line.source}] {line.text}\n" for line in lines))
+            sys.stdout.flush()
+
+    def flush_logs(self):
+        """Write out the lines waiting for the next batch now."""
+        if self._batch_handle is not None:
+            self._batch_handle.cancel()
+        self._flush_batch()
 
-    async def add_observer(self) -> asyncio.Queue:
-        queue = asyncio.Queue()
-        self.observers.add(queue)
-        return queue
+    def _archive_call(self, fn, *args) -> Future:
+        future = self._archive_writer.submit(fn, *args)
+        future.add_done_callback(_report_archive_error)
+        return future
 
-    def remove_observer(self, queue: asyncio.Queue):
-        if queue in self.observers:
-            self.observers.remove(queue)
+    def set_archive(self, archive: Optional[LogArchive]):
+        """Archive preview logs with `archive` from now on (closing the previous one)."""
+        self.flush_logs()
+        if self.archive is not None:
+            self._archive_call(self.archive.close)
+        self.archive = archive
 
-    async def run_hooks(self, hooks: List[str], stage: str):
+    async def close_archive(self):
+        """Write out everything logged so far and close the archive."""
+        self.flush_logs()
+        if self.archive is not None:
+            await asyncio.wrap_future(self._archive_call(self.archive.close))
+
+    def start_archive_session(self, workspace: str):
+        """Archive what is logged from now on as a session of `workspace`."""
+        if self.archive is None:
+            return
+        # Lines still waiting belong to the previous session; the writer keeps the order
+        self.flush_logs()
+        self._archive_call(self.archive.start_session, workspace, self.logs.session)
+
+    async def add_observer(self) -> LogSubscriber:
+        return self.subscribe()
+
+    def subscribe(
+        self,
+        since: Optional[int] = None,
+        tail: Optional[int] = None,
+        maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+        policy: LogOverflowPolicy = LogOverflowPolicy.DROP_OLDEST,
+        filter: Optional[LogFilter] = None
+    ) -> LogSubscriber:
+        """
+        Register an observer that first gets the buffered lines from sequence
+        number `since` on, or the last `tail` lines, then the live ones; with a
+        `filter`, only the lines matching it.
+        Nothing yields to the loop in between, so no line is missed or repeated.
+        """
+        if since is not None:
+            backlog = self.logs.since(since)
+        elif tail is not None:
+            backlog = self.logs.tail(tail)
+        else:
+            backlog = []
+        last_seq = backlog[0].seq - 1 if backlog else self.logs.next_seq - 1
+
+        key = filter.key() if filter else None
+        if key not in self._groups:
+            self._groups[key] = (LogMatcher(filter) if filter else None, set())
+        matcher, subscribers = self._groups[key]
+        if matcher is not None:
+            backlog = [line for line in backlog if matcher.matches(line)]
+
+        subscriber = LogSubscriber(backlog, last_seq, maxsize, policy, filter)
+        subscribers.add(subscriber)
+        self.observers.add(subscriber)
+        return subscriber
+
+    def remove_observer(self, subscriber: LogSubscriber):
+        self.observers.discard(subscriber)
+        group = self._groups.get(subscriber.group)
+        if group is not None:
+            group[1].discard(subscriber)
+            if not group[1]:
+                del self._groups[subscriber.group]
+
+    async def run_hooks(self, hooks: List[HookEntry], stage: str):
         if not hooks:
             return
         
-        color = self._get_color()
-        self._log(stage, "Starting hooks...", color)
-        
-        for cmd in hooks:
-            self._log(stage, f"Running: {cmd}", color)
+        try:
+            graph = build_hook_graph(hooks)
+        except ValueError as e:
+            self._log(stage, f"Invalid hooks: {e}", LogStream.ERROR)
+            raise
+        self._log(stage, "Starting hooks...")
+        await run_hook_graph(graph, lambda hook: self._run_hook(hook, stage))
+
+    async def _run_hook(self, hook: Hook, stage: str):
+        source = f"{stage}:{hook.name}" if hook.named else stage
+        self._log(source, f"Running: {hook.run}")
+        report_progress(stage, f"Running {hook.name if hook.named else hook.run}")
+        started = time.monotonic()
+        try:
+            # Own process group, so a timeout kills whatever the hook started
+            process = await asyncio.create_subprocess_shell(
+                hook.run,
+                cwd=self.base_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+                limit=READ_CHUNK
+            )
+            # Output is logged as it is produced
+            reader = asyncio.ensure_future(self._stream_output(process, source))
+            watchdog = asyncio.ensure_future(self._watch_hook(hook, stage, source, started))
             try:
-                # Run synchronously for hooks as they are usually setup steps
-                # We can use asyncio.create_subprocess_shell for async
-                process = await asyncio.create_subprocess_shell(
-                    cmd,
-                    cwd=self.base_path,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                stdout, stderr = await process.communicate()
-                
-                if stdout:
-                    for line in stdout.decode().splitlines():
-                        self._log(stage, line, color)
-                if stderr:
-                    for line in stderr.decode().splitlines():
-                        self._log(stage, line, "red")
-                        
-                if process.returncode != 0:
-                    self._log(stage, f"Failed with code {process.returncode}", "red")
-                    raise RuntimeError(f"Hook failed: {cmd}")
-                    
-            except Exception as e:
-                self._log(stage, f"Error: {e}", "red")
+                await asyncio.wait_for(process.wait(), timeout=hook.timeout)
+            except asyncio.TimeoutError:
+                self._log(source, f"Timed out after {hook.timeout:g}s", LogStream.ERROR)
+                self._kill_group(process)
+                await process.wait()
+                raise RuntimeError(f"Hook timed out: {hook.run}")
+            except asyncio.CancelledError:
+                self._kill_group(process)
                 raise
+            finally:
+                watchdog.cancel()
+                # A background child may hold the pipes open; don't wait for it
+                await asyncio.wait([reader], timeout=HOOK_OUTPUT_GRACE)
+                reader.cancel()
+
+            if process.returncode != 0:
+                self._log(source, f"Failed with code {process.returncode}", LogStream.ERROR)
+                raise RuntimeError(f"Hook failed: {hook.run}")
+            self._log(source, f"Finished in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            if not isinstance(e, RuntimeError):
+                self._log(source, f"Error: {e}", LogStream.ERROR)
+            raise
 
-    async def start_preview(self, commands: List[str]):
+    async def _watch_hook(self, hook: Hook, stage: str, source: str, started: float):
+        """Report a hook that keeps running, so a stuck one is noticed."""
+        while True:
+            await asyncio.sleep(HOOK_NOTICE_INTERVAL)
+            elapsed = time.monotonic() - started
+            self._log(source, f"Still running after {elapsed:.0f}s: {hook.run}")
+            report_progress(stage, f"{hook.name if hook.named else hook.run} still running after {elapsed:.0f}s")
+
+    def _kill_group(self, process):
+        import signal
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    async def start_preview(self, commands: List[Union[str, PreviewCommand]]):
         if not commands:
             return
 
@@ -87,72 +282,276 @@ class PreviewRunner:
         
         # Let's run all preview commands in background
         self.processes = []
-        
-        import os
-        for cmd in commands:
-            color = self._get_color()
-            self._log("preview", f"Starting: {cmd}", color)
-            
-            # We use subprocess.Popen for long running processes to keep control
-            # But we want to stream output.
-            # asyncio.create_subprocess_shell is better for async streaming.
-            
-            # Use preexec_fn=os.setsid to create a new process group
-            # This allows us to kill the entire tree (shell + children)
-            process = await asyncio.create_subprocess_shell(
-                cmd,
-                cwd=self.base_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                preexec_fn=os.setsid
-            )
-            self.processes.append((process, color, cmd))
-            
-            # Start a task to read output
-            asyncio.create_task(self._stream_output(process, "preview", color))
-
-    async def _stream_output(self, process, name: str, color: str):
-        # Stream stdout
-        async def read_stream(stream, is_stderr=False):
+        self.commands = {}
+        self.probes = []
+        self._supervisors = []
+        self._grace = {}
+        for index, command in enumerate(commands):
+            spec = PreviewCommand(run=command) if isinstance(command, str) else command
+            cmd = spec.run
+            source = "preview" if index == 0 else f"preview-{index + 1}"
+            self._log(source, f"Starting: {cmd}")
+            if spec.ready and spec.ready.log is not None:
+                # Registered before the process starts, so its first line can't be missed
+                self._log_probes[source] = (re.compile(spec.ready.log), asyncio.get_running_loop().create_future())
+
+            process = await self._spawn(cmd, source)
+            self.processes.append((process, source, cmd))
+            self.commands[source] = PreviewCommandStatus(source=source, command=cmd, pid=process.pid)
+            self._grace[source] = spec.grace
+            self._supervisors.append(asyncio.ensure_future(self._supervise(index, spec, source)))
+            if spec.ready:
+                self.probes.append(asyncio.ensure_future(self._probe(spec.ready, source)))
+
+    async def _spawn(self, cmd: str, source: str) -> asyncio.subprocess.Process:
+        # Use preexec_fn=os.setsid to create a new process group
+        # This allows us to kill the entire tree (shell + children)
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            cwd=self.base_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            preexec_fn=os.setsid,
+            limit=READ_CHUNK
+        )
+        # Start a task to read output
+        stream = asyncio.ensure_future(self._stream_output(process, source))
+        self._streams.add(stream)
+        stream.add_done_callback(self._streams.discard)
+        return process
+
+    async def _supervise(self, index: int, spec: PreviewCommand, source: str):
+        """
+        Restart the command at `processes[index]` when it crashes.
+
+        Only this command is started again, in place: no hooks, no switch.
+        The wait doubles with each restart in the last CRASH_LOOP_WINDOW
+        seconds, and after CRASH_LOOP_RESTARTS of them the command is left
+        down (FAILED) until the next switch. `stop()` cancels this first,
+        so the processes it stops are never restarted.
+        """
+        loop = asyncio.get_running_loop()
+        status = self.commands[source]
+        restarts: Deque[float] = deque()
+        while True:
+            process, _, cmd = self.processes[index]
+            code = await process.wait()
+            status.pid = None
+            status.last_exit_code = code
+            status.last_exit_at = datetime.now()
+            if code == 0:
+                status.state = CommandState.EXITED
+                self._log(source, "Exited with code 0")
+                return
+            if not spec.restart:
+                status.state = CommandState.CRASHED
+                self._log(source, f"Exited with code {code}", LogStream.ERROR)
+                return
+
+            now = loop.time()
+            while restarts and now - restarts[0] > CRASH_LOOP_WINDOW:
+                restarts.popleft()
+            if len(restarts) >= CRASH_LOOP_RESTARTS:
+                status.state = CommandState.FAILED
+                self._log(
+                    source,
+                    f"Exited with code {code}; crashed {len(restarts) + 1} times within {CRASH_LOOP_WINDOW:g}s, not restarting",
+                    LogStream.ERROR
+                )
+                return
+            delay = min(RESTART_BACKOFF * 2 ** len(restarts), RESTART_BACKOFF_MAX)
+            status.state = CommandState.RESTARTING
+            self._log(source, f"Exited with code {code}, restarting in {delay:g}s", LogStream.ERROR)
+            await asyncio.sleep(delay)
+
+            restarts.append(loop.time())
+            self._log(source, f"Restarting: {cmd}")
+            # Shielded: a stop() landing mid-spawn must still find the new process to stop it
+            spawn = asyncio.ensure_future(self._spawn(cmd, source))
+            try:
+                process = await asyncio.shield(spawn)
+            except asyncio.CancelledError:
+                try:
+                    self.processes[index] = (await spawn, source, cmd)
+                except OSError:
+                    pass
+                raise
+            except OSError as e:
+                status.state = CommandState.FAILED
+                self._log(source, f"Can't restart {cmd}: {e}", LogStream.ERROR)
+                return
+            self.processes[index] = (process, source, cmd)
+            status.restarts += 1
+            status.pid = process.pid
+            status.state = CommandState.RUNNING
+
+    def command_status(self) -> List[PreviewCommandStatus]:
+        return [status.model_copy() for status in self.commands.values()]
+
+    async def wait_ready(self) -> bool:
+        """
+        Wait until the readiness probes of all preview commands have passed.
+        Returns False if no command has one; raises RuntimeError if one fails.
+        """
+        if not self.probes:
+            return False
+        # Shielded: a waiter giving up doesn't stop the probes
+        await asyncio.gather(*(asyncio.shield(probe) for probe in self.probes))
+        return True
+
+    async def _probe(self, probe: ReadinessProbe, source: str):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + probe.timeout
+        matched = self._log_probes[source][1] if probe.log is not None else None
+        try:
+            while True:
+                if matched is not None:
+                    if matched.done():
+                        break
+                elif await check_probe(probe):
+                    break
+                # A crash the supervisor restarts from is no failure yet
+                status = self.commands[source]
+                if status.state in (CommandState.EXITED, CommandState.CRASHED, CommandState.FAILED):
+                    self._log(source, f"Exited with code {status.last_exit_code} before it was ready", LogStream.ERROR)
+                    raise RuntimeError(f"{source} exited with code {status.last_exit_code} before it was ready")
+                if loop.time() >= deadline:
+                    self._log(source, f"Not ready after {probe.timeout:g}s", LogStream.ERROR)
+                    raise RuntimeError(f"{source} not ready after {probe.timeout:g}s")
+                if matched is not None:
+                    await asyncio.wait([matched], timeout=PROBE_INTERVAL)
+                else:
+                    await asyncio.sleep(PROBE_INTERVAL)
+        finally:
+            self._log_probes.pop(source, None)
+        self._log(source, f"Ready after {loop.time() - started:.1f}s")
+
+    def _match_log_probe(self, source: str, message: str):
+        entry = self._log_probes.get(source)
+        if entry and not entry[1].done() and entry[0].search(message):
+            entry[1].set_result(None)
+
+    async def _stream_output(self, process, source: str):
+        async def read_stream(stream, kind: LogStream):
+            # Large reads and our own line splitting: no line is too long to
+            # read, so the pipe keeps draining and the process never blocks on it
+            splitter = LineSplitter()
             while True:
-                line = await stream.readline()
-                if not line:
+                data = await stream.read(READ_CHUNK)
+                if not data:
                     break
-                text = line.decode().strip()
-                if text:
-                    log_color = "red" if is_stderr else color
-                    self._log(name, text, log_color)
+                for text in splitter.feed(data):
+                    self._log(source, text, kind)
+            for text in splitter.flush():
+                self._log(source, text, kind)
         
         await asyncio.gather(
-            read_stream(process.stdout),
-            read_stream(process.stderr, is_stderr=True)
+            read_stream(process.stdout, LogStream.STDOUT),
+            read_stream(process.stderr, LogStream.STDERR)
         )
 
     async def stop(self):
-        # Signal observers to stop? 
-        # We can put a special None value or just clear them.
-        # But the requirement is "current resident command line will automatically exit".
-        # So we should send a signal.
-        for queue in list(self.observers):
-            queue.put_nowait(None) # None indicates stream end
+        """
+        Stop the preview commands, then end the log session.
+
+        Everything the commands print while shutting down, and the runner's
+        own notes about it, still belongs to the ending session: observers
+        get it before their streams end, and it is archived with it.
+        """
+        await self._stop_commands()
+        self.flush_logs()
+        for subscriber in list(self.observers):
+            subscriber.close() # Ends the stream once the queued lines are read
         self.observers.clear()
+        self._groups.clear()
+        # Whatever is logged from here on belongs to the next preview
+        self.logs.reset()
 
-        import os
-        import signal
-        if hasattr(self, 'processes'):
-            for process, _, cmd in self.processes:
-                try:
-                    self._log("preview", f"Stopping: {cmd}", "yellow")
-                    # Kill the process group
-                    os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-                    try:
-                        await asyncio.wait_for(process.wait(), timeout=5.0)
-                    except asyncio.TimeoutError:
-                        self._log("preview", f"Force killing: {cmd}", "red")
-                        os.killpg(os.getpgid(process.pid), signal.SIGKILL)
-                        await process.wait()
-                except ProcessLookupError:
-                    pass # Already dead
-                except Exception as e:
-                    self._log("preview", f"Error stopping {cmd}: {e}", "red")
+    async def restart(self, commands: List[Union[str, PreviewCommand]]):
+        """
+        Stop the preview commands and start `commands` in their place.
+
+        Unlike stop() and start_preview(), this stays in the same log
+        session: observers keep streaming across the restart.
+        """
+        await self._stop_commands()
+        await self.start_preview(commands)
+
+    async def _stop_commands(self):
+        """Stop the probes, supervisors and preview commands, and drain their output."""
+        for probe in self.probes:
+            probe.cancel()
+        self.probes = []
+        self._log_probes.clear()
+        # Before anything is signalled, so nothing stopped here is restarted
+        for supervisor in self._supervisors:
+            supervisor.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
+        self._supervisors = []
+
+        self.last_stop_seconds = None
+        if self.processes:
+            self.last_stop_seconds = await self._stop_processes()
             self.processes = []
+        self.commands = {}
+        if self._streams:
+            # The last lines still in the pipes; a process that escaped its group may hold one open
+            done, pending = await asyncio.wait(list(self._streams), timeout=HOOK_OUTPUT_GRACE)
+            for stream in pending:
+                stream.cancel()
+
+    async def _stop_processes(self) -> float:
+        """
+        SIGTERM every preview command's process group at once, then SIGKILL
+        the groups still running when their grace period is over, including
+        members left behind by a shell that did exit. The grace
+        periods all count from the same moment, so stopping takes at most
+        the longest one, whatever the number of commands. Returns the seconds taken.
+        """
+        import signal
+        from workspace_cli.server.manager import _in_thread
+        from workspace_cli.server.resources import group_alive
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        def signal_group(process, source: str, cmd: str, sig) -> bool:
+            try:
+                # Started with setsid: the group id is the shell's pid, even once the shell is gone
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                return False # Already dead
+            except Exception as e:
+                self._log(source, f"Error stopping {cmd}: {e}", LogStream.ERROR)
+                return False
+            return True
+
+        async def wait(process, source: str, cmd: str):
+            deadline = started + self._grace.get(source, STOP_GRACE)
+            try:
+                await asyncio.wait_for(process.wait(), timeout=max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            # The shell may be gone while children that ignore SIGTERM are still in its group
+            while process.returncode is not None:
+                if not await _in_thread(group_alive, process.pid):
+                    return
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(STOP_POLL_INTERVAL, remaining))
+            self._log(source, f"Force killing: {cmd}", LogStream.ERROR)
+            if signal_group(process, source, cmd, signal.SIGKILL):
+                await process.wait()
+
+        waits = []
+        for process, source, cmd in self.processes:
+            self._log(source, f"Stopping: {cmd}")
+            if signal_group(process, source, cmd, signal.SIGTERM):
+                waits.append(wait(process, source, cmd))
+        await asyncio.gather(*waits)
+
+        elapsed = loop.time() - started
+        self._log("preview", f"Stopped {len(self.processes)} command(s) in {elapsed:.1f}s")
+        return elapsed
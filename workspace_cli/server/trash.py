@@ -0,0 +1,112 @@
+import os
+import shutil
+import threading
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Deque, Optional
+from workspace_cli.models import TrashStatus
+from workspace_cli.utils.fs import tree_size
+
+from workspace_cli.utils.logger import get_logger
+logger = get_logger()
+
+class Trash:
+    """
+    Deletes directories in the background.
+
+    `move` renames a directory into the trash area (a sibling of the base
+    workspace, so the rename stays on one filesystem and is atomic) and
+    returns at once; a low-priority worker thread then measures and deletes
+    the entries one by one. Entries left over from a previous run are
+    picked up again.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._queue: Deque[Path] = deque()
+        self._lock = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._pending_bytes = 0
+        self._deleted_bytes = 0
+        self._current: Optional[Path] = None
+        if self.root.exists():
+            self._queue.extend(sorted(self.root.iterdir()))
+
+    def start(self):
+        """Resume deleting entries left over from a previous run."""
+        if self._queue:
+            self._ensure_worker()
+
+    def move(self, path: Path) -> Optional[Path]:
+        """Move `path` into the trash; falls back to deleting in place if it can't be renamed."""
+        if not os.path.lexists(path):
+            return None
+        target = self.root / f"{Path(path).name}-{uuid.uuid4().hex[:8]}"
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            os.rename(path, target)
+        except OSError as e:
+            # e.g. a different filesystem than the trash area
+            logger.warning(f"Can't move {path} to trash, deleting in place: {e}")
+            self._delete(Path(path))
+            return None
+        with self._lock:
+            self._queue.append(target)
+            self._lock.notify_all()
+        self._ensure_worker()
+        return target
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="trash", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        try:
+            # Linux applies this to the calling thread only: leave the CPU to everything else
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            with self._lock:
+                if not self._queue:
+                    # Cleared under the lock, so a concurrent move() starts a new worker
+                    self._worker = None
+                    self._current = None
+                    self._pending_bytes = 0
+                    self._lock.notify_all()
+                    return
+                entry = self._queue.popleft()
+                self._current = entry
+            size = tree_size(entry)
+            with self._lock:
+                self._pending_bytes = size
+            try:
+                self._delete(entry)
+            except Exception as e:
+                logger.warning(f"Failed to delete {entry} from trash: {e}")
+            with self._lock:
+                self._deleted_bytes += self._pending_bytes
+
+    def _delete(self, path: Path):
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.lexists(path):
+            os.unlink(path)
+
+    def status(self) -> TrashStatus:
+        with self._lock:
+            entries = len(self._queue) + (1 if self._current else 0)
+            return TrashStatus(
+                entries=entries,
+                pending_bytes=self._pending_bytes,
+                deleted_bytes=self._deleted_bytes
+            )
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Start the worker if needed and wait until the trash is empty; returns False on timeout."""
+        self.start()
+        with self._lock:
+            return self._lock.wait_for(lambda: not self._queue and self._current is None, timeout)
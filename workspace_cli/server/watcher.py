@@ -1,22 +1,30 @@
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from pathlib import Path
+from typing import List, Optional
 import shutil
 import logging
+from workspace_cli.config import in_profile
 
 logger = logging.getLogger(__name__)
 
 class SyncHandler(FileSystemEventHandler):
-    def __init__(self, source: Path, target: Path, ignore_patterns: list = None):
+    def __init__(self, source: Path, target: Path, ignore_patterns: list = None, include_paths: Optional[List[str]] = None):
         self.source = source
         self.target = target
         self.ignore_patterns = ignore_patterns or []
+        # Sparse profile of the source; anything outside it belongs to the target
+        self.include_paths = include_paths
 
     def _sync(self, src_path: str):
         # Basic sync logic: copy file from source to target
         # TODO: Handle ignores and deletions properly
         rel_path = Path(src_path).relative_to(self.source)
         target_path = self.target / rel_path
+
+        if not in_profile(rel_path, self.include_paths):
+            logger.debug(f"Skipping sync outside profile: {rel_path}")
+            return
         
         if not Path(src_path).exists():
             logger.debug(f"Skipping sync for missing file: {src_path}")
@@ -61,6 +69,9 @@ class SyncHandler(FileSystemEventHandler):
         try:
             rel_path = Path(src_path).relative_to(self.source)
             target_path = self.target / rel_path
+            if not in_profile(rel_path, self.include_paths):
+                # Not materialised in the source, the target copy is authoritative
+                return
             if target_path.exists():
                 if target_path.is_dir():
                     shutil.rmtree(target_path)
@@ -71,14 +82,36 @@ class SyncHandler(FileSystemEventHandler):
             logger.error(f"Error deleting {src_path}: {e}")
 
 class Watcher:
-    def __init__(self, source: Path, target: Path):
+    def __init__(self, source: Path, target: Path, include_paths: Optional[List[str]] = None):
         self.source = source
         self.target = target
+        self.include_paths = include_paths
         self.observer = Observer()
-        self.handler = SyncHandler(source, target)
+        self.handler = SyncHandler(source, target, include_paths=include_paths)
+
+    def _watch_targets(self):
+        """Yield (path, recursive) pairs covering the source or its sparse profile."""
+        if self.include_paths is None:
+            yield self.source, True
+            return
+
+        patterns = sorted({Path(p.strip("/")) for p in self.include_paths if p.strip("/")})
+        # Nested profile paths are already covered by their parent
+        roots = [p for p in patterns if not any(p != other and other in p.parents for other in patterns)]
+
+        # Cone mode keeps the files of every directory leading to a profile path
+        parents = {Path(".")}
+        for root in roots:
+            parents.update(root.parents)
+        for parent in sorted(parents):
+            yield self.source / parent, False
+        for root in roots:
+            yield self.source / root, True
 
     def start(self):
-        self.observer.schedule(self.handler, str(self.source), recursive=True)
+        for path, recursive in self._watch_targets():
+            if path.is_dir():
+                self.observer.schedule(self.handler, str(path), recursive=recursive)
         self.observer.start()
 
     def stop(self):
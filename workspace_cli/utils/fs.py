@@ -0,0 +1,100 @@
+import errno
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+# ioctl that makes a file share the data blocks of another (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# errnos meaning "this filesystem can't do that", as opposed to a real failure
+_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS, errno.EPERM, errno.EMLINK}
+
+def _reflink(src: str, dst: str):
+    import fcntl
+
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+    shutil.copystat(src, dst)
+
+def clone_tree(
+    src: Path,
+    dst: Path,
+    ignore: Optional[Callable[[str, List[str]], Iterable[str]]] = None,
+    immutable: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    Copy a directory tree as cheaply as the filesystem allows.
+
+    Files are reflinked (copy-on-write) where supported and copied
+    otherwise, so the copy never shares data that an in-place write could
+    change. Only files `immutable` accepts (given the path relative to
+    `src`), such as git objects, may be hard-linked instead of copied.
+    `ignore` works like shutil.copytree's. Returns the method used last
+    for the other files: "reflink" or "copy".
+    """
+    method = "reflink"
+    can_link = immutable is not None
+    for dirpath, dirnames, filenames in os.walk(src):
+        target_dir = Path(dst) / os.path.relpath(dirpath, src)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        ignored = set(ignore(dirpath, dirnames + filenames)) if ignore else set()
+        dirnames[:] = [name for name in dirnames if name not in ignored]
+
+        for name in list(dirnames) + filenames:
+            if name in ignored:
+                continue
+            source = os.path.join(dirpath, name)
+            target = str(target_dir / name)
+            if os.path.islink(source):
+                if os.path.lexists(target):
+                    os.unlink(target)
+                os.symlink(os.readlink(source), target)
+                if name in dirnames:
+                    # Don't descend into symlinked directories
+                    dirnames.remove(name)
+                continue
+            if name in dirnames:
+                continue
+            if os.path.lexists(target):
+                os.unlink(target)
+
+            if method == "reflink":
+                try:
+                    _reflink(source, target)
+                    continue
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+                    if os.path.lexists(target):
+                        os.unlink(target)
+                    method = "copy"
+            if can_link and immutable(os.path.relpath(source, src)):
+                try:
+                    os.link(source, target)
+                    continue
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+                    can_link = False
+            shutil.copy2(source, target)
+    return method
+
+def is_git_object(rel: str) -> bool:
+    """Whether a path inside a git directory is an object or pack (never changed once written)."""
+    parts = Path(rel).parts
+    return len(parts) > 2 and parts[0] == "objects" and parts[1] != "info"
+
+def tree_size(path: Path, exclude: Iterable[Path] = ()) -> int:
+    """Approximate disk usage of a tree in bytes (allocated blocks), without the `exclude` subtrees."""
+    excluded = {os.path.normpath(str(p)) for p in exclude}
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        if excluded:
+            dirnames[:] = [name for name in dirnames if os.path.join(dirpath, name) not in excluded]
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_blocks * 512
+            except OSError:
+                pass
+    return total